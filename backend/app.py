@@ -1,13 +1,34 @@
+import os
 from flask import Flask
 from routes import register_blueprints
 from flask_cors import CORS
+from models import model_registry
+from lib.server_timing import server_timing
 
 app = Flask(__name__)
 
 CORS(app)
 
+# Per-request stage timings: Server-Timing header + one JSON log line
+# (SERVER_TIMING=0 disables)
+server_timing.init_app(app)
+
 # Register all blueprints
 register_blueprints(app)
 
+# Load heavy models (Whisper, TTS, MiniLM) in the background so startup stays
+# fast; /ai/health/ready reports progress. WARMUP_MODELS="" disables warm-up,
+# models then load on first use. The debug reloader's watcher process never
+# serves requests, so it is skipped there. In pre-fork mode gunicorn.conf.py
+# preloads the models in the master instead.
+PREFORK_PRELOAD = os.getenv("PREFORK_PRELOAD") == "1"
+# Spawned worker processes re-import this file as __mp_main__ and must not
+# warm up anything.
+if not PREFORK_PRELOAD and (
+    __name__ == "app"
+    or (__name__ == "__main__" and os.getenv("WERKZEUG_RUN_MAIN") == "true")
+):
+    model_registry.warm_up(os.getenv("WARMUP_MODELS", "all"), background=True)
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8000, debug=True)
@@ -0,0 +1,4 @@
+"""
+Benchmark and budget scripts
+Run from the backend folder, e.g. ``python -m benchmarks.import_budget``
+"""
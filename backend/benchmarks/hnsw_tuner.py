@@ -0,0 +1,242 @@
+"""
+HNSW tuner
+Measures recall of the Chroma HNSW index against exact search, plus query
+latency and build time, for a grid of index settings (M, ef_construction,
+ef_search) on the actual corpus, then recommends the fastest settings that
+reach the target recall.
+
+The corpus (PDF chunks + chroma_test employee records) is embedded once;
+every configuration is built through the real VectorStore / HNSWConfig from
+those cached vectors, so only index build and search are timed. Queries are
+the labelled questions of benchmarks.retrieval plus the opening words of
+randomly sampled chunks.
+
+Usage:
+    python -m benchmarks.hnsw_tuner [--pdf data/qa.pdf --pdf data/meditations.pdf]
+        [--space cosine] [--m 8,16,32] [--ef-construction 64,100,200]
+        [--ef-search 10,32,64,128] [--k 5] [--target-recall 0.95]
+        [--output results.json]
+"""
+
+import argparse
+import itertools
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from benchmarks.retrieval import (
+    BASE_DIR,
+    PDF_QUESTIONS,
+    _employee_text,
+    _ints,
+    employee_questions,
+)
+
+DEFAULT_PDFS = [BASE_DIR / "data" / "qa.pdf", BASE_DIR / "data" / "meditations.pdf"]
+
+
+class PrecomputedEmbeddings:
+    """Serves vectors computed once; unseen texts go to the real model"""
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self.vectors = {}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        missing = [t for t in dict.fromkeys(texts) if t not in self.vectors]
+        if missing:
+            for text, vector in zip(missing, self.embeddings.embed_documents(missing)):
+                self.vectors[text] = vector
+        return [self.vectors[t] for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def exact_top_k(matrix: np.ndarray, query: np.ndarray, k: int, space: str):
+    """Indices of the k nearest rows under Chroma's distance for ``space``"""
+    if space == "l2":
+        scores = -((matrix - query) ** 2).sum(axis=1)
+    elif space == "ip":
+        scores = matrix @ query
+    else:  # cosine
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+        scores = (matrix @ query) / np.where(norms == 0, 1.0, norms)
+    top = np.argpartition(-scores, min(k, len(scores) - 1))[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def load_chunks(pdfs: List[Path], chunk_size: int, chunk_overlap: int):
+    from langchain.schema import Document
+    from chroma_test.test_data import employees
+    from rag.rag_engine.document_loader import DocumentLoader
+    from rag.rag_engine.text_chunker import TextChunker
+
+    loader = DocumentLoader()
+    chunker = TextChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunks = []
+    for pdf in pdfs:
+        chunks += chunker.chunk_documents(loader.load_pdf(pdf), pdf.name)
+    chunks += [
+        Document(
+            page_content=_employee_text(employee),
+            metadata={"source": "employees", "chunk_index": index},
+        )
+        for index, employee in enumerate(employees)
+    ]
+    return chunks, employees
+
+
+def build_queries(chunks, employees, samples: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    openings = [
+        " ".join(chunk.page_content.split()[:12])
+        for chunk in rng.sample(chunks, min(samples, len(chunks)))
+    ]
+    labelled = [q for q, _ in PDF_QUESTIONS + employee_questions(employees)]
+    return labelled + [text for text in openings if text]
+
+
+def measure(store, query_vectors, truth_keys, k: int) -> dict:
+    from rag.rag_engine.retriever import chunk_key
+
+    recalls, latencies = [], []
+    for vector, expected in zip(query_vectors, truth_keys):
+        start = time.perf_counter()
+        results = store.similarity_search_by_vector(vector, k=k)
+        latencies.append(time.perf_counter() - start)
+        found = {chunk_key(doc) for doc in results}
+        recalls.append(len(found & expected) / max(1, len(expected)))
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return {
+        "recall": statistics.mean(recalls),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": p95 * 1000,
+    }
+
+
+def tune(args) -> List[dict]:
+    from models import hf_embeddings
+    from rag.rag_engine.retriever import chunk_key
+    from rag.rag_engine.vector_store import HNSWConfig, VectorStore
+
+    chunks, employees = load_chunks(args.pdf, args.chunk_size, args.chunk_overlap)
+    queries = build_queries(chunks, employees, args.sample_queries, args.seed)
+    print(f"📚 {len(chunks)} chunks, {len(queries)} queries")
+
+    embeddings = PrecomputedEmbeddings(hf_embeddings)
+    start = time.perf_counter()
+    matrix = np.asarray(embeddings.embed_documents([c.page_content for c in chunks]))
+    query_vectors = embeddings.embed_documents(queries)
+    print(f"Embedded corpus and queries in {time.perf_counter() - start:.1f}s")
+
+    # Ground truth: exact top-k under the same distance function
+    truth_keys = [
+        {
+            chunk_key(chunks[i])
+            for i in exact_top_k(matrix, np.asarray(v), args.k, args.space)
+        }
+        for v in query_vectors
+    ]
+
+    # ef_search is part of the grid but each point gets a fresh index: a loaded
+    # HNSW segment may not pick up a changed search_ef, which would skew results
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="hnsw-tuner-") as tmp:
+        workdir = Path(tmp)
+        grid = itertools.product(args.m, args.ef_construction, args.ef_search)
+        for m, ef_construction, ef_search in grid:
+            config = HNSWConfig(
+                space=args.space,
+                m=m,
+                ef_construction=ef_construction,
+                ef_search=ef_search,
+            )
+            folder = Path(tempfile.mkdtemp(dir=workdir))
+            store = VectorStore(folder, embeddings, config)
+            start = time.perf_counter()
+            store.add_documents(chunks)
+            build_seconds = time.perf_counter() - start
+
+            row = {**config.as_dict(), "build_s": build_seconds}
+            row.update(measure(store, query_vectors, truth_keys, args.k))
+            rows.append(row)
+            print(
+                f"M={m:<3} ef_construction={ef_construction:<4} "
+                f"ef_search={ef_search:<4} "
+                f"recall@{args.k}={row['recall']:.3f} p50={row['p50_ms']:.2f}ms"
+            )
+    return rows
+
+
+def recommend(rows: List[dict], target_recall: float):
+    """Fastest settings reaching the target; smaller graphs win ties"""
+    eligible = [r for r in rows if r["recall"] >= target_recall]
+    if not eligible:
+        return None
+    return min(
+        eligible,
+        key=lambda r: (round(r["p50_ms"], 1), r["m"], r["ef_construction"]),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--pdf", type=Path, action="append", help="Corpus PDF (repeatable)"
+    )
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--space", choices=["l2", "cosine", "ip"], default="l2")
+    parser.add_argument("--m", type=_ints, default=[8, 16, 32])
+    parser.add_argument("--ef-construction", type=_ints, default=[64, 100, 200])
+    parser.add_argument("--ef-search", type=_ints, default=[10, 32, 64, 128])
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--sample-queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    parser.add_argument("--output", type=Path, help="Write all rows as JSON")
+    args = parser.parse_args()
+    args.pdf = args.pdf or DEFAULT_PDFS
+
+    rows = tune(args)
+
+    print(
+        f"\n{'M':>4} {'ef_c':>5} {'ef_s':>5} {'recall':>7} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'build s':>8}"
+    )
+    for r in rows:
+        print(
+            f"{r['m']:>4} {r['ef_construction']:>5} {r['ef_search']:>5} "
+            f"{r['recall']:>7.3f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+            f"{r['build_s']:>8.2f}"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(rows, indent=2))
+        print(f"\nRows written to {args.output}")
+
+    best = recommend(rows, args.target_recall)
+    if best is None:
+        print(
+            f"\nNo setting reaches recall@{args.k} >= {args.target_recall}; "
+            "try larger --ef-search or --m"
+        )
+        return
+    print(
+        f"\nRecommended (recall@{args.k} {best['recall']:.3f}, "
+        f"p50 {best['p50_ms']:.2f}ms):\n"
+        f"    HNSWConfig(space={best['space']!r}, m={best['m']}, "
+        f"ef_construction={best['ef_construction']}, ef_search={best['ef_search']})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Import-time budget check
+Imports app.py in a fresh interpreter with warm-up disabled and fails if it
+takes longer than the budget or pulls heavy model libraries in eagerly.
+
+Usage:
+    python -m benchmarks.import_budget [--budget SECONDS]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Modules that must only be imported when a model is first used
+HEAVY_MODULES = ["torch", "whisper", "TTS", "sentence_transformers", "transformers"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app  # noqa: F401
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "heavy": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def measure_import(runs: int = 3) -> dict:
+    """
+    Import app.py in fresh interpreters
+
+    Args:
+        runs: Number of fresh imports; the fastest one is reported
+
+    Returns:
+        Dict with best import time and heavy modules that were loaded
+    """
+    env = dict(os.environ, WARMUP_MODELS="")
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    best = min(results, key=lambda r: r["seconds"])
+    return {"seconds": round(best["seconds"], 3), "heavy": best["heavy"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=float(os.getenv("IMPORT_BUDGET_SECONDS", "5")),
+        help="Maximum allowed import time in seconds",
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    result = measure_import(args.runs)
+    print(f"import app: {result['seconds']}s (budget {args.budget}s)")
+
+    failed = False
+    if result["seconds"] > args.budget:
+        print("❌ Import time is over budget")
+        failed = True
+    if result["heavy"]:
+        print(f"❌ Heavy modules imported eagerly: {', '.join(result['heavy'])}")
+        failed = True
+    if not failed:
+        print("✅ Import time within budget")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Pipeline benchmark suite
+End-to-end timings of ingestion, retrieval, answer generation, chat and
+chains. By default it runs on the deterministic offline models
+(LLM_BACKEND=fake, EMBEDDINGS_BACKEND=fake), so the numbers are repeatable
+on isolated CI boxes; export the real backends to benchmark those instead.
+
+With the fake LLM the gateway's rate limit and pool sizes are raised out of
+the way (unless set explicitly), so the suites measure pipeline overhead
+rather than token-bucket waits; the settings used are printed and saved with
+the results.
+
+Results can be saved as JSON and compared against a baseline: the run fails
+(exit code 1) when a suite's p50 regresses by more than the tolerance.
+
+Usage:
+    python -m benchmarks.pipeline [--iterations 20] [--output results.json]
+        [--baseline baseline.json] [--tolerance 0.2]
+        [--llm-latency 0.05] [--tokens-per-second 200]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+QUESTIONS = [
+    "What is the main topic of the document?",
+    "Which steps are described in the process?",
+    "What are the key requirements mentioned?",
+    "Who is responsible for the final decision?",
+    "What examples are given in the text?",
+]
+
+FEEDBACK = [
+    "The product quality is good and delivery was fast",
+    "Support was bad and the refund took weeks",
+    "It arrived on Tuesday in a blue box",
+]
+
+
+def configure_environment(args) -> None:
+    """Offline, isolated defaults; must run before models is imported"""
+    os.environ.setdefault("LLM_BACKEND", "fake")
+    os.environ.setdefault("EMBEDDINGS_BACKEND", "fake")
+    os.environ.setdefault("SESSION_STORE", "memory")
+    # Every LLM call must be measured, not served from the response cache
+    os.environ.setdefault("LLM_CACHE_DB", "")
+    os.environ.setdefault("LLM_CACHE_MEMORY_ENTRIES", "0")
+    os.environ.setdefault("TRACE_CHAINS", "0")
+    if os.environ["LLM_BACKEND"] == "fake":
+        # Measure pipeline overhead, not token-bucket waits: the fake model has
+        # no provider quota to protect
+        os.environ.setdefault("LLM_REQUESTS_PER_SECOND", "1000000")
+        os.environ.setdefault("LLM_BURST", "1000000")
+        os.environ.setdefault("LLM_INTERACTIVE_CONCURRENCY", "256")
+        os.environ.setdefault("LLM_BATCH_CONCURRENCY", "256")
+        os.environ.setdefault("LLM_BATCH_RESERVE", "0")
+    os.environ["FAKE_LLM_LATENCY"] = str(args.llm_latency)
+    os.environ["FAKE_LLM_TOKENS_PER_SECOND"] = str(args.tokens_per_second)
+    os.environ["FAKE_EMBEDDINGS_SECONDS_PER_TEXT"] = str(args.embedding_latency)
+
+
+def timed(fn: Callable[[int], object], iterations: int) -> List[float]:
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def summarize(latencies: List[float]) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "n": len(ordered),
+        "p50": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "mean": statistics.mean(ordered),
+        "total": sum(ordered),
+    }
+
+
+def gateway_settings() -> dict:
+    """Rate limit and pool settings the run used (they shape the latencies)"""
+    from models import llm_gateway
+
+    return {
+        "llm_backend": os.environ.get("LLM_BACKEND"),
+        "requests_per_second": llm_gateway.bucket.rate,
+        "burst": llm_gateway.bucket.capacity,
+        "pools": {
+            name: {
+                "max_concurrency": cfg.max_concurrency,
+                "reserve_fraction": cfg.reserve_fraction,
+            }
+            for name, cfg in llm_gateway.pools.items()
+        },
+    }
+
+
+def run_suites(args) -> Dict[str, dict]:
+    from models import chat_llm, batch_llm, hf_embeddings
+    from rag.rag_engine import RAGPipeline
+    from services.batch_service import BATCH_CHAINS, run_batch
+    from services.text_service import ask_text_model
+    from chains.parallel import analyzer, chain as multi_call_chain
+
+    pdf = BASE_DIR / "data" / "qa.pdf"
+    results = {}
+    workdir = Path(tempfile.mkdtemp(prefix="pipeline-bench-"))
+
+    # ---------------- Ingestion ----------------
+    def _ingest(i):
+        pipeline = RAGPipeline(workdir / f"ingest-{i}", hf_embeddings, chat_llm)
+        if not pipeline.ingest_document(pdf):
+            raise RuntimeError(f"Ingestion of {pdf} failed")
+
+    results["ingestion"] = summarize(timed(_ingest, args.ingest_runs))
+
+    # ---------------- Retrieval / generation ----------------
+    pipeline = RAGPipeline(
+        workdir / "ingest-0", hf_embeddings, chat_llm, rerank_llm=batch_llm
+    )
+
+    def _question(i):
+        return QUESTIONS[i % len(QUESTIONS)]
+
+    results["retrieval"] = summarize(
+        timed(
+            lambda i: pipeline.retriever.retrieve(_question(i), k=3), args.iterations
+        )
+    )
+    results["rag_answer"] = summarize(
+        timed(lambda i: pipeline.query(_question(i), k=3), args.iterations)
+    )
+    results["rag_answer_rerank"] = summarize(
+        timed(
+            lambda i: pipeline.query(
+                _question(i), k=6, use_reranking=True, rerank_top_k=3
+            ),
+            args.iterations,
+        )
+    )
+
+    # ---------------- Chat ----------------
+    results["chat"] = summarize(
+        timed(
+            lambda i: ask_text_model(_question(i), session_id=f"bench-{i % 4}"),
+            args.iterations,
+        )
+    )
+
+    # ---------------- Chains ----------------
+    def _content(i):
+        return {"content": FEEDBACK[i % len(FEEDBACK)] + f" (run {i})"}
+
+    results["chain_multi_call"] = summarize(
+        timed(lambda i: multi_call_chain.invoke(_content(i)), args.iterations)
+    )
+    results["chain_structured"] = summarize(
+        timed(lambda i: analyzer.invoke(_content(i)), args.iterations)
+    )
+    results["chain_router"] = summarize(
+        timed(
+            lambda i: BATCH_CHAINS["feedback"].invoke(
+                {"input": FEEDBACK[i % len(FEEDBACK)]}
+            ),
+            args.iterations,
+        )
+    )
+    batch_inputs = [f"{FEEDBACK[i % len(FEEDBACK)]} #{i}" for i in range(100)]
+    batch_runs = max(1, args.iterations // 10)
+    results["batch_100"] = summarize(
+        timed(lambda i: run_batch(batch_inputs, "feedback"), batch_runs)
+    )
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Suites whose p50 got slower than baseline * (1 + tolerance)"""
+    regressions = []
+    for suite, stats in results.items():
+        before = baseline.get(suite)
+        if before and stats["p50"] > before["p50"] * (1 + tolerance):
+            regressions.append(
+                f"{suite}: p50 {before['p50'] * 1000:.1f}ms"
+                f" -> {stats['p50'] * 1000:.1f}ms"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--ingest-runs", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--embedding-latency", type=float, default=0.0)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Compare with a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    configure_environment(args)
+    results = run_suites(args)
+    gateway = gateway_settings()
+
+    print(
+        f"\nGateway: {gateway['requests_per_second']:g} req/s, "
+        f"burst {gateway['burst']:g}, pools "
+        + ", ".join(
+            f"{name}={pool['max_concurrency']} (reserve {pool['reserve_fraction']:g})"
+            for name, pool in gateway["pools"].items()
+        )
+    )
+
+    print(f"\n{'suite':<20} {'n':>4} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9}")
+    for suite, stats in results.items():
+        print(
+            f"{suite:<20} {stats['n']:>4} {stats['p50'] * 1000:>9.1f} "
+            f"{stats['p95'] * 1000:>9.1f} {stats['mean'] * 1000:>9.1f}"
+        )
+
+    if args.output:
+        report = {"suites": results, "gateway": gateway}
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("gateway") not in (None, gateway):
+            print("⚠️ Baseline was recorded with different gateway settings")
+        # Older reports hold the suites at the top level
+        regressions = compare(
+            results, baseline.get("suites", baseline), args.tolerance
+        )
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print(f"\nNo regression beyond {args.tolerance:.0%} of baseline p50")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+Retrieval quality-vs-latency benchmark
+Sweeps chunking (chunk_size / chunk_overlap), k, query mode (single query
+or multi-query with LLM rewrites), re-ranking mode and index backend over a
+labelled question set and reports, per configuration: recall@k, MRR@k,
+context tokens sent to the LLM and p50/p95 latency.
+
+The corpus is data/qa.pdf plus the employee records of
+chroma_test/test_data.py. A question's label is a list of short evidence
+phrases; a retrieved chunk is relevant when it contains one of them, so the
+labels stay valid whatever the chunking.
+
+Backends:
+    chroma  the production VectorStore (Chroma, approximate HNSW search)
+    exact   brute-force cosine similarity over the same embeddings
+
+Context tokens are estimated as characters / 4.
+
+Usage:
+    python -m benchmarks.retrieval [--chunk-sizes 300,500,1000]
+        [--overlaps 0,100,200] [--k 1,3,5,8] [--queries single,multi]
+        [--rerank none,llm]
+        [--backends chroma,exact] [--min-recall 0.8] [--output rows.json]
+
+Set EMBEDDINGS_BACKEND=fake / LLM_BACKEND=fake for an offline smoke run
+(latencies are then meaningless, recall only roughly so).
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import math
+import re
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Labelled questions about data/qa.pdf ("Automatic Question and Answer Pair
+# Generation"): (question, evidence phrases)
+PDF_QUESTIONS = [
+    ("What does the sentence detector do?", ["detecting sentence boundaries"]),
+    ("What is reading comprehension?", ["ability to read text"]),
+    ("What is machine learning?", ["teach themselves to grow and change"]),
+    ("What does the POS tagger do?", ["marking up a word in a text"]),
+    ("How many paragraphs are in the MCTest dataset?", ["660 paragraphs"]),
+    ("How is the Children Book Test built?", ["consecutive 21 sentences"]),
+    ("What does the chunker do?", ["partition a sentence"]),
+    (
+        "Which steps does the proposed algorithm follow?",
+        ["split the document content into sentence"],
+    ),
+    ("Which tool is used to build the system?", ["open nlp tool"]),
+    (
+        "How can educational institutions use the system?",
+        ["preparing question papers"],
+    ),
+    ("What does the name finder do?", ["finds names in the context"]),
+    ("What is natural language processing?", ["between computer and human"]),
+    ("What future work is planned?", ["image data"]),
+    (
+        "Which classifiers are used to analyse discourse structure?",
+        ["support vector machine"],
+    ),
+]
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def _employee_text(employee: dict) -> str:
+    # Same document layout as chroma_test/main.py
+    return (
+        f"{employee['role']} with {employee['experience']} years of experience "
+        f"in {employee['department']}. Skills: {employee['skills']}. "
+        f"Located in {employee['location']}. "
+        f"Employment type: {employee['employment_type']}."
+    )
+
+
+def employee_questions(employees: List[dict]) -> List[tuple]:
+    """Two questions per employee record: by skills and by role + location"""
+    questions = []
+    for employee in employees:
+        evidence = [f"skills: {employee['skills']}"]
+        skills = [s.strip() for s in employee["skills"].split(",")]
+        questions.append(
+            (f"Who has experience with {' and '.join(skills[:2])}?", evidence)
+        )
+        questions.append(
+            (
+                f"Is there a {employee['role']} based in {employee['location']}?",
+                evidence,
+            )
+        )
+    return questions
+
+
+class ExactIndex:
+    """Brute-force cosine search with the VectorStore search interface"""
+
+    def __init__(self, embedding_function):
+        self.embedding_function = embedding_function
+        self.documents = []
+        self.vectors = []
+
+    @staticmethod
+    def _unit(vector):
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def add_documents(self, chunks) -> None:
+        vectors = self.embedding_function.embed_documents(
+            [c.page_content for c in chunks]
+        )
+        self.documents.extend(chunks)
+        self.vectors.extend(self._unit(v) for v in vectors)
+
+    def similarity_search_by_vector(self, query_vector, k: int = 3):
+        query = self._unit(query_vector)
+        best = heapq.nlargest(
+            k,
+            range(len(self.vectors)),
+            key=lambda i: sum(q * v for q, v in zip(query, self.vectors[i])),
+        )
+        return [self.documents[i] for i in best]
+
+
+def score(chunks, evidence: List[str]) -> tuple:
+    """(recall, reciprocal rank) of a ranked chunk list for one question"""
+    texts = [_normalize(c.page_content) for c in chunks]
+    found = sum(1 for phrase in evidence if any(phrase in t for t in texts))
+    first = next(
+        (
+            rank
+            for rank, text in enumerate(texts, start=1)
+            if any(phrase in text for phrase in evidence)
+        ),
+        None,
+    )
+    return found / len(evidence), (1.0 / first if first else 0.0)
+
+
+def load_corpus(pdf: Path):
+    """PDF pages and one Document per employee record"""
+    from langchain.schema import Document
+    from rag.rag_engine.document_loader import DocumentLoader
+    from chroma_test.test_data import employees
+
+    pages = DocumentLoader().load_pdf(pdf)
+    records = [
+        Document(
+            page_content=_employee_text(employee),
+            metadata={"source": "employees", "chunk_index": index},
+        )
+        for index, employee in enumerate(employees)
+    ]
+    questions = [
+        (q, [_normalize(e) for e in evidence])
+        for q, evidence in PDF_QUESTIONS + employee_questions(employees)
+    ]
+    return pages, records, questions
+
+
+def build_index(backend: str, chunks, embeddings, workdir: Path):
+    from rag.rag_engine.vector_store import VectorStore
+
+    if backend == "chroma":
+        index = VectorStore(Path(tempfile.mkdtemp(dir=workdir)), embeddings)
+    elif backend == "exact":
+        index = ExactIndex(embeddings)
+    else:
+        raise ValueError(f"Unknown backend '{backend}'")
+    index.add_documents(chunks)
+    return index
+
+
+def run_config(retriever, questions, k: int, mode: str, rerank: str, args) -> dict:
+    def _retrieve(question, count):
+        if mode == "multi":
+            return retriever.retrieve_multi(question, k=count)
+        return retriever.retrieve(question, k=count)
+
+    recalls, ranks, tokens, latencies = [], [], [], []
+    for question, evidence in questions:
+        start = time.perf_counter()
+        if rerank == "llm":
+            candidates = _retrieve(question, k * args.fetch_factor)
+            chunks = retriever.re_rank(question, candidates, top_k=k)
+        else:
+            chunks = _retrieve(question, k)
+        latencies.append(time.perf_counter() - start)
+
+        recall, reciprocal_rank = score(chunks, evidence)
+        recalls.append(recall)
+        ranks.append(reciprocal_rank)
+        tokens.append(sum(len(c.page_content) for c in chunks) / 4)
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return {
+        "recall": statistics.mean(recalls),
+        "mrr": statistics.mean(ranks),
+        "context_tokens": statistics.mean(tokens),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": p95 * 1000,
+    }
+
+
+def sweep(args) -> List[dict]:
+    from models import batch_llm, hf_embeddings
+    from rag.rag_engine.retriever import Retriever
+    from rag.rag_engine.text_chunker import TextChunker
+
+    pages, records, questions = load_corpus(args.pdf)
+    print(
+        f"📚 {len(pages)} pages, {len(records)} records, {len(questions)} questions"
+    )
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="retrieval-bench-") as tmp:
+        workdir = Path(tmp)
+        for chunk_size in args.chunk_sizes:
+            for overlap in args.overlaps:
+                if overlap >= chunk_size:
+                    continue
+                chunker = TextChunker(chunk_size=chunk_size, chunk_overlap=overlap)
+                chunks = chunker.chunk_documents(pages, args.pdf.name) + records
+
+                for backend in args.backends:
+                    start = time.perf_counter()
+                    index = build_index(backend, chunks, hf_embeddings, workdir)
+                    index_seconds = time.perf_counter() - start
+                    retriever = Retriever(index, hf_embeddings, llm=batch_llm)
+
+                    for k, mode, rerank in itertools.product(
+                        args.k, args.queries, args.rerank
+                    ):
+                        row = {
+                            "backend": backend,
+                            "chunk_size": chunk_size,
+                            "chunk_overlap": overlap,
+                            "k": k,
+                            "queries": mode,
+                            "rerank": rerank,
+                            "chunks": len(chunks),
+                            "index_s": index_seconds,
+                        }
+                        row.update(
+                            run_config(retriever, questions, k, mode, rerank, args)
+                        )
+                        rows.append(row)
+    return rows
+
+
+def recommend(rows: List[dict], min_recall: float):
+    """Cheapest configuration (context tokens, then p50) meeting the recall bar"""
+    eligible = [r for r in rows if r["recall"] >= min_recall]
+    if not eligible:
+        return None
+    return min(eligible, key=lambda r: (r["context_tokens"], r["p50_ms"]))
+
+
+def print_table(rows: List[dict]) -> None:
+    header = (
+        f"{'backend':<7} {'size':>5} {'ovl':>4} {'k':>3} {'queries':<7} "
+        f"{'rerank':<6} {'recall':>6} {'mrr':>5} {'ctx tok':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8}"
+    )
+    print("\n" + header + "\n" + "-" * len(header))
+    for r in rows:
+        print(
+            f"{r['backend']:<7} {r['chunk_size']:>5} {r['chunk_overlap']:>4} "
+            f"{r['k']:>3} {r['queries']:<7} {r['rerank']:<6} "
+            f"{r['recall']:>6.3f} {r['mrr']:>5.3f} "
+            f"{r['context_tokens']:>8.0f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f}"
+        )
+
+
+def _ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def _names(value: str) -> List[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pdf", type=Path, default=BASE_DIR / "data" / "qa.pdf")
+    parser.add_argument("--chunk-sizes", type=_ints, default=[300, 500, 1000])
+    parser.add_argument("--overlaps", type=_ints, default=[0, 100, 200])
+    parser.add_argument("--k", type=_ints, default=[1, 3, 5, 8])
+    parser.add_argument(
+        "--queries", type=_names, default=["single"], help="single and/or multi"
+    )
+    parser.add_argument(
+        "--rerank", type=_names, default=["none"], help="none and/or llm"
+    )
+    parser.add_argument("--backends", type=_names, default=["chroma", "exact"])
+    parser.add_argument(
+        "--fetch-factor",
+        type=int,
+        default=2,
+        help="With llm re-ranking, retrieve k * factor candidates first",
+    )
+    parser.add_argument("--min-recall", type=float, default=0.8)
+    parser.add_argument("--output", type=Path, help="Write all rows as JSON")
+    args = parser.parse_args()
+
+    rows = sweep(args)
+    print_table(rows)
+
+    if args.output:
+        args.output.write_text(json.dumps(rows, indent=2))
+        print(f"\nRows written to {args.output}")
+
+    best = recommend(rows, args.min_recall)
+    if best is None:
+        print(f"\nNo configuration reaches recall@k >= {args.min_recall}")
+    else:
+        print(
+            f"\nCheapest configuration with recall@k >= {args.min_recall}: "
+            f"{best['backend']}, chunk_size={best['chunk_size']}, "
+            f"chunk_overlap={best['chunk_overlap']}, k={best['k']}, "
+            f"queries={best['queries']}, rerank={best['rerank']} "
+            f"({best['context_tokens']:.0f} context tokens, "
+            f"p50 {best['p50_ms']:.1f}ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
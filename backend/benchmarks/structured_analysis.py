@@ -0,0 +1,89 @@
+"""
+Structured analysis benchmark
+Compares the 3-call summary/sentiment/keywords chain with the single-call
+structured analyzer in chains/parallel.py: LLM calls and latency per text.
+
+Every run appends a unique marker to the texts so the response cache can't
+hide the cost of either path.
+
+Usage:
+    python -m benchmarks.structured_analysis [--repeat 3] [--file notes.txt]
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+
+from models import llm_gateway
+
+TEXTS = [
+    "I really enjoy working with AI models like Gemini and LangChain; they are amazing!",
+    "The delivery was two weeks late, the box was damaged and support never replied.",
+    "The council approved the new bike lanes; construction starts in spring and "
+    "should take about four months.",
+]
+
+
+class CallCounter:
+    """Counts calls made through the gateway's underlying model"""
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.calls = 0
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+    def invoke(self, *args, **kwargs):
+        self.calls += 1
+        return self.llm.invoke(*args, **kwargs)
+
+
+def measure(runnable, texts, counter: CallCounter) -> dict:
+    latencies = []
+    counter.calls = 0
+    for text in texts:
+        start = time.perf_counter()
+        runnable.invoke({"content": text})
+        latencies.append(time.perf_counter() - start)
+    return {
+        "calls_per_text": counter.calls / len(texts),
+        "p50": statistics.median(latencies),
+        "mean": statistics.mean(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--file", help="Text file with one input per paragraph")
+    args = parser.parse_args()
+
+    texts = TEXTS
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            texts = [p.strip() for p in f.read().split("\n\n") if p.strip()]
+
+    from chains.parallel import analyzer, chain
+
+    counter = CallCounter(llm_gateway.llm)
+    llm_gateway.llm = counter
+
+    def _unique(batch):
+        return [f"{text}\n(ref {uuid.uuid4().hex[:8]})" for text in batch]
+
+    runs = [t for _ in range(args.repeat) for t in texts]
+    multi = measure(chain, _unique(runs), counter)
+    single = measure(analyzer, _unique(runs), counter)
+
+    for name, result in (("multi-call", multi), ("structured", single)):
+        print(
+            f"{name:<11} {result['calls_per_text']:.2f} calls/text, "
+            f"p50 {result['p50']:.2f}s, mean {result['mean']:.2f}s"
+        )
+    print(f"speed-up: {multi['mean'] / single['mean']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
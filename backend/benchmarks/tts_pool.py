@@ -0,0 +1,89 @@
+"""
+TTS pool sizing benchmark
+Sweeps instances x threads-per-instance splits of the machine's cores and
+reports throughput and latency of concurrent synthesis requests, to pick
+TTS_POOL_SIZE and TTS_TORCH_THREADS.
+
+Usage:
+    python -m benchmarks.tts_pool [--cores 8] [--requests 24] [--max-instances 4]
+"""
+
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services.tts_pool import TTSPool
+
+SENTENCES = [
+    "The lighthouse keeper climbed the stairs one last time before the storm.",
+    "A small fox followed the river until it found the sleeping village.",
+    "Every night the old clock in the square chimed a little too early.",
+    "She opened the letter and smiled at the drawing of a paper boat.",
+]
+
+
+def splits(cores: int, max_instances: int):
+    """(instances, threads) pairs that use at most ``cores`` threads in total"""
+    for instances in range(1, max_instances + 1):
+        threads = cores // instances
+        if threads >= 1:
+            yield instances, threads
+
+
+def run(pool: TTSPool, requests: int) -> dict:
+    """Fire ``requests`` syntheses with as many callers as pool instances"""
+
+    def _one(i):
+        start = time.perf_counter()
+        pool.tts(text=SENTENCES[i % len(SENTENCES)], split_sentences=False)
+        return time.perf_counter() - start
+
+    pool.tts(text=SENTENCES[0], split_sentences=False)  # warm-up
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=pool.size * 2) as executor:
+        latencies = sorted(executor.map(_one, range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        "throughput": requests / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default="tts_models/en/ljspeech/tacotron2-DDC")
+    parser.add_argument("--cores", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--requests", type=int, default=24)
+    parser.add_argument("--max-instances", type=int, default=4)
+    args = parser.parse_args()
+
+    from TTS.api import TTS
+
+    # Load the largest pool's instances once and reuse them for every split
+    max_instances = min(args.max_instances, args.cores)
+    print(f"Loading {max_instances} TTS instances...")
+    loaded = [
+        TTS(model_name=args.model, progress_bar=False) for _ in range(max_instances)
+    ]
+
+    results = []
+    for instances, threads in splits(args.cores, max_instances):
+        available = iter(loaded)
+        pool = TTSPool(lambda: next(available), instances, threads)
+        result = run(pool, args.requests)
+        results.append((instances, threads, result))
+        print(
+            f"{instances} x {threads:>2} threads: "
+            f"{result['throughput']:.2f} req/s, "
+            f"p50 {result['p50']:.2f}s, p95 {result['p95']:.2f}s"
+        )
+
+    instances, threads, _ = max(results, key=lambda r: r[2]["throughput"])
+    print(f"\nBest throughput: TTS_POOL_SIZE={instances} TTS_TORCH_THREADS={threads}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Whisper batching benchmark
+Compares N sequential transcribe() calls with one batched pass over the same
+clips.
+
+Usage:
+    python -m benchmarks.whisper_batch clip1.wav clip2.m4a ... [--batch-size 8]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from services.audio_decode import decode_audio
+from services.whisper_batch import transcribe_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("files", nargs="+", type=Path, help="Audio clips")
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    import whisper
+
+    model = whisper.load_model(args.model)
+    audios = [decode_audio(path.read_bytes()) for path in args.files]
+    seconds_of_audio = sum(len(a) for a in audios) / 16000
+
+    start = time.perf_counter()
+    for audio in audios:
+        model.transcribe(audio, fp16=False)
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    transcribe_batch(model, audios, batch_size=args.batch_size)
+    batched = time.perf_counter() - start
+
+    print(f"{len(audios)} clips, {seconds_of_audio:.1f}s of audio")
+    print(f"sequential: {sequential:.2f}s")
+    print(f"batched:    {batched:.2f}s (batch size {args.batch_size})")
+    print(f"speed-up:   {sequential / batched:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Per-worker memory report
+Reads /proc/<pid>/smaps_rollup for a gunicorn master and its workers and
+reports unique (USS), proportional (PSS) and resident (RSS) memory, so
+pre-fork sharing can be compared against per-worker model loading.
+
+Usage (Linux only):
+    python -m benchmarks.worker_memory <master_pid>
+    python -m benchmarks.worker_memory --pidfile /tmp/gunicorn.pid
+"""
+
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+PROC = Path("/proc")
+
+
+def read_rollup(pid: int) -> Dict[str, int]:
+    """
+    Read memory counters of one process
+
+    Args:
+        pid: Process id
+
+    Returns:
+        Dict of counters in kB (rss, pss, uss, shared)
+    """
+    values = {}
+    for line in (PROC / str(pid) / "smaps_rollup").read_text().splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+            values[parts[0][:-1]] = int(parts[1])
+    private = values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)
+    shared = values.get("Shared_Clean", 0) + values.get("Shared_Dirty", 0)
+    return {
+        "rss": values.get("Rss", 0),
+        "pss": values.get("Pss", 0),
+        "uss": private,
+        "shared": shared,
+    }
+
+
+def child_pids(pid: int) -> List[int]:
+    """Direct children of a process"""
+    children = []
+    for task in (PROC / str(pid) / "task").iterdir():
+        text = (task / "children").read_text().split()
+        children.extend(int(c) for c in text)
+    return sorted(set(children))
+
+
+def format_mb(kb: int) -> str:
+    return f"{kb / 1024:8.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("pid", nargs="?", type=int, help="gunicorn master pid")
+    parser.add_argument("--pidfile", type=Path, help="gunicorn --pid file")
+    args = parser.parse_args()
+
+    if args.pid is None and args.pidfile is None:
+        parser.error("pass a master pid or --pidfile")
+    master = args.pid or int(args.pidfile.read_text().strip())
+    workers = child_pids(master)
+
+    rows = [("master", master, read_rollup(master))]
+    rows += [("worker", pid, read_rollup(pid)) for pid in workers]
+
+    print(f"{'process':>16} {'RSS MB':>8} {'PSS MB':>8} {'USS MB':>8} {'Shared MB':>9}")
+    for label, pid, mem in rows:
+        print(
+            f"{label + ' ' + str(pid):>16} {format_mb(mem['rss'])} "
+            f"{format_mb(mem['pss'])} {format_mb(mem['uss'])} "
+            f"{format_mb(mem['shared']):>9}"
+        )
+
+    worker_uss = [mem["uss"] for label, _, mem in rows if label == "worker"]
+    if worker_uss:
+        print(
+            f"\nWorkers: {len(worker_uss)}, mean unique per worker: "
+            f"{format_mb(sum(worker_uss) // len(worker_uss)).strip()} MB"
+        )
+    total_pss = sum(mem["pss"] for _, _, mem in rows)
+    # PSS sums to the real footprint of the whole process tree
+    print(f"Total PSS (actual host memory): {format_mb(total_pss).strip()} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from models import gemini_llm
+from models import batch_llm
 from langchain.prompts import ChatPromptTemplate
 from langchain.schema.runnable import RunnableLambda, RunnableSequence
 from langchain.schema.output_parser import StrOutputParser
@@ -10,13 +10,13 @@ messages = [
 ]
 prompt = ChatPromptTemplate(messages=messages)
 
-chain = prompt | gemini_llm | StrOutputParser()
+chain = prompt | batch_llm | StrOutputParser()
 result = chain.invoke({"count": 1, "category": "AI"})
 print(result)
 
 
 first = RunnableLambda(lambda x: prompt.format_prompt(**x))
-middle = RunnableLambda(lambda x: gemini_llm.invoke(x.to_messages()))
+middle = RunnableLambda(lambda x: batch_llm.invoke(x.to_messages()))
 last = RunnableLambda(lambda x: x.content)
 
 chain1 = RunnableSequence(first=first, middle=[middle], last=last)
@@ -1,5 +1,11 @@
-from models import gemini_llm
+import ast
+from typing import List, Literal
+
+from pydantic import BaseModel, Field
+from models import batch_llm, cached, response_cache
 from langchain.schema.output_parser import StrOutputParser
+from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import PydanticOutputParser
 from langchain.schema.runnable import RunnableLambda, RunnableParallel
 from langchain.prompts import (
     ChatPromptTemplate,
@@ -39,7 +45,7 @@ sentiment = (
             ),
         ]
     )
-    | gemini_llm
+    | cached(batch_llm)
     | StrOutputParser()
 )
 
@@ -59,7 +65,7 @@ words = (
             ),
         ]
     )
-    | gemini_llm
+    | cached(batch_llm)
     | StrOutputParser()
 )
 
@@ -67,7 +73,7 @@ words = (
 # Main Summary Chain
 # -------------------------
 prompt = ChatPromptTemplate.from_messages([system_msg, human_msg])
-main_chain = prompt | gemini_llm | StrOutputParser()
+main_chain = prompt | batch_llm | StrOutputParser()
 
 # -------------------------
 # Combined Chain (Final)
@@ -85,12 +91,99 @@ chain = (
     | (lambda x: x["branches"])
 )
 
+
 # -------------------------
-# Execution
+# Structured Analysis (single call)
 # -------------------------
-input_text = (
-    "I really enjoy working with AI models like Gemini and LangChain; they are amazing!"
+class TextAnalysis(BaseModel):
+    """Summary, sentiment and keywords of a text, returned by one LLM call"""
+
+    summary: str = Field(description="Concise, coherent summary without opinions")
+    sentiment: Literal["Positive", "Neutral", "Negative"]
+    keywords: List[str] = Field(
+        min_length=1, max_length=5, description="Top 3 keywords of the content"
+    )
+
+
+# Gemini response schema (OpenAPI subset) mirroring TextAnalysis
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "sentiment": {"type": "string", "enum": ["Positive", "Neutral", "Negative"]},
+        "keywords": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["summary", "sentiment", "keywords"],
+}
+
+analysis_parser = PydanticOutputParser(pydantic_object=TextAnalysis)
+
+analysis_prompt = ChatPromptTemplate.from_messages(
+    [
+        system_msg,
+        HumanMessagePromptTemplate.from_template(
+            "Analyze the following content:\n{content}\n"
+            "Return its summary (concise, coherent, main ideas only, no opinions), "
+            "its sentiment (Positive, Neutral or Negative) and its top 3 keywords.\n"
+            "{format_instructions}"
+        ),
+    ]
+).partial(format_instructions=analysis_parser.get_format_instructions())
+
+
+def _parses(text: str) -> bool:
+    """Whether a structured response validates (raises OutputParserException)"""
+    analysis_parser.parse(text)
+    return True
+
+
+# Only responses that parse are cached, so a malformed answer isn't replayed
+# into the fallback for every later identical input
+structured_chain = (
+    analysis_prompt
+    | cached(batch_llm, validate=_parses).bind(
+        response_mime_type="application/json", response_schema=ANALYSIS_SCHEMA
+    )
+    | analysis_parser
+    | (lambda analysis: {**analysis.model_dump(), "keywords": analysis.keywords[:3]})
 )
 
-result = chain.invoke({"content": input_text})
-print(result)
+
+def _parse_keywords(text: str) -> List[str]:
+    """Turn the multi-call keywords string (e.g. "['a','b','c']") into a list"""
+    try:
+        parsed = ast.literal_eval(text.strip())
+        if isinstance(parsed, (list, tuple)):
+            return [str(word).strip() for word in parsed][:3]
+    except (ValueError, SyntaxError):
+        pass
+    return [w.strip(" []'\"") for w in text.split(",") if w.strip(" []'\"")][:3]
+
+
+def _from_multi_call(result: dict) -> dict:
+    print("⚠️ Structured analysis failed validation, used the multi-call chain")
+    return {
+        "summary": result["summary"],
+        "sentiment": result["sentiments"].strip(),
+        "keywords": _parse_keywords(result["keywords"]),
+    }
+
+
+# One call when the JSON validates; the 3-call chain only when it doesn't
+analyzer = structured_chain.with_fallbacks(
+    [chain | RunnableLambda(_from_multi_call)],
+    exceptions_to_handle=(OutputParserException,),
+)
+
+# -------------------------
+# Execution
+# -------------------------
+if __name__ == "__main__":
+    input_text = (
+        "I really enjoy working with AI models like Gemini and LangChain; they are amazing!"
+    )
+
+    result = chain.invoke({"content": input_text})
+    print(result)
+    print(analyzer.invoke({"content": input_text}))
+    print(f"LLM cache: {response_cache.stats()}")
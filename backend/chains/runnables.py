@@ -1,6 +1,6 @@
 from langchain.prompts import ChatPromptTemplate
 from lib import DebugRunnable
-from models import gemini_llm
+from models import batch_llm, cached, response_cache
 from langchain.schema.output_parser import StrOutputParser
 from langchain.schema.runnable import (
     RunnableMap,
@@ -15,7 +15,7 @@ sentiment_analysis_runnable = RunnableLambda(
 
 summarization_runnable = (
     ChatPromptTemplate.from_template(template="Summarize this: {input}")
-    | gemini_llm
+    | cached(batch_llm)
     | StrOutputParser()
 )
 
@@ -30,3 +30,4 @@ feedback = "The product quality is really bad and exceeded expectations."
 result = pipeline.invoke({"input": feedback})
 
 print(result)
+print(f"LLM cache: {response_cache.stats()}")
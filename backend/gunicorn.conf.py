@@ -0,0 +1,54 @@
+"""
+Gunicorn configuration
+Pre-fork serving mode: models are loaded once in the master process and the
+forked workers share the read-only weights copy-on-write.
+
+Usage (from the backend folder):
+    gunicorn -c gunicorn.conf.py
+    PREFORK_PRELOAD=0 gunicorn -c gunicorn.conf.py   # each worker loads its own
+"""
+
+import multiprocessing
+import os
+
+# ---------------- Server ----------------
+wsgi_app = "app:app"
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.getenv("WEB_THREADS", "4"))
+timeout = int(os.getenv("WEB_TIMEOUT", "120"))
+
+# ---------------- Pre-fork model sharing ----------------
+os.environ.setdefault("PREFORK_PRELOAD", "1")
+preload_app = os.environ["PREFORK_PRELOAD"] == "1"
+
+if preload_app:
+    # Must be set before grpc (Gemini client) is imported by the app
+    os.environ.setdefault("GRPC_ENABLE_FORK_SUPPORT", "1")
+    os.environ.setdefault("GRPC_POLL_STRATEGY", "poll")
+
+# Split the cores between workers so torch thread pools don't oversubscribe
+TORCH_THREADS = int(
+    os.getenv(
+        "TORCH_THREADS_PER_WORKER",
+        max(1, multiprocessing.cpu_count() // max(1, workers)),
+    )
+)
+
+
+def on_starting(server):
+    """Runs in the master after the app is imported, before any fork"""
+    if not preload_app:
+        return
+    from models import model_registry
+
+    model_registry.prepare_for_fork(os.getenv("WARMUP_MODELS", "all"))
+    server.log.info("Preloaded models: %s", model_registry.status()["models"])
+
+
+def post_fork(server, worker):
+    """Runs in each worker right after fork"""
+    # Without preload the app (and its warm-up) is imported after this hook
+    from models import model_registry
+
+    model_registry.after_fork(torch_threads=TORCH_THREADS)
@@ -1 +1,5 @@
 from .utils import *
+from .router import *
+from .tracing import *
+from .server_timing import *
+from .metrics import *
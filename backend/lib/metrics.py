@@ -0,0 +1,305 @@
+"""
+Metrics Module
+Process-local counters, gauges and histograms rendered in the Prometheus
+text exposition format (served at /metrics).
+
+Updates are lock-cheap: each metric keeps its values in a fixed set of
+shards, every thread is pinned to one shard and each shard has its own lock,
+so concurrent request threads rarely contend; shards are summed only when
+the endpoint is scraped. Values that already live elsewhere (cache hit
+counters, queue depths, session counts) are read at scrape time through
+callbacks instead of being mirrored on every update.
+
+Metrics are per process: with several gunicorn workers each scrape sees the
+worker that served it.
+"""
+
+import itertools
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple, Union
+
+from .tracing import DEFAULT_BUCKETS
+
+__all__ = ["Counter", "Gauge", "Histogram", "MetricsRegistry", "metrics"]
+
+# Shards per metric; threads are assigned round-robin on first use
+SHARDS = 16
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_thread_slot = threading.local()
+_next_slot = itertools.count()
+
+
+def _shard_index() -> int:
+    index = getattr(_thread_slot, "index", None)
+    if index is None:
+        index = _thread_slot.index = next(_next_slot) % SHARDS
+    return index
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Shard:
+    __slots__ = ("lock", "values")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values: Dict[tuple, object] = {}
+
+
+class _Metric:
+    """Base class: name, help text, label names and sharded storage"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._shards = [_Shard() for _ in range(SHARDS)]
+
+    def _key(self, labels: dict) -> tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} expects labels {self.labelnames}, "
+                f"got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _shard(self) -> _Shard:
+        return self._shards[_shard_index()]
+
+    def _snapshots(self) -> List[dict]:
+        snapshots = []
+        for shard in self._shards:
+            with shard.lock:
+                snapshots.append(
+                    {
+                        key: list(value) if isinstance(value, list) else value
+                        for key, value in shard.values.items()
+                    }
+                )
+        return snapshots
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        shard = self._shard()
+        with shard.lock:
+            shard.values[key] = shard.values.get(key, 0.0) + amount
+
+    def values(self) -> Dict[tuple, float]:
+        totals: Dict[tuple, float] = {}
+        for snapshot in self._snapshots():
+            for key, value in snapshot.items():
+                totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in sorted(self.values().items())
+        ]
+
+
+class Gauge(Counter):
+    """Value that goes up and down (e.g. calls in flight)"""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram of observed values"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.bounds = list(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.bounds, value)
+        shard = self._shard()
+        with shard.lock:
+            entry = shard.values.get(key)
+            if entry is None:
+                # [bucket counts..., +Inf count, sum, count]
+                entry = shard.values[key] = [0] * (len(self.bounds) + 1) + [0.0, 0]
+            entry[index] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    def values(self) -> Dict[tuple, list]:
+        totals: Dict[tuple, list] = {}
+        for snapshot in self._snapshots():
+            for key, entry in snapshot.items():
+                total = totals.get(key)
+                if total is None:
+                    totals[key] = entry
+                else:
+                    totals[key] = [a + b for a, b in zip(total, entry)]
+        return totals
+
+    def render(self) -> List[str]:
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, entry in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds + [math.inf], entry):
+                cumulative += count
+                labels = _format_labels(names, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(entry[-2])}")
+            lines.append(f"{self.name}_count{labels} {entry[-1]}")
+        return lines
+
+
+# A callback returns one value, or (labels, value) pairs
+CallbackResult = Union[float, Iterable[Tuple[dict, float]]]
+
+
+class _CallbackMetric:
+    """Metric whose values are computed at scrape time"""
+
+    def __init__(
+        self, name: str, help: str, kind: str, fn: Callable[[], CallbackResult]
+    ):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        result = self.fn()
+        if result is None:
+            return []
+        if isinstance(result, (int, float)):
+            return [f"{self.name} {_format_value(result)}"]
+        lines = []
+        for labels, value in result:
+            names = tuple(labels)
+            values = tuple(str(labels[n]) for n in names)
+            lines.append(
+                f"{self.name}{_format_labels(names, values)} {_format_value(value)}"
+            )
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics of this process"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name: str, factory):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+
+    @staticmethod
+    def _check_counter_name(name: str) -> None:
+        # Prometheus convention; rate() queries rely on it
+        if not name.endswith("_total"):
+            raise ValueError(f"Counter name '{name}' must end in '_total'")
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self._check_counter_name(name)
+        return self._get_or_create(name, lambda: Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        return self._get_or_create(name, lambda: Gauge(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        return self._get_or_create(
+            name, lambda: Histogram(name, help, labelnames, buckets)
+        )
+
+    def callback(
+        self,
+        name: str,
+        help: str,
+        fn: Callable[[], CallbackResult],
+        kind: str = "gauge",
+    ) -> None:
+        """
+        Register a metric read at scrape time
+
+        Args:
+            name: Metric name
+            help: Help text
+            fn: Returns a number, (labels dict, value) pairs, or None to skip
+            kind: "gauge" or "counter" (one quantity per counter family)
+        """
+        if kind == "counter":
+            self._check_counter_name(name)
+        with self._lock:
+            self._metrics[name] = _CallbackMetric(name, help, kind, fn)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for name, metric in metrics:
+            try:
+                samples = metric.render()
+            except Exception as e:
+                # One broken source must not take the endpoint down
+                print(f"⚠️ Metric {name} failed: {e}")
+                continue
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry rendered by /metrics
+metrics = MetricsRegistry()
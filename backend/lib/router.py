@@ -0,0 +1,196 @@
+"""
+Router Module
+Routes an input to one of several runnables in a single pass: every
+keyword/regex rule is compiled into one pattern, with an optional
+embedding-similarity fallback against per-route centroids.
+"""
+
+import math
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from langchain_core.runnables import Runnable
+
+__all__ = ["Route", "KeywordRouter"]
+
+
+class Route:
+    """One routing rule and the runnable it selects"""
+
+    def __init__(
+        self,
+        name: str,
+        runnable: Runnable,
+        keywords: Sequence[str] = (),
+        patterns: Sequence[str] = (),
+        examples: Sequence[str] = (),
+        whole_word: bool = False,
+    ):
+        """
+        Args:
+            name: Route name (reported by KeywordRouter.route)
+            runnable: Runnable invoked when this route is selected
+            keywords: Literal strings that select the route (case-insensitive)
+            patterns: Regular expressions that select the route
+            examples: Sample inputs whose embedding centroid represents the
+                route for similarity routing
+            whole_word: Match keywords only at word boundaries
+        """
+        self.name = name
+        self.runnable = runnable
+        self.keywords = list(keywords)
+        self.patterns = list(patterns)
+        self.examples = list(examples)
+        self.whole_word = whole_word
+
+    def alternatives(self) -> List[str]:
+        """Regex alternatives for all keywords and patterns of this route"""
+        boundary = r"\b" if self.whole_word else ""
+        words = [f"{boundary}{re.escape(k)}{boundary}" for k in self.keywords]
+        return words + [f"(?:{p})" for p in self.patterns]
+
+
+def _normalize(vector: Sequence[float]) -> List[float]:
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class KeywordRouter(Runnable):
+    """
+    Runnable that picks a route with one compiled regex scan
+
+    Rules keep RunnableBranch semantics: the first route (in declaration
+    order) that matches anywhere in the text wins. Each route's alternatives
+    sit in a zero-width lookahead group, so matches never consume text and a
+    lower-priority match can't hide a higher-priority one; the scan stops as
+    soon as the first route matches.
+    """
+
+    def __init__(
+        self,
+        routes: Sequence[Route],
+        default: Runnable,
+        input_key: str = "input",
+        embeddings=None,
+        centroids: Optional[Dict[str, Sequence[float]]] = None,
+        min_similarity: float = 0.5,
+        debug: bool = False,
+    ):
+        """
+        Args:
+            routes: Routes in priority order
+            default: Runnable used when no route matches
+            input_key: Key holding the text when the input is a dict
+            embeddings: LangChain Embeddings for similarity routing (optional)
+            centroids: Precomputed route centroids by route name; routes with
+                examples but no centroid get one computed on first use
+            min_similarity: Cosine similarity needed to accept an embedding match
+            debug: Print the selected route for every input
+        """
+        self.routes = list(routes)
+        self.default = default
+        self.input_key = input_key
+        self.embeddings = embeddings
+        self.min_similarity = min_similarity
+        self.debug = debug
+
+        self._by_name = {route.name: route for route in self.routes}
+        self._centroids = {
+            name: _normalize(vector) for name, vector in (centroids or {}).items()
+        }
+        self._centroid_lock = threading.Lock()
+
+        groups = []
+        self._group_routes = {}
+        for index, route in enumerate(self.routes):
+            alternatives = route.alternatives()
+            if not alternatives:
+                continue
+            group = f"r{index}"
+            self._group_routes[group] = route
+            groups.append(f"(?=(?P<{group}>{'|'.join(alternatives)}))")
+        self._pattern = (
+            re.compile("|".join(groups), re.IGNORECASE | re.DOTALL) if groups else None
+        )
+
+    # ---------------- Route selection ----------------
+    def _text(self, input) -> str:
+        if isinstance(input, dict):
+            return str(input.get(self.input_key, ""))
+        return str(input)
+
+    def match_rules(self, text: str) -> Optional[Route]:
+        """Route selected by keyword/regex rules, or None"""
+        if self._pattern is None:
+            return None
+        best = None
+        for match in self._pattern.finditer(text):
+            group = match.lastgroup
+            if group not in self._group_routes:
+                # A user pattern defined its own named group; find ours
+                group = next(g for g in self._group_routes if match.group(g))
+            index = int(group[1:])
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break  # nothing can outrank the first route
+        return self.routes[best] if best is not None else None
+
+    def _ensure_centroids(self) -> None:
+        missing = [
+            r for r in self.routes if r.examples and r.name not in self._centroids
+        ]
+        if not missing:
+            return
+        with self._centroid_lock:
+            for route in missing:
+                if route.name in self._centroids:
+                    continue
+                vectors = self.embeddings.embed_documents(route.examples)
+                mean = [sum(column) / len(vectors) for column in zip(*vectors)]
+                self._centroids[route.name] = _normalize(mean)
+
+    def match_embedding(self, text: str) -> Optional[Route]:
+        """Route whose centroid is most similar to the text, or None"""
+        if self.embeddings is None:
+            return None
+        self._ensure_centroids()
+        if not self._centroids:
+            return None
+
+        query = _normalize(self.embeddings.embed_query(text))
+        name, similarity = max(
+            (
+                (name, sum(q * c for q, c in zip(query, centroid)))
+                for name, centroid in self._centroids.items()
+            ),
+            key=lambda pair: pair[1],
+        )
+        if similarity < self.min_similarity:
+            return None
+        return self._by_name.get(name)
+
+    def route(self, input) -> str:
+        """Name of the route selected for an input ("default" if none)"""
+        selected = self._select(input)
+        return selected.name if selected is not None else "default"
+
+    def _select(self, input) -> Optional[Route]:
+        text = self._text(input)
+        selected = self.match_rules(text) or self.match_embedding(text)
+        if self.debug:
+            name = selected.name if selected is not None else "default"
+            print(f"\033[1;33m[DEBUG] Router selected:\033[0m {name}")
+        return selected
+
+    # ---------------- Runnable interface ----------------
+    def invoke(self, input, config=None, **kwargs):
+        selected = self._select(input)
+        runnable = selected.runnable if selected is not None else self.default
+        return runnable.invoke(input, config, **kwargs)
+
+    def stream(self, input, config=None, **kwargs) -> Iterable:
+        selected = self._select(input)
+        runnable = selected.runnable if selected is not None else self.default
+        yield from runnable.stream(input, config, **kwargs)
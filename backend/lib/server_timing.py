@@ -0,0 +1,184 @@
+"""
+Server Timing Module
+Request-scoped latency breakdown, exposed as a ``Server-Timing`` response
+header (shown by browser and mobile network inspectors) and as one JSON log
+line per request.
+
+Services annotate their work with ``server_timing.span("llm")``. The timings
+of the current request live in a context variable, so code running outside a
+request (CLI scripts, background workers) hits a shared no-op. LCEL runs
+batch items in context-copying thread pools, so spans from those threads
+land in the same request; a stage that runs several times is reported with
+its total duration and call count.
+
+SERVER_TIMING=0 disables the header and the log line.
+"""
+
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+__all__ = ["RequestTimings", "ServerTiming", "server_timing"]
+
+# Characters not allowed in a Server-Timing metric name (an HTTP token)
+_INVALID_NAME = re.compile(r"[^A-Za-z0-9!#$%&'*+.^_`|~-]")
+
+
+class RequestTimings:
+    """Stage durations collected during one request (thread-safe)"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self._stages: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._stages.setdefault(stage, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def stages(self) -> Dict[str, dict]:
+        """{stage: {"ms": total milliseconds, "count": calls}} in insertion order"""
+        with self._lock:
+            items = list(self._stages.items())
+        return {
+            stage: {"ms": round(seconds * 1000, 1), "count": count}
+            for stage, (seconds, count) in items
+        }
+
+    def header(self) -> str:
+        """Server-Timing header value, ending with the request total so far"""
+        metrics = []
+        for stage, entry in self.stages().items():
+            metric = f"{_INVALID_NAME.sub('-', stage)};dur={entry['ms']}"
+            if entry["count"] > 1:
+                metric += f';desc="{entry["count"]}x"'
+            metrics.append(metric)
+        metrics.append(f"total;dur={round(self.elapsed() * 1000, 1)}")
+        return ", ".join(metrics)
+
+
+class _NoopSpan:
+    """Shared do-nothing context manager used outside requests"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class ServerTiming:
+    """Entry point for annotating request stages"""
+
+    def __init__(self, enabled: bool = True):
+        """
+        Args:
+            enabled: Collect timings and emit the header / log line
+        """
+        self.enabled = enabled
+        self._current: contextvars.ContextVar[Optional[RequestTimings]] = (
+            contextvars.ContextVar("server_timing", default=None)
+        )
+
+    def current(self) -> Optional[RequestTimings]:
+        """Timings of the request being handled, or None"""
+        return self._current.get()
+
+    def begin(self) -> contextvars.Token:
+        """Start collecting for a new request; returns the token for end()"""
+        return self._current.set(RequestTimings())
+
+    def end(self, token: contextvars.Token) -> None:
+        self._current.reset(token)
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Add a duration measured elsewhere (e.g. by a worker thread)"""
+        timings = self._current.get()
+        if timings is not None:
+            timings.add(stage, seconds)
+
+    def span(self, stage: str):
+        """
+        Time a block of code as ``stage`` of the current request
+
+        Usage:
+            with server_timing.span("tts"):
+                samples = tts.tts(text=text)
+        """
+        timings = self._current.get()
+        if timings is None:
+            return _NOOP_SPAN
+        return self._span(timings, stage)
+
+    @contextmanager
+    def _span(self, timings: RequestTimings, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings.add(stage, time.perf_counter() - start)
+
+    # ---------------- Flask integration ----------------
+    def init_app(self, app) -> None:
+        """
+        Collect timings for every request of a Flask app
+
+        The header is added when the view returns; the log line is written
+        when the response is closed, so streamed bodies are included in its
+        total.
+        """
+        if not self.enabled:
+            return
+        from flask import g, request
+
+        @app.before_request
+        def _begin_timing():
+            g.server_timing_token = self.begin()
+
+        @app.after_request
+        def _add_timing_header(response):
+            timings = self.current()
+            if timings is None:
+                return response
+            response.headers["Server-Timing"] = timings.header()
+            # Lets cross-origin pages read the metrics from resource timing
+            response.headers.setdefault("Timing-Allow-Origin", "*")
+
+            method, path, status = request.method, request.path, response.status_code
+            response.call_on_close(lambda: self._log(timings, method, path, status))
+            return response
+
+        @app.teardown_request
+        def _end_timing(error=None):
+            token = g.pop("server_timing_token", None)
+            if token is not None:
+                self.end(token)
+
+    @staticmethod
+    def _log(timings: RequestTimings, method: str, path: str, status: int) -> None:
+        line = {
+            "event": "request",
+            "method": method,
+            "path": path,
+            "status": status,
+            "total_ms": round(timings.elapsed() * 1000, 1),
+            "stages": timings.stages(),
+        }
+        print(json.dumps(line), flush=True)
+
+
+# Shared instance (SERVER_TIMING=0 turns it off)
+server_timing = ServerTiming(enabled=os.getenv("SERVER_TIMING", "1") != "0")
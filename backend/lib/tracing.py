@@ -0,0 +1,275 @@
+"""
+Tracing Module
+Per-stage latency histograms for LangChain chains and hand-instrumented
+code (retrieval, TTS...).
+
+LCEL chains are timed through a callback handler, so every nested stage
+(prompt formatting, LLM call, output parser, retriever) gets its own span
+without changing the chain. When tracing is disabled ``traced()`` returns
+the runnable untouched and ``span()`` is a shared no-op, so production
+chains pay nothing.
+
+Enable with TRACE_CHAINS=1.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+__all__ = ["LatencyHistogram", "Tracer", "TracingCallbackHandler", "tracer"]
+
+# Upper bounds (seconds) of the histogram buckets; the last bucket is +inf
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (thread-safe)"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.bounds = list(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, error: bool = False) -> None:
+        index = bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            self.min = min(self.min, seconds)
+            self.max = max(self.max, seconds)
+            if error:
+                self.errors += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating inside its bucket"""
+        with self._lock:
+            counts, count = list(self.counts), self.count
+            low_bound, high_bound = self.min, self.max
+        if count == 0:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else high_bound
+                lower, upper = max(lower, low_bound), min(upper, high_bound)
+                fraction = (rank - seen) / bucket_count
+                return lower + (upper - lower) * fraction
+            seen += bucket_count
+        return high_bound
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            count, total = self.count, self.total
+            buckets = {
+                **{str(b): c for b, c in zip(self.bounds, self.counts)},
+                "+Inf": self.counts[-1],
+            }
+            stats = {
+                "count": count,
+                "errors": self.errors,
+                "sum": round(total, 6),
+                "min": round(self.min, 6) if count else 0.0,
+                "max": round(self.max, 6),
+            }
+        stats["mean"] = round(total / count, 6) if count else 0.0
+        for q in (0.5, 0.95, 0.99):
+            stats[f"p{int(q * 100)}"] = round(self.quantile(q), 6)
+        stats["buckets"] = buckets
+        return stats
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """LangChain callback handler that times every run and reports to a Tracer"""
+
+    def __init__(self, tracer: "Tracer"):
+        self.tracer = tracer
+        self._starts: Dict[object, tuple] = {}
+
+    @staticmethod
+    def _name(serialized: Optional[dict], kwargs: dict, fallback: str) -> str:
+        if kwargs.get("name"):
+            return kwargs["name"]
+        if serialized:
+            if serialized.get("name"):
+                return serialized["name"]
+            if serialized.get("id"):
+                return serialized["id"][-1]
+        return fallback
+
+    def _start(self, kind: str, serialized, run_id, kwargs) -> None:
+        stage = f"{kind}:{self._name(serialized, kwargs, kind)}"
+        self._starts[run_id] = (stage, time.perf_counter())
+
+    def _end(self, run_id, error: bool = False) -> None:
+        started = self._starts.pop(run_id, None)
+        if started is not None:
+            stage, start = started
+            self.tracer.record(stage, time.perf_counter() - start, error)
+
+    # Chains (sequences, prompts, parsers, lambdas)
+    def on_chain_start(self, serialized, inputs, *, run_id, **kwargs):
+        self._start("chain", serialized, run_id, kwargs)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=True)
+
+    # LLM / chat model calls
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start("llm", serialized, run_id, kwargs)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start("llm", serialized, run_id, kwargs)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=True)
+
+    # Retrievers
+    def on_retriever_start(self, serialized, query, *, run_id, **kwargs):
+        self._start("retriever", serialized, run_id, kwargs)
+
+    def on_retriever_end(self, documents, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_retriever_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=True)
+
+    # Tools
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._start("tool", serialized, run_id, kwargs)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=True)
+
+
+class _NoopSpan:
+    """Shared do-nothing context manager returned while tracing is off"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Collects per-stage latency histograms"""
+
+    def __init__(self, enabled: bool = False, buckets=DEFAULT_BUCKETS):
+        """
+        Args:
+            enabled: Record spans (when False every entry point is a no-op)
+            buckets: Histogram bucket upper bounds in seconds
+        """
+        self.enabled = enabled
+        self.buckets = buckets
+        self.handler = TracingCallbackHandler(self)
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float, error: bool = False) -> None:
+        """Add one timing to a stage's histogram"""
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(
+                    stage, LatencyHistogram(self.buckets)
+                )
+        histogram.observe(seconds, error)
+
+    def span(self, stage: str):
+        """
+        Time a block of code as ``stage``
+
+        Usage:
+            with tracer.span("retrieval"):
+                chunks = retriever.retrieve(question)
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return self._span(stage)
+
+    @contextmanager
+    def _span(self, stage: str):
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.record(stage, time.perf_counter() - start, error)
+
+    def traced(self, runnable):
+        """
+        Attach the tracing callback to a runnable (and all its nested stages)
+
+        Returns the runnable itself when tracing is disabled.
+        """
+        if not self.enabled:
+            return runnable
+        return runnable.with_config(callbacks=[self.handler])
+
+    def stages(self) -> List[str]:
+        with self._lock:
+            return sorted(self._histograms)
+
+    def export(self) -> dict:
+        """Histogram snapshot of every stage, keyed by stage name"""
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {
+            "enabled": self.enabled,
+            "stages": {
+                stage: histograms[stage].snapshot() for stage in sorted(histograms)
+            },
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+# Shared tracer (TRACE_CHAINS=1 turns it on)
+tracer = Tracer(enabled=os.getenv("TRACE_CHAINS", "0") == "1")
@@ -1 +1,5 @@
 from .extended import *
+from .gateway import *
+from .cache import *
+from .registry import *
+from .fakes import *
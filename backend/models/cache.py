@@ -0,0 +1,358 @@
+"""
+Response Cache Module
+Exact-match LLM response cache keyed on model, generation parameters and
+prompt, with an in-memory LRU tier in front of a size-capped SQLite tier.
+
+SQLite faults (a locked database, a full disk) degrade to cache misses and
+skipped writes; they never fail the LLM call.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable
+
+__all__ = ["ResponseCache", "CachedLLM", "cached"]
+
+# Generation parameters that change the output of a model for the same prompt
+GENERATION_PARAMS = (
+    "temperature",
+    "top_p",
+    "top_k",
+    "max_output_tokens",
+    "max_tokens",
+    "n",
+    "stop",
+)
+
+
+class ResponseCache:
+    """Two-tier (memory + SQLite) cache of LLM responses"""
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        memory_entries: int = 1024,
+        max_db_entries: int = 20000,
+        max_db_bytes: int = 64 * 1024 * 1024,
+        evict_every: int = 100,
+    ):
+        """
+        Initialize response cache
+
+        Args:
+            db_path: SQLite file for the persistent tier (None = memory only)
+            memory_entries: Maximum entries kept in the in-memory LRU
+            max_db_entries: Maximum rows in the SQLite tier
+            max_db_bytes: Maximum total response bytes in the SQLite tier
+            evict_every: Check SQLite limits after this many writes
+        """
+        self.db_path = Path(db_path) if db_path else None
+        self.memory_entries = memory_entries
+        self.max_db_entries = max_db_entries
+        self.max_db_bytes = max_db_bytes
+        self.evict_every = evict_every
+
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes_since_evict = 0
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "errors": 0,
+        }
+
+    # ---------------- Keys ----------------
+    @staticmethod
+    def make_key(model: str, params: dict, prompt) -> str:
+        """
+        Build a stable cache key
+
+        Args:
+            model: Model name
+            params: Generation parameters
+            prompt: JSON-serializable prompt payload
+
+        Returns:
+            SHA-256 hex digest
+        """
+        payload = json.dumps(
+            {"model": model, "params": params, "prompt": prompt},
+            sort_keys=True,
+            default=str,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ---------------- SQLite tier ----------------
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self.db_path is None:
+            return None
+        conn = getattr(self._local, "conn", None)
+        # Connections must not be shared across threads or forked processes
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "accessed REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed)"
+            )
+            conn.commit()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _evict_disk(self, conn: sqlite3.Connection) -> None:
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if count <= self.max_db_entries and total <= self.max_db_bytes:
+            return
+
+        # Drop least recently accessed rows until both limits hold, plus 10% slack
+        target_count = int(self.max_db_entries * 0.9)
+        target_bytes = int(self.max_db_bytes * 0.9)
+        removed = 0
+        for key, size in conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed ASC"
+        ).fetchall():
+            if count <= target_count and total <= target_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+            removed += 1
+        conn.commit()
+        with self._lock:
+            self._stats["evictions"] += removed
+
+    # ---------------- Public API ----------------
+    def get(self, key: str) -> Optional[str]:
+        """Look a response up in memory, then on disk"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return self._memory[key]
+
+        try:
+            row = self._get_disk(key)
+        except (sqlite3.Error, OSError) as e:
+            self._disk_error("read", e)
+            row = None
+        if row is not None:
+            self._remember(key, row[0])
+            with self._lock:
+                self._stats["disk_hits"] += 1
+            return row[0]
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, key: str, value: str) -> None:
+        """Store a response in both tiers"""
+        self._remember(key, value)
+        try:
+            self._put_disk(key, value)
+        except (sqlite3.Error, OSError) as e:
+            self._disk_error("write", e)
+
+    def _get_disk(self, key: str) -> Optional[tuple]:
+        conn = self._connection()
+        if conn is None:
+            return None
+        row = conn.execute(
+            "SELECT value FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+            conn.commit()
+        return row
+
+    def _put_disk(self, key: str, value: str) -> None:
+        conn = self._connection()
+        if conn is None:
+            return
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, value, size, accessed) "
+            "VALUES (?, ?, ?, ?)",
+            (key, value, len(value.encode("utf-8")), time.time()),
+        )
+        conn.commit()
+
+        with self._lock:
+            self._writes_since_evict += 1
+            due = self._writes_since_evict >= self.evict_every
+            if due:
+                self._writes_since_evict = 0
+        if due:
+            self._evict_disk(conn)
+
+    def _disk_error(self, action: str, error: Exception) -> None:
+        """Log a SQLite fault and release any half-finished transaction"""
+        with self._lock:
+            self._stats["errors"] += 1
+        print(f"⚠️ LLM cache {action} skipped: {error}")
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+
+    def _remember(self, key: str, value: str) -> None:
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached responses"""
+        with self._lock:
+            self._memory.clear()
+        conn = self._connection()
+        if conn is not None:
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and hit rate"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+
+def _prompt_payload(input):
+    """Convert any LLM input (str, PromptValue, messages) to plain data"""
+    if hasattr(input, "to_messages"):
+        input = input.to_messages()
+    if isinstance(input, str):
+        return input
+    if isinstance(input, (list, tuple)):
+        payload = []
+        for message in input:
+            if isinstance(message, (list, tuple)):
+                payload.append([str(part) for part in message])
+            else:
+                payload.append(
+                    [getattr(message, "type", type(message).__name__),
+                     getattr(message, "content", str(message))]
+                )
+        return payload
+    return str(input)
+
+
+def _base_llm(llm):
+    """Unwrap gateway runnables to reach the configured model object"""
+    gateway = getattr(llm, "gateway", None)
+    return gateway.llm if gateway is not None else llm
+
+
+class CachedLLM(Runnable):
+    """Runnable that serves repeated prompts from a ResponseCache"""
+
+    def __init__(
+        self,
+        llm,
+        cache: ResponseCache,
+        validate: Optional[Callable[[str], bool]] = None,
+    ):
+        """
+        Args:
+            llm: LLM or gateway runnable to call on a miss
+            cache: ResponseCache instance
+            validate: Only responses for which this returns True are stored
+                (e.g. ones the chain's output parser accepts)
+        """
+        self.llm = llm
+        self.cache = cache
+        self.validate = validate
+
+    def _cacheable(self, content: str) -> bool:
+        if self.validate is None:
+            return True
+        try:
+            return bool(self.validate(content))
+        except Exception:
+            return False
+
+    @property
+    def model_name(self) -> str:
+        base = _base_llm(self.llm)
+        return str(
+            getattr(self.llm, "model_name", None)
+            or getattr(base, "model", None)
+            or type(base).__name__
+        )
+
+    def _generation_params(self, kwargs: dict) -> dict:
+        base = _base_llm(self.llm)
+        params = {
+            name: getattr(base, name)
+            for name in GENERATION_PARAMS
+            if getattr(base, name, None) is not None
+        }
+        params.update(kwargs)
+        return params
+
+    def invoke(self, input, config=None, **kwargs):
+        key = self.cache.make_key(
+            self.model_name, self._generation_params(kwargs), _prompt_payload(input)
+        )
+        content = self.cache.get(key)
+        if content is not None:
+            return AIMessage(content=content)
+
+        response = self.llm.invoke(input, config=config, **kwargs)
+        content = getattr(response, "content", None)
+        if isinstance(content, str) and self._cacheable(content):
+            self.cache.put(key, content)
+        return response
+
+
+def cached(
+    llm,
+    cache: Optional[ResponseCache] = None,
+    validate: Optional[Callable[[str], bool]] = None,
+) -> CachedLLM:
+    """
+    Enable response caching for one chain
+
+    Args:
+        llm: LLM or gateway runnable
+        cache: Cache to use (defaults to the shared response_cache)
+        validate: Predicate a response must pass to be cached
+
+    Returns:
+        CachedLLM wrapping ``llm``
+    """
+    if cache is None:
+        from .extended import response_cache
+
+        cache = response_cache
+    return CachedLLM(llm, cache, validate=validate)
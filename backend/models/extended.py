@@ -1,28 +1,124 @@
 from dotenv import load_dotenv
 import os
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_huggingface import HuggingFaceEndpointEmbeddings, HuggingFaceEmbeddings
+from pathlib import Path
+from .gateway import LLMGateway, PoolConfig
+from .cache import ResponseCache
+from .registry import LazyEmbeddings, model_registry
+from .fakes import FakeChatModel, FakeEmbeddings
+from lib.metrics import metrics
 
 # ---------------- Load environment variables ----------------
 load_dotenv()
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 HUGGINGFACEHUB_API_TOKEN = os.getenv("HUGGINGFACEHUB_API_TOKEN")
 
-# ---------------- Initialize the Gemini LLM ----------------
-gemini_llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", api_key=GOOGLE_API_KEY)
+# Model backends: "fake" swaps in deterministic offline stand-ins (models.fakes)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")  # gemini | fake
+EMBEDDINGS_BACKEND = os.getenv("EMBEDDINGS_BACKEND", "minilm")  # minilm | fake
+
+# ---------------- Initialize the LLM ----------------
+if LLM_BACKEND == "fake":
+    base_llm = FakeChatModel.from_env()
+else:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    base_llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", api_key=GOOGLE_API_KEY)
+
+# ---------------- Shared LLM gateway ----------------
+# All request paths should call the LLM through these pool-bound runnables so
+# quota, concurrency and retries are controlled in one place.
+llm_gateway = LLMGateway(
+    base_llm,
+    requests_per_second=float(os.getenv("LLM_REQUESTS_PER_SECOND", "5")),
+    burst=float(os.getenv("LLM_BURST", "10")),
+    pools={
+        "interactive": PoolConfig(
+            max_concurrency=int(os.getenv("LLM_INTERACTIVE_CONCURRENCY", "16"))
+        ),
+        "batch": PoolConfig(
+            max_concurrency=int(os.getenv("LLM_BATCH_CONCURRENCY", "4")),
+            reserve_fraction=float(os.getenv("LLM_BATCH_RESERVE", "0.25")),
+        ),
+    },
+    max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+)
+chat_llm = llm_gateway.for_caller("interactive")  # user-facing requests
+batch_llm = llm_gateway.for_caller("batch")  # re-ranking, offline chains
+
+# ---------------- LLM response cache ----------------
+# Shared by every chain wrapped with models.cached(); the SQLite tier is only
+# opened on first use.
+LLM_CACHE_DB = os.getenv(
+    "LLM_CACHE_DB",
+    str(Path(__file__).resolve().parent.parent / "db" / "llm_cache.sqlite3"),
+)
+response_cache = ResponseCache(
+    db_path=Path(LLM_CACHE_DB) if LLM_CACHE_DB else None,
+    memory_entries=int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "1024")),
+    max_db_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000")),
+    max_db_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+
+
+# ---------------- Metrics read at scrape time ----------------
+def _cache_lookups():
+    stats = response_cache.stats()
+    return [
+        ({"result": "memory_hit"}, stats["memory_hits"]),
+        ({"result": "disk_hit"}, stats["disk_hits"]),
+        ({"result": "miss"}, stats["misses"]),
+    ]
+
+
+metrics.callback(
+    "llm_cache_lookups_total",
+    "LLM response cache lookups by result",
+    _cache_lookups,
+    kind="counter",
+)
+metrics.callback(
+    "llm_cache_hit_ratio",
+    "LLM response cache hit rate since start",
+    lambda: response_cache.stats()["hit_rate"],
+)
+metrics.callback(
+    "llm_circuit_open",
+    "1 while the LLM circuit breaker rejects calls",
+    lambda: float(llm_gateway.breaker.state == llm_gateway.breaker.OPEN),
+)
+metrics.callback(
+    "llm_rate_limit_tokens_available",
+    "Tokens left in the shared LLM rate-limit bucket",
+    llm_gateway.bucket.available,
+)
 
 # ---------------- Initialize the Hugging Face Embeddings ----------------
+# from langchain_huggingface import HuggingFaceEndpointEmbeddings
 # hf_embeddings = HuggingFaceEndpointEmbeddings(
 #     model="sentence-transformers/all-MiniLM-L6-v2",  # Model name as a keyword argument
 #     task="feature-extraction",
 #     huggingfacehub_api_token=HUGGINGFACEHUB_API_TOKEN,
 # )
 
-# Load embeddings locally
-hf_embeddings = HuggingFaceEmbeddings(
-    model_name="sentence-transformers/all-MiniLM-L6-v2",  # Local model
-    model_kwargs={"device": "cpu"},  # or "cuda" if GPU is available
-)
+
+def _load_minilm():
+    # Imported here: sentence-transformers pulls in torch
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    return HuggingFaceEmbeddings(
+        model_name="sentence-transformers/all-MiniLM-L6-v2",  # Local model
+        model_kwargs={"device": "cpu"},  # or "cuda" if GPU is available
+    )
+
+
+# Load embeddings locally, on first use (see models.registry)
+if EMBEDDINGS_BACKEND == "fake":
+    EMBEDDINGS_MODEL = "fake-embeddings"
+    model_registry.register(EMBEDDINGS_MODEL, FakeEmbeddings.from_env)
+else:
+    EMBEDDINGS_MODEL = "minilm"
+    model_registry.register(EMBEDDINGS_MODEL, _load_minilm)
+hf_embeddings = LazyEmbeddings(model_registry, EMBEDDINGS_MODEL)
 
 if __name__ == "__main__":
     # # Test embeddings
@@ -30,6 +126,6 @@ if __name__ == "__main__":
     # print("Embedding vector (first 10 values):", vector[:10])
 
     # # Test LLM
-    # response = gemini_llm.invoke("Write a short greeting.")
-    # print("Gemini LLM response:", response.content)
+    # response = base_llm.invoke("Write a short greeting.")
+    # print("LLM response:", response.content)
     pass
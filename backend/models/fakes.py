@@ -0,0 +1,247 @@
+"""
+Fake Models Module
+Deterministic offline stand-ins for the chat LLM and the embedding model,
+selected with LLM_BACKEND=fake / EMBEDDINGS_BACKEND=fake.
+
+Outputs depend only on the input (and a seed), and latency follows a simple
+model (fixed latency + tokens / tokens-per-second), so benchmarks give
+repeatable numbers without network access or model weights.
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+__all__ = ["FakeChatModel", "FakeEmbeddings"]
+
+# Filler vocabulary used when the prompt has too few words to echo
+VOCABULARY = (
+    "the story model answer context river light city night morning quiet "
+    "bright system result question detail people garden window music"
+).split()
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def _rng(*parts: Any) -> random.Random:
+    """Random generator seeded by a stable hash of ``parts``"""
+    digest = hashlib.sha256("\x1f".join(map(str, parts)).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _message_text(messages: List[BaseMessage]) -> str:
+    return "\n".join(
+        m.content if isinstance(m.content, str) else json.dumps(m.content)
+        for m in messages
+    )
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic chat model with a latency/token-rate model
+
+    Replies reuse words from the prompt so summaries and answers overlap
+    the input like a real model's would. Special cases keep the app's
+    chains working: JSON mode (``response_schema``) returns a schema-valid
+    object and re-ranking prompts asking for a numeric score get a number.
+    """
+
+    model: str = "fake-chat"
+    latency: float = 0.0  # seconds before the first token
+    tokens_per_second: float = 0.0  # 0 = all tokens at once
+    response_tokens: int = 48
+    seed: int = 0
+
+    @classmethod
+    def from_env(cls) -> "FakeChatModel":
+        """Build from FAKE_LLM_* environment variables"""
+        return cls(
+            latency=float(os.getenv("FAKE_LLM_LATENCY", "0.0")),
+            tokens_per_second=float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "0")),
+            response_tokens=int(os.getenv("FAKE_LLM_RESPONSE_TOKENS", "48")),
+            seed=int(os.getenv("FAKE_LLM_SEED", "0")),
+        )
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    # ---------------- Deterministic replies ----------------
+    def _reply(self, prompt: str, **kwargs) -> str:
+        rng = _rng(self.seed, self.model, prompt)
+
+        schema = kwargs.get("response_schema")
+        if schema:
+            return json.dumps(self._sample_schema(schema, rng, prompt))
+        if "numeric score" in prompt.lower():
+            return str(rng.randint(0, 10))
+        return self._sentences(rng, prompt, self.response_tokens)
+
+    @staticmethod
+    def _sentences(rng: random.Random, prompt: str, tokens: int) -> str:
+        words = [w for w in WORD_PATTERN.findall(prompt.lower()) if len(w) > 3]
+        pool = words if len(set(words)) >= 8 else words + list(VOCABULARY)
+        sentences, sentence = [], []
+        for _ in range(max(1, tokens)):
+            sentence.append(rng.choice(pool))
+            if len(sentence) >= rng.randint(8, 14):
+                sentences.append(" ".join(sentence).capitalize() + ".")
+                sentence = []
+        if sentence:
+            sentences.append(" ".join(sentence).capitalize() + ".")
+        return " ".join(sentences)
+
+    def _sample_schema(self, schema: dict, rng: random.Random, prompt: str):
+        kind = schema.get("type")
+        if "enum" in schema:
+            return rng.choice(schema["enum"])
+        if kind == "object":
+            return {
+                name: self._sample_schema(sub, rng, prompt)
+                for name, sub in schema.get("properties", {}).items()
+            }
+        if kind == "array":
+            items = schema.get("items", {})
+            if items.get("type", "string") == "string" and "enum" not in items:
+                # String lists (keywords, tags) hold single words
+                return [self._sentences(rng, prompt, 1).rstrip(".") for _ in range(3)]
+            return [self._sample_schema(items, rng, prompt) for _ in range(3)]
+        if kind in ("integer", "number"):
+            return rng.randint(0, 10)
+        if kind == "boolean":
+            return rng.random() < 0.5
+        return self._sentences(rng, prompt, 12)
+
+    def _wait(self, tokens: int) -> None:
+        delay = self.latency
+        if self.tokens_per_second > 0:
+            delay += tokens / self.tokens_per_second
+        if delay > 0:
+            time.sleep(delay)
+
+    # ---------------- BaseChatModel interface ----------------
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt = _message_text(messages)
+        text = self._reply(prompt, **kwargs)
+        output_tokens = len(text.split())
+        self._wait(output_tokens)
+
+        input_tokens = len(prompt.split())
+        message = AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        text = self._reply(_message_text(messages), **kwargs)
+        self._wait(0)
+        for index, token in enumerate(text.split(" ")):
+            if self.tokens_per_second > 0:
+                time.sleep(1 / self.tokens_per_second)
+            content = token if index == 0 else " " + token
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=content))
+            if run_manager is not None:
+                run_manager.on_llm_new_token(content, chunk=chunk)
+            yield chunk
+
+
+class FakeEmbeddings(Embeddings):
+    """
+    Deterministic hashed bag-of-words embeddings
+
+    Words and word bigrams are hashed into a fixed number of signed buckets
+    and the vector is L2-normalized, so texts sharing words are similar and
+    retrieval benchmarks rank documents meaningfully.
+    """
+
+    def __init__(
+        self,
+        size: int = 384,
+        latency: float = 0.0,
+        seconds_per_text: float = 0.0,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            size: Vector dimension (384 matches all-MiniLM-L6-v2)
+            latency: Fixed seconds per embed call
+            seconds_per_text: Additional seconds per embedded text
+            seed: Changes the hashing, i.e. the whole vector space
+        """
+        self.size = size
+        self.latency = latency
+        self.seconds_per_text = seconds_per_text
+        self.seed = seed
+        self._key = str(seed).encode("utf-8")
+
+    @classmethod
+    def from_env(cls) -> "FakeEmbeddings":
+        """Build from FAKE_EMBEDDINGS_* environment variables"""
+        return cls(
+            size=int(os.getenv("FAKE_EMBEDDINGS_SIZE", "384")),
+            latency=float(os.getenv("FAKE_EMBEDDINGS_LATENCY", "0.0")),
+            seconds_per_text=float(os.getenv("FAKE_EMBEDDINGS_SECONDS_PER_TEXT", "0")),
+            seed=int(os.getenv("FAKE_EMBEDDINGS_SEED", "0")),
+        )
+
+    def _bucket(self, feature: str):
+        digest = hashlib.blake2b(
+            feature.encode("utf-8"), digest_size=8, key=self._key
+        ).digest()
+        value = int.from_bytes(digest, "big")
+        return value % self.size, 1.0 if (value >> 63) & 1 else -1.0
+
+    def _vector(self, text: str) -> List[float]:
+        words = WORD_PATTERN.findall(text.lower())
+        features = [(w, 1.0) for w in words]
+        features += [(f"{a} {b}", 0.5) for a, b in zip(words, words[1:])]
+
+        vector = [0.0] * self.size
+        for feature, weight in features:
+            index, sign = self._bucket(feature)
+            vector[index] += sign * weight
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm == 0:
+            vector[0] = 1.0
+            return vector
+        return [v / norm for v in vector]
+
+    def _wait(self, texts: int) -> None:
+        delay = self.latency + texts * self.seconds_per_text
+        if delay > 0:
+            time.sleep(delay)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self._wait(len(texts))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self._wait(1)
+        return self._vector(text)
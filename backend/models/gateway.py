@@ -0,0 +1,613 @@
+"""
+LLM Gateway Module
+Shared front door for every LLM call: rate limiting, concurrency pools,
+jittered retries and a circuit breaker
+"""
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from langchain_core.runnables import Runnable
+from lib.metrics import metrics
+from lib.server_timing import server_timing
+
+__all__ = [
+    "TokenBucket",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "PoolConfig",
+    "LLMGateway",
+    "GatewayLLM",
+    "is_retryable_error",
+]
+
+
+# ---------------- Errors ----------------
+class CircuitOpenError(RuntimeError):
+    """Raised when the circuit breaker rejects a call without contacting the LLM"""
+
+
+# HTTP / gRPC-mapped status codes of transient provider errors
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Exception class names of transient errors raised by provider SDKs
+# (google.api_core, openai, httpx, requests) that carry no status code
+RETRYABLE_ERROR_TYPES = frozenset(
+    {
+        "ResourceExhausted",
+        "TooManyRequests",
+        "ServiceUnavailable",
+        "InternalServerError",
+        "DeadlineExceeded",
+        "GatewayTimeout",
+        "BadGateway",
+        "RateLimitError",
+        "APITimeoutError",
+        "APIConnectionError",
+        "ConnectError",
+        "ConnectTimeout",
+        "ReadTimeout",
+        "RemoteProtocolError",
+    }
+)
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """HTTP status carried by an SDK exception, if any"""
+    response = getattr(error, "response", None)
+    for value in (
+        getattr(error, "status_code", None),
+        getattr(error, "code", None),
+        getattr(response, "status_code", None),
+    ):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    return None
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Decide whether an LLM error is transient and worth retrying
+
+    The exception and its causes (wrappers such as LangChain's re-raise the
+    SDK error ``from`` the original) are classified by type and status code;
+    the message text is never inspected.
+
+    Args:
+        error: Exception raised by the underlying LLM
+
+    Returns:
+        True for rate-limit, timeout, connection and 5xx errors
+    """
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        if isinstance(current, (TimeoutError, ConnectionError)):
+            return True
+        if any(cls.__name__ in RETRYABLE_ERROR_TYPES for cls in type(current).__mro__):
+            return True
+        if _status_code(current) in RETRYABLE_STATUS_CODES:
+            return True
+        current = current.__cause__ or current.__context__
+    return False
+
+
+# ---------------- Token bucket ----------------
+class TokenBucket:
+    """Thread-safe token bucket shared by all callers of one gateway"""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Initialize token bucket
+
+        Args:
+            rate: Tokens added per second (requests per second)
+            capacity: Maximum burst size
+            clock: Monotonic clock, injectable for tests
+            sleep: Sleep function, injectable for tests
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0, reserve: float = 0.0) -> float:
+        """
+        Try to take tokens without blocking
+
+        Args:
+            tokens: Number of tokens to take
+            reserve: Tokens that must remain in the bucket afterwards.
+                Low-priority callers use this to leave headroom for others.
+
+        Returns:
+            0.0 on success, otherwise the seconds to wait before retrying
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens - tokens >= reserve:
+                self._tokens -= tokens
+                return 0.0
+            missing = tokens + reserve - self._tokens
+            return missing / self.rate if self.rate > 0 else float("inf")
+
+    def refund(self, tokens: float = 1.0) -> None:
+        """Return tokens taken for a call that was never sent"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def acquire(
+        self,
+        tokens: float = 1.0,
+        reserve: float = 0.0,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Block until tokens are available
+
+        Args:
+            tokens: Number of tokens to take
+            reserve: Tokens that must remain in the bucket afterwards
+            timeout: Maximum seconds to wait (None waits forever)
+
+        Returns:
+            True if tokens were taken, False on timeout
+        """
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            wait = self.try_acquire(tokens, reserve)
+            if wait == 0.0:
+                return True
+            if deadline is not None:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            self.sleep(wait)
+
+    def available(self) -> float:
+        """Current number of tokens in the bucket"""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+# ---------------- Circuit breaker ----------------
+class CircuitBreaker:
+    """Opens after consecutive transient failures, half-opens after a cool-down"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize circuit breaker
+
+        Args:
+            failure_threshold: Consecutive failures before the circuit opens
+            reset_timeout: Seconds to stay open before allowing a trial call
+            clock: Monotonic clock, injectable for tests
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if (
+                self._state == self.OPEN
+                and self.clock() - self._opened_at >= self.reset_timeout
+            ):
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self.clock() - self._opened_at < self.reset_timeout:
+                return False
+            # Half-open: let exactly one trial call through
+            if self._trial_in_flight:
+                return False
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """End a call that says nothing about provider health (state unchanged)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if (
+                self._state == self.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+
+
+# ---------------- Concurrency pools ----------------
+class PoolConfig:
+    """Per-caller concurrency and quota settings"""
+
+    def __init__(self, max_concurrency: int, reserve_fraction: float = 0.0):
+        """
+        Args:
+            max_concurrency: Maximum in-flight calls for this pool
+            reserve_fraction: Fraction of the bucket capacity this pool must
+                leave untouched (0 for interactive traffic, >0 for batch jobs)
+        """
+        self.max_concurrency = max_concurrency
+        self.reserve_fraction = reserve_fraction
+
+
+# ---------------- Metrics ----------------
+LLM_REQUESTS = metrics.counter(
+    "llm_requests_total",
+    "LLM calls by caller pool and outcome",
+    ["pool", "outcome"],
+)
+LLM_LATENCY = metrics.histogram(
+    "llm_request_duration_seconds",
+    "LLM call latency per caller pool, including queueing and retries",
+    ["pool"],
+)
+LLM_RETRIES = metrics.counter(
+    "llm_retries_total", "Retried LLM attempts per caller pool", ["pool"]
+)
+LLM_TOKENS = metrics.counter(
+    "llm_tokens_total",
+    "Tokens reported by the provider per caller pool",
+    ["pool", "type"],
+)
+LLM_IN_FLIGHT = metrics.gauge(
+    "llm_in_flight", "LLM calls holding a pool slot", ["pool"]
+)
+
+
+def _record_usage(pool: str, message) -> None:
+    """Add a response's (or stream chunk's) token usage to the counters"""
+    usage = getattr(message, "usage_metadata", None)
+    if not usage:
+        return
+    for kind in ("input", "output"):
+        tokens = usage.get(f"{kind}_tokens")
+        if tokens:
+            LLM_TOKENS.inc(tokens, pool=pool, type=kind)
+
+
+DEFAULT_POOLS = {
+    "interactive": PoolConfig(max_concurrency=16, reserve_fraction=0.0),
+    "batch": PoolConfig(max_concurrency=4, reserve_fraction=0.25),
+}
+
+
+class LLMGateway:
+    """Wraps one LLM with shared rate limiting, retries and a circuit breaker"""
+
+    def __init__(
+        self,
+        llm,
+        requests_per_second: float = 5.0,
+        burst: Optional[float] = None,
+        pools: Optional[Dict[str, PoolConfig]] = None,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        acquire_timeout: Optional[float] = 60.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Optional[random.Random] = None,
+    ):
+        """
+        Initialize gateway
+
+        Args:
+            llm: Underlying LLM (anything with an ``invoke`` method)
+            requests_per_second: Sustained request quota
+            burst: Bucket capacity (defaults to one second of quota)
+            pools: Named concurrency pools, e.g. interactive vs batch
+            max_retries: Retries after the first attempt for transient errors
+            base_delay: Initial backoff in seconds
+            max_delay: Backoff cap in seconds
+            acquire_timeout: Max seconds to wait for a slot or a token
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds before an open circuit allows a trial call
+            clock: Monotonic clock, injectable for tests
+            sleep: Sleep function, injectable for tests
+            rng: Random source for jitter, injectable for tests
+        """
+        self.llm = llm
+        self.bucket = TokenBucket(
+            rate=requests_per_second,
+            capacity=burst if burst is not None else max(1.0, requests_per_second),
+            clock=clock,
+            sleep=sleep,
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold=failure_threshold,
+            reset_timeout=reset_timeout,
+            clock=clock,
+        )
+        self.pools = dict(pools or DEFAULT_POOLS)
+        self._semaphores = {
+            name: threading.BoundedSemaphore(cfg.max_concurrency)
+            for name, cfg in self.pools.items()
+        }
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.acquire_timeout = acquire_timeout
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+
+    @property
+    def model_name(self) -> str:
+        """Model identifier of the wrapped LLM"""
+        return str(
+            getattr(self.llm, "model", None)
+            or getattr(self.llm, "model_name", None)
+            or type(self.llm).__name__
+        )
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt (1-based)"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return self.rng.uniform(0, ceiling)
+
+    def for_caller(self, pool: str) -> "GatewayLLM":
+        """
+        Get a Runnable bound to one concurrency pool
+
+        Args:
+            pool: Pool name, e.g. "interactive" or "batch"
+
+        Returns:
+            GatewayLLM usable anywhere the raw LLM was used
+        """
+        if pool not in self.pools:
+            raise KeyError(f"Unknown LLM pool '{pool}'")
+        return GatewayLLM(self, pool)
+
+    def call(self, pool: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run ``fn`` under the pool's concurrency limit with quota, retries and
+        circuit breaking
+
+        Args:
+            pool: Pool name
+            fn: Zero-argument callable performing the actual LLM call
+
+        Returns:
+            Whatever ``fn`` returns
+        """
+        semaphore = self._semaphores[pool]
+        reserve = self.pools[pool].reserve_fraction * self.bucket.capacity
+
+        queued = time.perf_counter()
+        if not semaphore.acquire(timeout=self.acquire_timeout):
+            LLM_REQUESTS.inc(pool=pool, outcome="rejected")
+            raise TimeoutError(f"No free slot in LLM pool '{pool}'")
+        LLM_IN_FLIGHT.inc(pool=pool)
+        outcome = "error"
+        try:
+            attempt = 0
+            while True:
+                self._admit(pool, reserve)
+                if attempt == 0:
+                    # Request timings: pool slot + rate limit wait
+                    server_timing.record("llm-queue", time.perf_counter() - queued)
+                try:
+                    with server_timing.span("llm"):
+                        result = fn()
+                except Exception as e:
+                    attempt += 1
+                    self._handle_failure(pool, e, attempt)
+                    continue
+                self.breaker.record_success()
+                outcome = "success"
+                _record_usage(pool, result)
+                return result
+        finally:
+            semaphore.release()
+            self._observe(pool, outcome, queued)
+
+    def call_stream(self, pool: str, fn: Callable[[], Iterator]) -> Iterator:
+        """
+        Streaming counterpart of call(): the pool slot is held until the
+        stream is exhausted or closed. Failures are retried only before the
+        first chunk, since chunks already handed out can't be taken back.
+
+        Args:
+            pool: Pool name
+            fn: Zero-argument callable returning the chunk iterator
+
+        Yields:
+            Chunks produced by ``fn()``
+        """
+        semaphore = self._semaphores[pool]
+        reserve = self.pools[pool].reserve_fraction * self.bucket.capacity
+
+        queued = time.perf_counter()
+        if not semaphore.acquire(timeout=self.acquire_timeout):
+            LLM_REQUESTS.inc(pool=pool, outcome="rejected")
+            raise TimeoutError(f"No free slot in LLM pool '{pool}'")
+        LLM_IN_FLIGHT.inc(pool=pool)
+        outcome = "error"
+        try:
+            attempt = 0
+            while True:
+                self._admit(pool, reserve)
+                if attempt == 0:
+                    # Request timings: pool slot + rate limit wait
+                    server_timing.record("llm-queue", time.perf_counter() - queued)
+                started = False
+                start = time.perf_counter()
+                try:
+                    for chunk in fn():
+                        if not started:
+                            started = True
+                            server_timing.record(
+                                "llm-first", time.perf_counter() - start
+                            )
+                        _record_usage(pool, chunk)
+                        yield chunk
+                except GeneratorExit:
+                    # Consumer closed the stream. It can only stop us at a yield,
+                    # so the provider was answering: settle a half-open trial
+                    self.breaker.record_success()
+                    outcome = "cancelled"
+                    raise
+                except Exception as e:
+                    if started:
+                        self.breaker.record_failure()
+                        raise
+                    attempt += 1
+                    self._handle_failure(pool, e, attempt)
+                    continue
+                server_timing.record("llm", time.perf_counter() - start)
+                self.breaker.record_success()
+                outcome = "success"
+                return
+        finally:
+            semaphore.release()
+            self._observe(pool, outcome, queued)
+
+    @staticmethod
+    def _observe(pool: str, outcome: str, started: float) -> None:
+        """Record a finished call (slot already released) in the metrics"""
+        LLM_IN_FLIGHT.dec(pool=pool)
+        LLM_REQUESTS.inc(pool=pool, outcome=outcome)
+        LLM_LATENCY.observe(time.perf_counter() - started, pool=pool)
+
+    def _admit(self, pool: str, reserve: float) -> None:
+        """Take a token from the bucket, then check the circuit"""
+        # The token comes first: a half-open breaker hands out its single trial
+        # in allow(), so nothing may fail between that and the provider call
+        if not self.bucket.acquire(reserve=reserve, timeout=self.acquire_timeout):
+            raise TimeoutError(f"LLM rate limit wait exceeded for pool '{pool}'")
+        if not self.breaker.allow():
+            self.bucket.refund()
+            raise CircuitOpenError(
+                "LLM circuit is open after repeated failures; try again later"
+            )
+
+    def _handle_failure(self, pool: str, error: Exception, attempt: int) -> None:
+        """Record a failed attempt; re-raise it unless it should be retried"""
+        if not is_retryable_error(error):
+            # Caller-side errors say nothing about provider health: keep the
+            # failure count, but let a half-open circuit try another call
+            self.breaker.release_trial()
+            raise error
+        self.breaker.record_failure()
+        if attempt > self.max_retries:
+            raise error
+        LLM_RETRIES.inc(pool=pool)
+        delay = self.backoff_delay(attempt)
+        print(
+            f"LLM call failed in pool '{pool}' ({error}); "
+            f"retry {attempt}/{self.max_retries} in {delay:.2f}s"
+        )
+        self.sleep(delay)
+
+    def status(self) -> dict:
+        """Snapshot of gateway state"""
+        return {
+            "model": self.model_name,
+            "circuit": self.breaker.state,
+            "tokens_available": round(self.bucket.available(), 2),
+            "pools": {
+                name: cfg.max_concurrency for name, cfg in self.pools.items()
+            },
+        }
+
+
+class GatewayLLM(Runnable):
+    """Runnable view of an LLMGateway for one caller pool"""
+
+    def __init__(self, gateway: LLMGateway, pool: str):
+        self.gateway = gateway
+        self.pool = pool
+
+    @property
+    def model_name(self) -> str:
+        return self.gateway.model_name
+
+    def invoke(self, input, config=None, **kwargs):
+        return self.gateway.call(
+            self.pool, lambda: self.gateway.llm.invoke(input, config=config, **kwargs)
+        )
+
+    def stream(self, input, config=None, **kwargs):
+        yield from self.gateway.call_stream(
+            self.pool, lambda: self.gateway.llm.stream(input, config=config, **kwargs)
+        )
+
+
+if __name__ == "__main__":
+    # Exercise the gateway against a local fake LLM that fails with 429 twice
+    class RateLimited(RuntimeError):
+        status_code = 429
+
+    class FlakyLLM:
+        model = "fake-flaky"
+
+        def __init__(self):
+            self.calls = 0
+
+        def invoke(self, input, config=None, **kwargs):
+            self.calls += 1
+            if self.calls <= 2:
+                raise RateLimited("Resource has been exhausted")
+            return f"echo: {input}"
+
+    fake = FlakyLLM()
+    gateway = LLMGateway(fake, requests_per_second=2, base_delay=0.05)
+    print(gateway.for_caller("interactive").invoke("hello"))
+    print(f"Calls made: {fake.calls}, status: {gateway.status()}")
@@ -0,0 +1,278 @@
+"""
+Model Registry Module
+Loads heavy models on first use or in a background warm-up thread and
+reports what is loaded
+"""
+
+import gc
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+from langchain_core.embeddings import Embeddings
+from lib.metrics import metrics
+
+__all__ = ["ModelRegistry", "LazyEmbeddings", "model_registry"]
+
+EMBEDDED_TEXTS = metrics.counter(
+    "embedding_texts_total", "Texts embedded, by model and operation", ["model", "op"]
+)
+EMBEDDING_LATENCY = metrics.histogram(
+    "embedding_duration_seconds",
+    "Embedding call latency, by model and operation",
+    ["model", "op"],
+)
+
+
+class _Entry:
+    """Loader plus load state for one registered model"""
+
+    def __init__(self, name: str, loader: Callable[[], object]):
+        self.name = name
+        self.loader = loader
+        self.model = None
+        self.state = "pending"  # pending -> loading -> ready | failed
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """Thread-safe registry of lazily loaded models"""
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._warm_targets: List[str] = []
+        self._warm_thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, loader: Callable[[], object]) -> None:
+        """
+        Register a model loader (nothing is loaded yet)
+
+        Args:
+            name: Model name, e.g. "whisper"
+            loader: Zero-argument callable returning the loaded model
+        """
+        if name not in self._entries:
+            self._entries[name] = _Entry(name, loader)
+
+    def names(self) -> List[str]:
+        return list(self._entries)
+
+    def get(self, name: str):
+        """
+        Get a model, loading it on first use
+
+        Args:
+            name: Registered model name
+
+        Returns:
+            The loaded model
+        """
+        entry = self._entries[name]
+        if entry.state == "ready":
+            return entry.model
+
+        with entry.lock:
+            if entry.state != "ready":
+                entry.state = "loading"
+                print(f"⏳ Loading model '{name}'...")
+                start = time.perf_counter()
+                try:
+                    entry.model = entry.loader()
+                except Exception as e:
+                    entry.state = "failed"
+                    entry.error = str(e)
+                    print(f"❌ Failed to load model '{name}': {e}")
+                    raise
+                entry.load_seconds = round(time.perf_counter() - start, 2)
+                entry.error = None
+                entry.state = "ready"
+                print(f"✅ Model '{name}' loaded in {entry.load_seconds}s")
+        return entry.model
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return entry is not None and entry.state == "ready"
+
+    def warm_up(
+        self, names: Union[str, Iterable[str], None] = "all", background: bool = True
+    ) -> Optional[threading.Thread]:
+        """
+        Load models ahead of the first request
+
+        Args:
+            names: "all", a comma separated string or an iterable of names
+            background: Load in a daemon thread instead of blocking
+
+        Returns:
+            The warm-up thread when background is True
+        """
+        if not names:
+            return None
+        if isinstance(names, str):
+            names = (
+                self.names()
+                if names.strip().lower() == "all"
+                else [n.strip() for n in names.split(",") if n.strip()]
+            )
+        targets = [n for n in names if n in self._entries]
+        self._warm_targets = targets
+
+        def _load_all():
+            for name in targets:
+                try:
+                    self.get(name)
+                except Exception:
+                    # Failure is recorded in status(); keep warming the rest
+                    pass
+
+        if not background:
+            _load_all()
+            return None
+        self._warm_thread = threading.Thread(
+            target=_load_all, name="model-warm-up", daemon=True
+        )
+        self._warm_thread.start()
+        return self._warm_thread
+
+    def ready(self) -> bool:
+        """True once every warm-up target is loaded"""
+        return all(self.is_loaded(name) for name in self._warm_targets)
+
+    # ---------------- Pre-fork serving ----------------
+    def prepare_for_fork(
+        self, names: Union[str, Iterable[str], None] = "all"
+    ) -> None:
+        """
+        Load models in the master process so forked workers share the weights
+        copy-on-write
+
+        Must run before any worker is forked and before any other thread
+        touches torch.
+
+        Args:
+            names: Models to preload ("all", comma separated or iterable)
+        """
+        # Rust tokenizers and OpenMP thread pools that exist at fork time
+        # deadlock in the children, so keep the master single-threaded
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+        torch = _import_torch()
+        if torch is not None:
+            torch.set_num_threads(1)
+
+        self.warm_up(names, background=False)
+        for name in self._warm_targets:
+            if self.is_loaded(name):
+                _freeze_weights(self._entries[name].model)
+
+        # Move everything allocated so far into the permanent generation so
+        # the workers' garbage collector never writes to those pages
+        gc.collect()
+        gc.freeze()
+
+    def after_fork(self, torch_threads: Optional[int] = None) -> None:
+        """
+        Re-initialize per-process state in a freshly forked worker
+
+        Args:
+            torch_threads: Intra-op threads for this worker (None keeps default)
+        """
+        for entry in self._entries.values():
+            entry.lock = threading.Lock()
+        self._warm_thread = None
+        random.seed()
+
+        torch = _import_torch()
+        if torch is not None and torch_threads:
+            torch.set_num_threads(torch_threads)
+
+    def status(self) -> dict:
+        """Load state of every registered model"""
+        return {
+            "ready": self.ready(),
+            "warm_up": list(self._warm_targets),
+            "models": {
+                name: {
+                    "state": entry.state,
+                    "load_seconds": entry.load_seconds,
+                    "error": entry.error,
+                }
+                for name, entry in self._entries.items()
+            },
+        }
+
+
+def _import_torch():
+    """Return torch if it is installed, without importing it at module load"""
+    try:
+        import torch
+    except ImportError:
+        return None
+    return torch
+
+
+def _freeze_weights(model) -> None:
+    """
+    Put torch modules reachable from a loaded model into inference mode so
+    workers only ever read the shared weight pages
+    """
+    torch = _import_torch()
+    if torch is None:
+        return
+
+    # Pools (e.g. services.tts_pool.TTSPool) hold several loaded instances
+    models = getattr(model, "instances", None) or [model]
+
+    candidates = []
+    for instance in models:
+        candidates.append(instance)
+        # Coqui TTS keeps its network on the synthesizer, LangChain's
+        # HuggingFaceEmbeddings keeps the SentenceTransformer on _client
+        synthesizer = getattr(instance, "synthesizer", None)
+        if synthesizer is not None:
+            candidates.append(getattr(synthesizer, "tts_model", None))
+            candidates.append(getattr(synthesizer, "vocoder_model", None))
+        candidates.append(getattr(instance, "_client", None))
+
+    for candidate in candidates:
+        if isinstance(candidate, torch.nn.Module):
+            candidate.eval()
+            candidate.requires_grad_(False)
+
+
+class LazyEmbeddings(Embeddings):
+    """Embeddings proxy that loads the real model from the registry on first use"""
+
+    def __init__(self, registry: ModelRegistry, name: str):
+        self.registry = registry
+        self.name = name
+
+    @property
+    def model(self) -> Embeddings:
+        return self.registry.get(self.name)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        model = self.model
+        start = time.perf_counter()
+        vectors = model.embed_documents(texts)
+        self._observe("documents", len(texts), start)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        model = self.model
+        start = time.perf_counter()
+        vector = model.embed_query(text)
+        self._observe("query", 1, start)
+        return vector
+
+    def _observe(self, op: str, texts: int, start: float) -> None:
+        # Model loading is excluded: the clock starts once the model is loaded
+        EMBEDDED_TEXTS.inc(texts, model=self.name, op=op)
+        EMBEDDING_LATENCY.observe(time.perf_counter() - start, model=self.name, op=op)
+
+
+# Process-wide registry shared by services and routes
+model_registry = ModelRegistry()
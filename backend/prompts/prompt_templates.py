@@ -16,7 +16,7 @@ from langchain.prompts import (
     HumanMessagePromptTemplate,
 )
 from langchain.prompts.few_shot import FewShotPromptTemplate
-from models import gemini_llm
+from models import chat_llm
 
 # -------------------------------
 # BASIC PROMPT TEMPLATES
@@ -151,7 +151,7 @@ print("\n--- INVOKE WITHOUT LLM ---")
 print(invoke_without_llm)
 
 # Invoke with LLM → produces AI response
-ai_response = gemini_llm.invoke(formatted_messages)
+ai_response = chat_llm.invoke(formatted_messages)
 print("\n--- INVOKE WITH LLM ---")
 print(ai_response.content)
 
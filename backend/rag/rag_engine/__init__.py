@@ -5,7 +5,7 @@ Export all main classes for easy importing
 
 from .document_loader import DocumentLoader
 from .text_chunker import TextChunker
-from .vector_store import VectorStore
+from .vector_store import HNSWConfig, VectorStore
 from .retriever import Retriever
 from .answer_generator import AnswerGenerator
 from .document_ingestor import DocumentIngestor
@@ -14,6 +14,7 @@ from .rag_pipeline import RAGPipeline
 __all__ = [
     "DocumentLoader",
     "TextChunker",
+    "HNSWConfig",
     "VectorStore",
     "Retriever",
     "AnswerGenerator",
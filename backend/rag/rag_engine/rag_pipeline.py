@@ -5,7 +5,8 @@ Main orchestration class that brings all components together
 
 from pathlib import Path
 from typing import Optional
-from .vector_store import VectorStore
+from lib.tracing import tracer
+from .vector_store import HNSWConfig, VectorStore
 from .document_ingestor import DocumentIngestor
 from .retriever import Retriever
 from .answer_generator import AnswerGenerator
@@ -21,6 +22,8 @@ class RAGPipeline:
         llm,
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
+        rerank_llm=None,
+        hnsw: Optional[HNSWConfig] = None,
     ):
         """
         Initialize RAG pipeline with all components
@@ -31,6 +34,9 @@ class RAGPipeline:
             llm: Language model for generation
             chunk_size: Size of text chunks
             chunk_overlap: Overlap between chunks
+            rerank_llm: Language model for re-ranking (defaults to llm)
+            hnsw: Vector index settings (space, M, ef_construction, ef_search)
+                used when the database is created; see VectorStore
         """
         # Initialize folders
         self.db_folder = db_folder
@@ -38,7 +44,7 @@ class RAGPipeline:
         self.db_folder.mkdir(parents=True, exist_ok=True)
 
         # Initialize components
-        self.vector_store = VectorStore(db_folder, embedding_function)
+        self.vector_store = VectorStore(db_folder, embedding_function, hnsw=hnsw)
         self.ingestor = DocumentIngestor(
             vector_store=self.vector_store,
             processed_folder=self.processed_folder,
@@ -48,7 +54,7 @@ class RAGPipeline:
         self.retriever = Retriever(
             vector_store=self.vector_store,
             embedding_function=embedding_function,
-            llm=llm,
+            llm=rerank_llm or llm,
         )
         self.generator = AnswerGenerator(llm=llm)
 
@@ -72,6 +78,8 @@ class RAGPipeline:
         k: int = 3,
         use_reranking: bool = False,
         rerank_top_k: Optional[int] = None,
+        multi_query: bool = False,
+        num_queries: int = 3,
     ) -> str:
         """
         Query the RAG pipeline
@@ -81,20 +89,31 @@ class RAGPipeline:
             k: Number of chunks to retrieve
             use_reranking: Whether to use LLM-based re-ranking
             rerank_top_k: Number of chunks to keep after re-ranking
+            multi_query: Also search LLM rewrites of the question and fuse
+                the results
+            num_queries: Number of rewrites in multi-query mode
 
         Returns:
             Generated answer string
         """
         # Retrieve relevant chunks
-        chunks = self.retriever.retrieve(question, k=k)
+        with tracer.span("rag:retrieval"):
+            if multi_query:
+                chunks = self.retriever.retrieve_multi(
+                    question, k=k, num_queries=num_queries
+                )
+            else:
+                chunks = self.retriever.retrieve(question, k=k)
 
         # Optional re-ranking
         if use_reranking:
             top_k = rerank_top_k if rerank_top_k else k
-            chunks = self.retriever.re_rank(question, chunks, top_k=top_k)
+            with tracer.span("rag:rerank"):
+                chunks = self.retriever.re_rank(question, chunks, top_k=top_k)
 
         # Generate answer
-        answer = self.generator.generate_answer(question, chunks)
+        with tracer.span("rag:generation"):
+            answer = self.generator.generate_answer(question, chunks)
 
         return answer
 
@@ -107,6 +126,7 @@ class RAGPipeline:
         """
         return {
             "vector_db_initialized": self.vector_store.is_initialized(),
+            "hnsw": self.vector_store.hnsw.as_dict(),
             "db_folder": str(self.db_folder),
             "processed_folder": str(self.processed_folder),
         }
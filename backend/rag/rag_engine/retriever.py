@@ -1,10 +1,79 @@
 """
 Retriever Module
-Handles document retrieval and re-ranking
+Handles document retrieval, multi-query retrieval and re-ranking
 """
 
-from typing import List
+import contextvars
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Sequence
 from langchain.schema import Document
+from models import CachedLLM, cached
+
+# Prompt used to generate alternative phrasings for multi-query retrieval
+MULTI_QUERY_PROMPT = (
+    "Rewrite the question below in {n} different ways, using the words a "
+    "document answering it might use. Keep the meaning of the question.\n"
+    "Return one rewrite per line, without numbering or extra text.\n\n"
+    "Question: {question}"
+)
+
+# Reciprocal rank fusion constant (damps the weight of top ranks)
+RRF_K = 60
+
+# Bullets / numbering LLMs put in front of list lines anyway
+LIST_MARKER = re.compile(r"^\s*(?:[-*\u2022]|\d+[.)])\s*")
+
+# Threads running multi-query vector searches, shared by every Retriever
+SEARCH_WORKERS = int(os.getenv("RETRIEVER_SEARCH_WORKERS", "8"))
+
+_search_executor = None
+_search_executor_lock = threading.Lock()
+
+
+def _get_search_executor() -> ThreadPoolExecutor:
+    global _search_executor
+    with _search_executor_lock:
+        if _search_executor is None:
+            _search_executor = ThreadPoolExecutor(
+                max_workers=SEARCH_WORKERS, thread_name_prefix="retriever"
+            )
+        return _search_executor
+
+
+def chunk_key(doc: Document) -> tuple:
+    """Identity of a chunk: (source, chunk_index), or its text if untagged"""
+    metadata = doc.metadata or {}
+    if "source" in metadata and "chunk_index" in metadata:
+        return (metadata["source"], metadata["chunk_index"])
+    return ("", doc.page_content)
+
+
+def reciprocal_rank_fusion(
+    result_lists: Sequence[List[Document]], k: int, rrf_k: int = RRF_K
+) -> List[Document]:
+    """
+    Fuse ranked result lists, de-duplicating chunks
+
+    Args:
+        result_lists: Ranked results of each query (original query first)
+        k: Number of chunks to return
+        rrf_k: RRF constant
+
+    Returns:
+        Top-k chunks by summed 1 / (rrf_k + rank); ties keep first-seen order
+    """
+    scores = {}
+    documents = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results, start=1):
+            key = chunk_key(doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+            documents.setdefault(key, doc)
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    return [documents[key] for key in ranked[:k]]
 
 
 class Retriever:
@@ -17,11 +86,15 @@ class Retriever:
         Args:
             vector_store: VectorStore instance
             embedding_function: Embedding model
-            llm: Language model for re-ranking (optional)
+            llm: Language model for re-ranking and query rewrites (optional)
         """
         self.vector_store = vector_store
         self.embedding_function = embedding_function
         self.llm = llm
+        # Rewrites of a repeated question come from the response cache
+        self.query_llm = llm
+        if llm is not None and not isinstance(llm, CachedLLM):
+            self.query_llm = cached(llm)
 
     def retrieve(self, query: str, k: int = 3) -> List[Document]:
         """
@@ -41,6 +114,75 @@ class Retriever:
         chunks = self.vector_store.similarity_search_by_vector(query_vector, k=k)
         return chunks
 
+    def generate_queries(self, query: str, num_queries: int = 3) -> List[str]:
+        """
+        Generate alternative phrasings of a query with the LLM
+
+        Args:
+            query: User query string
+            num_queries: Number of rewrites to ask for
+
+        Returns:
+            The original query followed by up to num_queries distinct rewrites
+        """
+        if self.query_llm is None or num_queries <= 0:
+            return [query]
+
+        prompt = MULTI_QUERY_PROMPT.format(n=num_queries, question=query)
+        try:
+            lines = self.query_llm.invoke(prompt).content.splitlines()
+        except Exception as e:
+            print(f"Query rewriting failed, using the original query only: {e}")
+            return [query]
+
+        queries = [query]
+        seen = {query.strip().lower()}
+        for line in lines:
+            rewrite = LIST_MARKER.sub("", line).strip().strip('"')
+            if rewrite and rewrite.lower() not in seen:
+                seen.add(rewrite.lower())
+                queries.append(rewrite)
+            if len(queries) > num_queries:
+                break
+        return queries
+
+    def retrieve_multi(
+        self, query: str, k: int = 3, num_queries: int = 3
+    ) -> List[Document]:
+        """
+        Retrieve with the query and LLM rewrites of it, fused into one list
+
+        The original query is searched while the LLM writes the rewrites; the
+        rewrites are then embedded in one batch and searched concurrently, so
+        the extra recall costs about one LLM call plus one search.
+
+        Args:
+            query: User query string
+            k: Number of chunks to return
+            num_queries: Number of rewrites to search in addition to the query
+
+        Returns:
+            Top-k chunks by reciprocal rank fusion, de-duplicated by
+            (source, chunk_index)
+        """
+        original = self._submit(self.retrieve, query, k)
+        rewrites = self.generate_queries(query, num_queries)[1:]
+        if not rewrites:
+            return original.result()
+
+        # The same model embeds queries and documents (sentence-transformers)
+        vectors = self.embedding_function.embed_documents(rewrites)
+        searches = [original] + [
+            self._submit(self.vector_store.similarity_search_by_vector, vector, k)
+            for vector in vectors
+        ]
+        return reciprocal_rank_fusion([search.result() for search in searches], k)
+
+    def _submit(self, fn, *args):
+        # Copy the context so request timings see the pooled searches
+        executor = _get_search_executor()
+        return executor.submit(contextvars.copy_context().run, fn, *args)
+
     def re_rank(
         self, query: str, retrieved_chunks: List[Document], top_k: int = 3
     ) -> List[Document]:
@@ -1,28 +1,124 @@
 """
 Vector Store Module
-Manages Chroma vector database operations
+Manages Chroma vector database operations and HNSW index settings
 """
 
+import time
 from pathlib import Path
 from typing import List, Optional
 from langchain_chroma import Chroma
 from langchain.schema import Document
+from lib.metrics import metrics
+
+SEARCH_LATENCY = metrics.histogram(
+    "vector_search_duration_seconds", "Vector database similarity search latency"
+)
+
+# Distance functions supported by Chroma's HNSW index
+HNSW_SPACES = ("l2", "cosine", "ip")
+
+
+class HNSWConfig:
+    """HNSW index settings, stored in the Chroma collection metadata"""
+
+    def __init__(
+        self,
+        space: str = "l2",
+        m: int = 16,
+        ef_construction: int = 100,
+        ef_search: int = 10,
+    ):
+        """
+        Args:
+            space: Distance function ("l2", "cosine" or "ip")
+            m: Graph links per node (more = better recall, more memory)
+            ef_construction: Candidate list size while building the index
+            ef_search: Candidate list size while searching (recall vs latency)
+
+        Defaults are Chroma's own, so an unconfigured store behaves as before.
+        """
+        if space not in HNSW_SPACES:
+            raise ValueError(f"space must be one of {', '.join(HNSW_SPACES)}")
+        self.space = space
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+
+    def to_metadata(self) -> dict:
+        """Chroma collection metadata (hnsw:* keys)"""
+        return {
+            "hnsw:space": self.space,
+            "hnsw:M": self.m,
+            "hnsw:construction_ef": self.ef_construction,
+            "hnsw:search_ef": self.ef_search,
+        }
+
+    @classmethod
+    def from_metadata(cls, metadata: Optional[dict]) -> "HNSWConfig":
+        """Settings of an existing collection (Chroma defaults for missing keys)"""
+        metadata = metadata or {}
+        defaults = cls()
+        return cls(
+            space=metadata.get("hnsw:space", defaults.space),
+            m=int(metadata.get("hnsw:M", defaults.m)),
+            ef_construction=int(
+                metadata.get("hnsw:construction_ef", defaults.ef_construction)
+            ),
+            ef_search=int(metadata.get("hnsw:search_ef", defaults.ef_search)),
+        )
+
+    @classmethod
+    def from_collection(cls, collection) -> "HNSWConfig":
+        """Settings of a Chroma collection, from its configuration when it has one"""
+        configuration = getattr(collection, "configuration", None)
+        hnsw = configuration.get("hnsw") if isinstance(configuration, dict) else None
+        if not hnsw:
+            # Chroma < 1.0: settings only live in the hnsw:* metadata
+            return cls.from_metadata(collection.metadata)
+        stored = cls.from_metadata(collection.metadata)
+        return cls(
+            space=hnsw.get("space") or stored.space,
+            m=int(hnsw.get("max_neighbors") or stored.m),
+            ef_construction=int(hnsw.get("ef_construction") or stored.ef_construction),
+            ef_search=int(hnsw.get("ef_search") or stored.ef_search),
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "space": self.space,
+            "m": self.m,
+            "ef_construction": self.ef_construction,
+            "ef_search": self.ef_search,
+        }
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, HNSWConfig) and self.as_dict() == other.as_dict()
+
+    def __repr__(self) -> str:
+        args = ", ".join(f"{k}={v!r}" for k, v in self.as_dict().items())
+        return f"HNSWConfig({args})"
 
 
 class VectorStore:
     """Manages vector database operations"""
 
-    def __init__(self, db_folder: Path, embedding_function):
+    def __init__(
+        self, db_folder: Path, embedding_function, hnsw: Optional[HNSWConfig] = None
+    ):
         """
         Initialize vector store
 
         Args:
             db_folder: Path to database folder
             embedding_function: Embedding model to use
+            hnsw: Index settings for a new collection (defaults to Chroma's).
+                An existing collection keeps the settings it was built with;
+                only ef_search can be changed afterwards.
         """
         self.db_folder = db_folder
         self.embedding_function = embedding_function
         self.vector_db: Optional[Chroma] = None
+        self.hnsw = hnsw or HNSWConfig()
 
         # Initialize if database exists
         if (db_folder / "chroma.sqlite3").exists():
@@ -30,6 +126,49 @@ class VectorStore:
                 persist_directory=str(db_folder), embedding_function=embedding_function
             )
             print(f"Loaded existing vector database from {db_folder}")
+            self._load_hnsw(hnsw)
+
+    def _load_hnsw(self, requested: Optional[HNSWConfig]) -> None:
+        """Adopt the persisted index settings, applying a requested ef_search"""
+        stored = HNSWConfig.from_collection(self.vector_db._collection)
+        self.hnsw = stored
+        if requested is None or requested == stored:
+            return
+
+        built = ("space", "m", "ef_construction")
+        if any(getattr(requested, name) != getattr(stored, name) for name in built):
+            print(
+                "HNSW space/M/ef_construction are fixed when the index is built; "
+                f"keeping stored settings {stored} "
+                "(rebuild the database to change them)"
+            )
+        if requested.ef_search != stored.ef_search:
+            self.set_ef_search(requested.ef_search)
+
+    def set_ef_search(self, ef_search: int) -> None:
+        """
+        Change the search-time candidate list size of the collection (persisted)
+
+        Args:
+            ef_search: New ef_search value
+
+        Raises:
+            Whatever Chroma raises when the collection cannot be modified
+        """
+        if self.vector_db is None:
+            self.hnsw.ef_search = ef_search
+            return
+        collection = self.vector_db._collection
+        if hasattr(collection, "configuration"):
+            collection.modify(configuration={"hnsw": {"ef_search": ef_search}})
+        else:
+            # Chroma < 1.0 rejects modify() with hnsw:space (even unchanged)
+            metadata = dict(collection.metadata or {})
+            metadata.pop("hnsw:space", None)
+            metadata["hnsw:search_ef"] = ef_search
+            collection.modify(metadata=metadata)
+        self.hnsw.ef_search = ef_search
+        print(f"HNSW ef_search set to {ef_search}")
 
     def add_documents(self, chunks: List[Document]) -> None:
         """
@@ -44,8 +183,11 @@ class VectorStore:
                 documents=chunks,
                 embedding=self.embedding_function,
                 persist_directory=str(self.db_folder),
+                collection_metadata=self.hnsw.to_metadata(),
+            )
+            print(
+                f"Created new vector database with {len(chunks)} chunks ({self.hnsw})"
             )
-            print(f"Created new vector database with {len(chunks)} chunks")
         else:
             # Add to existing database
             self.vector_db.add_documents(chunks)
@@ -67,7 +209,10 @@ class VectorStore:
         if self.vector_db is None:
             raise ValueError("Vector database not initialized. Ingest documents first.")
 
-        return self.vector_db.similarity_search_by_vector(query_vector, k=k)
+        start = time.perf_counter()
+        results = self.vector_db.similarity_search_by_vector(query_vector, k=k)
+        SEARCH_LATENCY.observe(time.perf_counter() - start)
+        return results
 
     def is_initialized(self) -> bool:
         """Check if vector database is initialized"""
@@ -5,7 +5,7 @@ Place this file in the Backend root folder
 """
 
 from pathlib import Path
-from models import hf_embeddings, gemini_llm
+from models import hf_embeddings, chat_llm, batch_llm, cached
 from .rag_engine import RAGPipeline
 from lib import pretty_print
 
@@ -26,7 +26,8 @@ def main():
     pipeline = RAGPipeline(
         db_folder=DB_FOLDER,
         embedding_function=hf_embeddings,
-        llm=gemini_llm,
+        llm=chat_llm,
+        rerank_llm=cached(batch_llm),  # relevance prompts are deterministic
         chunk_size=1000,
         chunk_overlap=200,
     )
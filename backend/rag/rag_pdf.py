@@ -3,7 +3,7 @@ from shutil import copy2
 from langchain_community.document_loaders import UnstructuredPDFLoader, PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
-from models import hf_embeddings, gemini_llm
+from models import hf_embeddings, chat_llm, batch_llm, cached
 from lib import pretty_print
 from langchain.prompts import (
     ChatPromptTemplate,
@@ -22,6 +22,9 @@ DB_FOLDER = BASE_DIR / "db" / "pdf"
 PROCESSED_FOLDER = DB_FOLDER / "processed"
 PROCESSED_FOLDER.mkdir(parents=True, exist_ok=True)
 
+# Relevance prompts are pure functions of (question, chunk), so cache them
+rerank_llm = cached(batch_llm)
+
 # ---------------- Initialize vector DB if exists ----------------
 vector_db = (
     Chroma(persist_directory=str(DB_FOLDER), embedding_function=hf_embeddings)
@@ -130,7 +133,7 @@ def re_rank_chunks(query: str, retrieved_chunks, top_k=3):
         """
         try:
             # Call the LLM to get relevance score
-            score_str = gemini_llm.invoke(prompt)
+            score_str = rerank_llm.invoke(prompt)
             score = float(score_str.content.strip())
         except Exception as e:
             print("LLM scoring failed, defaulting score=0:", e)
@@ -162,7 +165,7 @@ def clean_chunk_text(text):
     return text
 
 
-def llm_answer(query: str, top_chunks, llm=gemini_llm) -> str:
+def llm_answer(query: str, top_chunks, llm=chat_llm) -> str:
     """
     Generate RAG answer using ChatPromptTemplate (proper kwargs for format_messages)
     """
@@ -221,6 +224,6 @@ chunks = retrieve_top_chunks(query_vector, k=2)
 # # Step 2: Re-rank using LLM ---> SKIP FOR NOW
 # chunks = re_rank_chunks(user_question, chunks, top_k=3)
 
-final_answer = llm_answer(query=user_question, top_chunks=chunks, llm=gemini_llm)
+final_answer = llm_answer(query=user_question, top_chunks=chunks, llm=chat_llm)
 
 pretty_print(f"Question: {user_question}\n\nAnswer: {final_answer}")
@@ -3,6 +3,8 @@
 from flask import Flask
 from .text import text_bp
 from .speech import speech_bp
+from .health import health_bp
+from .metrics import metrics_bp
 
 # Base prefix for all AI endpoints
 AI_PREFIX = "/ai"
@@ -15,3 +17,6 @@ def register_blueprints(app: Flask):
     """
     app.register_blueprint(text_bp, url_prefix=f"{AI_PREFIX}/text")
     app.register_blueprint(speech_bp, url_prefix=f"{AI_PREFIX}/audio")
+    app.register_blueprint(health_bp, url_prefix=f"{AI_PREFIX}/health")
+    # Scrapers expect /metrics at the root
+    app.register_blueprint(metrics_bp)
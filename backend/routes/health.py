@@ -0,0 +1,34 @@
+from flask import Blueprint, jsonify
+from models import model_registry
+from lib.tracing import tracer
+
+health_bp = Blueprint("health_bp", __name__)
+
+
+# ---------------------- Liveness ----------------------
+@health_bp.route("/live", methods=["GET"])
+def live():
+    """
+    Process is up and serving requests
+    """
+    return jsonify({"status": "ok"}), 200
+
+
+# ---------------------- Readiness ----------------------
+@health_bp.route("/ready", methods=["GET"])
+def ready():
+    """
+    Report which models are loaded.
+    Returns 503 until every model selected for warm-up is ready.
+    """
+    status = model_registry.status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+
+# ---------------------- Chain Traces ----------------------
+@health_bp.route("/traces", methods=["GET"])
+def traces():
+    """
+    Per-stage latency histograms (recorded when TRACE_CHAINS=1)
+    """
+    return jsonify(tracer.export()), 200
@@ -0,0 +1,14 @@
+from flask import Blueprint, Response
+from lib.metrics import CONTENT_TYPE, metrics
+
+metrics_bp = Blueprint("metrics_bp", __name__)
+
+
+# ---------------------- Prometheus Metrics ----------------------
+@metrics_bp.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """
+    Model calls, caches and queues in the Prometheus text format
+    (values are per worker process)
+    """
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
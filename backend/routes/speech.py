@@ -1,18 +1,73 @@
-from flask import Blueprint, request, jsonify, send_from_directory, url_for
+from flask import (
+    Blueprint,
+    Response,
+    request,
+    jsonify,
+    send_from_directory,
+    stream_with_context,
+    url_for,
+)
 import traceback
 import os
-from werkzeug.utils import secure_filename
-from services.speech_service import generate_story_with_audio, transcribe_audio
+from services.speech_service import (
+    generate_story as generate_story_text,
+    generate_story_with_audio,
+    stream_text_to_audio,
+    transcribe_audio,
+    submit_transcription,
+    submit_batch_transcription,
+    submit_long_transcription,
+    get_transcription_job,
+)
+from services.transcription_queue import QueueFullError
+from services.audio_encoding import AUDIO_FORMATS
+from services.audio_store import create_audio_store
+from lib.server_timing import server_timing
+from lib.metrics import metrics
 
 speech_bp = Blueprint("speech_bp", __name__)
 
-# Folder where TTS audio files are stored
+# Folder where TTS audio files are stored (size-capped, LRU evicted)
 AUDIO_FOLDER = os.path.join(os.path.dirname(__file__), "../static/audio")
-os.makedirs(AUDIO_FOLDER, exist_ok=True)
+audio_store = create_audio_store(AUDIO_FOLDER)
 
-# Folder to temporarily store uploaded files for transcription
-UPLOAD_DIR = os.path.join(os.path.dirname(__file__), "../static/tmp")
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+def _audio_store_lookups():
+    stats = audio_store.counters()
+    return [({"result": "hit"}, stats["hits"]), ({"result": "miss"}, stats["misses"])]
+
+
+metrics.callback(
+    "audio_store_lookups_total",
+    "Narration audio store lookups by result",
+    _audio_store_lookups,
+    kind="counter",
+)
+metrics.callback(
+    "audio_store_hit_ratio",
+    "Narration audio store hit rate since start",
+    lambda: audio_store.counters()["hit_rate"],
+)
+# The only gauge that needs a folder scan, so one scrape walks it once
+metrics.callback(
+    "audio_store_bytes",
+    "Bytes of narration audio on disk",
+    lambda: audio_store.stats()["bytes_stored"],
+)
+
+# Content-addressed audio never changes; older timestamped files get a short TTL
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+LEGACY_CACHE_CONTROL = "public, max-age=3600"
+
+# Longest long-poll a client may request on a transcription job
+MAX_JOB_WAIT_SECONDS = 30
+
+# Longest ?text= accepted by the streaming TTS endpoint (it travels in the
+# URL); generated stories are passed by key instead and are never cut
+MAX_STREAM_TEXT_CHARS = 2000
+
+# Maximum number of files accepted by the batch transcription endpoint
+MAX_BATCH_FILES = int(os.getenv("TRANSCRIBE_MAX_BATCH_FILES", "32"))
 
 
 # ---------------------- TTS: Generate Story ----------------------
@@ -21,9 +76,12 @@ def generate_story():
     """
     Endpoint to generate a story from a topic and convert it to audio
     Returns story text and full audio URL.
+    With "stream": true the audio URL points at a progressive WAV stream
+    that starts playing after the first sentence is synthesized.
     """
     try:
-        data = request.get_json(force=True)
+        with server_timing.span("parse"):
+            data = request.get_json(force=True)
         topic = data.get("topic")
         session_id = data.get("session_id")
 
@@ -32,7 +90,26 @@ def generate_story():
         if not session_id:
             return jsonify({"error": "'session_id' parameter is required"}), 400
 
-        result = generate_story_with_audio(topic, session_id, AUDIO_FOLDER)
+        if data.get("stream"):
+            story = generate_story_text(topic)
+            # The story stays on the server; the URL carries its key only
+            audio_url = url_for(
+                "speech_bp.stream_audio",
+                story=audio_store.put_text(story),
+                _external=True,
+            )
+            return (
+                jsonify(
+                    {
+                        "story": story,
+                        "audio_url": audio_url,
+                        "message": "Story generated, audio will be streamed",
+                    }
+                ),
+                200,
+            )
+
+        result = generate_story_with_audio(topic, audio_store, session_id)
 
         audio_filename = result["audio_file"]
         # Full URL to serve audio
@@ -45,6 +122,7 @@ def generate_story():
                 {
                     "story": result["story"],
                     "audio_url": audio_url,
+                    "timings": result["timings"],
                     "message": "Story generated and audio saved successfully",
                 }
             ),
@@ -57,14 +135,60 @@ def generate_story():
         return jsonify({"error": "Internal server error", "details": str(e)}), 500
 
 
+# ---------------------- TTS: Stream Audio ----------------------
+@speech_bp.route("/stream", methods=["GET"])
+def stream_audio():
+    """
+    Stream narration sentence by sentence of ?story=<key> (a story stored by
+    /generate-story) or of a short ?text=...
+    (?format=wav by default, or an encoded preset such as opus)
+    """
+    story_key = request.args.get("story")
+    if story_key:
+        text = audio_store.get_text(story_key)
+        if text is None:
+            return jsonify({"error": "Story not found or expired"}), 404
+    else:
+        text = request.args.get("text", "").strip()
+    if not text:
+        return jsonify({"error": "'text' or 'story' parameter is required"}), 400
+    if not story_key and len(text) > MAX_STREAM_TEXT_CHARS:
+        message = f"'text' is limited to {MAX_STREAM_TEXT_CHARS} characters"
+        return jsonify({"error": message}), 400
+
+    fmt = request.args.get("format", "wav")
+    if fmt not in AUDIO_FORMATS:
+        message = f"'format' must be one of: {', '.join(AUDIO_FORMATS)}"
+        return jsonify({"error": message}), 400
+
+    return Response(
+        stream_with_context(stream_text_to_audio(text, fmt)),
+        mimetype=AUDIO_FORMATS[fmt].mimetype,
+        headers={"Cache-Control": "no-store"},
+    )
+
+
 # ---------------------- Serve Audio ----------------------
 @speech_bp.route("/audio/<filename>", methods=["GET"])
 def serve_audio(filename):
     """
-    Serve generated audio files from static/audio folder
+    Serve generated audio files from static/audio folder.
+    Supports Range requests (seeking) and conditional GETs via a strong ETag;
+    content-addressed files never change, so clients may cache them forever.
     """
     try:
-        return send_from_directory(AUDIO_FOLDER, filename)
+        response = send_from_directory(
+            AUDIO_FOLDER,
+            filename,
+            conditional=True,
+            etag=audio_store.etag(filename) or True,
+        )
+        if audio_store.is_content_addressed(filename):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers["Cache-Control"] = LEGACY_CACHE_CONTROL
+        audio_store.touch(filename)
+        return response
     except Exception as e:
         print(f"\n❌ Error serving audio file {filename}: {e}")
         traceback.print_exc()
@@ -85,16 +209,10 @@ def transcribe():
         return jsonify({"error": "No file selected"}), 400
 
     try:
-        # Save uploaded file temporarily
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(UPLOAD_DIR, filename)
-        file.save(file_path)
-
-        # Transcribe using speech_service
-        transcript = transcribe_audio(file_path)
-
-        # Remove temporary file
-        os.remove(file_path)
+        # Decode the upload in memory; nothing is written to disk
+        with server_timing.span("upload"):
+            audio = file.read()
+        transcript = transcribe_audio(audio)
 
         return (
             jsonify({"transcript": transcript, "message": "Transcription successful"}),
@@ -105,3 +223,128 @@ def transcribe():
         print(f"\n❌ Error transcribing file {file.filename}: {e}")
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
+
+
+# ---------------------- STT: Transcription Jobs (async) ----------------------
+@speech_bp.route("/transcribe/jobs", methods=["POST"])
+def submit_transcription_job():
+    """
+    Queue an uploaded audio file for transcription.
+    Returns a job id immediately; poll the status URL for the transcript.
+    Form field mode=long splits long recordings on silence and transcribes
+    the speech segments in parallel (result includes timestamped segments).
+    """
+    if "file" not in request.files:
+        return jsonify({"error": "No file provided"}), 400
+
+    file = request.files["file"]
+    if file.filename == "":
+        return jsonify({"error": "No file selected"}), 400
+
+    mode = request.form.get("mode", "short")
+    if mode not in ("short", "long"):
+        return jsonify({"error": "'mode' must be 'short' or 'long'"}), 400
+
+    try:
+        submit = submit_long_transcription if mode == "long" else submit_transcription
+        try:
+            job_id = submit(file.read())
+        except QueueFullError as e:
+            return jsonify({"error": str(e)}), 429, {"Retry-After": "5"}
+
+        status_url = url_for(
+            "speech_bp.transcription_job_status", job_id=job_id, _external=True
+        )
+        return (
+            jsonify({"job_id": job_id, "status": "queued", "status_url": status_url}),
+            202,
+        )
+
+    except Exception as e:
+        print(f"\n❌ Error queueing transcription for {file.filename}: {e}")
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@speech_bp.route("/transcribe/jobs/<job_id>", methods=["GET"])
+def transcription_job_status(job_id):
+    """
+    Get a transcription job. `?wait=<seconds>` long-polls until it finishes.
+    """
+    try:
+        wait = min(float(request.args.get("wait", 0)), MAX_JOB_WAIT_SECONDS)
+    except ValueError:
+        return jsonify({"error": "'wait' must be a number of seconds"}), 400
+
+    job = get_transcription_job(job_id, wait=max(0.0, wait))
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    response = {"job_id": job["job_id"], "status": job["status"]}
+    if job["status"] == "done":
+        response.update(job["result"])
+    elif job["status"] == "failed":
+        response["error"] = job["error"]
+    return jsonify(response), 200
+
+
+# ---------------------- STT: Batch Transcription ----------------------
+@speech_bp.route("/transcribe/batch", methods=["POST"])
+def transcribe_batch():
+    """
+    Transcribe several uploaded files (multipart field 'files') in one call.
+    Returns per-file transcripts in upload order, or 202 with a job id if the
+    batch is still running after MAX_JOB_WAIT_SECONDS.
+    """
+    files = [f for f in request.files.getlist("files") if f.filename]
+    if not files:
+        return jsonify({"error": "No files provided"}), 400
+    if len(files) > MAX_BATCH_FILES:
+        return (
+            jsonify({"error": f"At most {MAX_BATCH_FILES} files per batch"}),
+            400,
+        )
+
+    try:
+        try:
+            job_id = submit_batch_transcription([f.read() for f in files])
+        except QueueFullError as e:
+            return jsonify({"error": str(e)}), 429, {"Retry-After": "5"}
+
+        job = get_transcription_job(job_id, wait=MAX_JOB_WAIT_SECONDS)
+        if job["status"] == "failed":
+            return jsonify({"error": job["error"]}), 500
+        if job["status"] != "done":
+            status_url = url_for(
+                "speech_bp.transcription_job_status", job_id=job_id, _external=True
+            )
+            return (
+                jsonify(
+                    {
+                        "job_id": job_id,
+                        "status": job["status"],
+                        "status_url": status_url,
+                    }
+                ),
+                202,
+            )
+
+        results = [
+            {"filename": f.filename, "transcript": transcript}
+            for f, transcript in zip(files, job["result"]["transcripts"])
+        ]
+        return jsonify({"results": results, "message": "Transcription successful"}), 200
+
+    except Exception as e:
+        print(f"\n❌ Error in batch transcription: {e}")
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+# ---------------------- Audio Store Stats ----------------------
+@speech_bp.route("/store", methods=["GET"])
+def audio_store_stats():
+    """
+    Report audio store usage (bytes stored, files, hits, evictions)
+    """
+    return jsonify(audio_store.stats()), 200
@@ -1,14 +1,28 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, url_for
 from services.text_service import ask_text_model
+from services.batch_service import (
+    BATCH_CHAINS,
+    MAX_BATCH_ITEMS,
+    MAX_SYNC_BATCH_ITEMS,
+    QueueFullError,
+    get_batch_job,
+    run_batch,
+    submit_batch_job,
+)
+from lib.server_timing import server_timing
 import traceback
 
 text_bp = Blueprint("text_bp", __name__)
 
+# Longest long-poll on a batch job status request
+MAX_JOB_WAIT_SECONDS = 30
+
 
 @text_bp.route("/ask", methods=["POST"])
 def ask_question():
     try:
-        data = request.get_json(force=True)
+        with server_timing.span("parse"):
+            data = request.get_json(force=True)
         query = data.get("query")
         session_id = data.get("session_id")
 
@@ -31,3 +45,82 @@ def ask_question():
 
         # --- Return user-friendly JSON error response ---
         return jsonify({"error": "Internal server error", "details": str(e)}), 500
+
+
+@text_bp.route("/batch", methods=["POST"])
+def batch_questions():
+    """
+    Run a text chain over many inputs.
+    Body: {"inputs": [...], "chain": "ask" | "feedback", "max_concurrency": n}
+    Results keep the input order; a failed item carries "error" instead of
+    "output" without failing the whole batch.
+    Up to MAX_SYNC_BATCH_ITEMS inputs are answered directly; larger batches
+    return 202 with a job id to poll at /batch/jobs/<job_id>, or 429 when
+    TEXT_BATCH_MAX_PENDING jobs are already pending.
+    """
+    try:
+        with server_timing.span("parse"):
+            data = request.get_json(force=True)
+        inputs = data.get("inputs")
+        chain_name = data.get("chain", "ask")
+        max_concurrency = data.get("max_concurrency")
+
+        # --- Input Validation ---
+        if not isinstance(inputs, list) or not inputs:
+            return jsonify({"error": "'inputs' must be a non-empty list"}), 400
+        if not all(isinstance(text, str) for text in inputs):
+            return jsonify({"error": "Every item of 'inputs' must be a string"}), 400
+        if len(inputs) > MAX_BATCH_ITEMS:
+            message = f"At most {MAX_BATCH_ITEMS} inputs per batch"
+            return jsonify({"error": message}), 400
+        if chain_name not in BATCH_CHAINS:
+            message = f"'chain' must be one of: {', '.join(BATCH_CHAINS)}"
+            return jsonify({"error": message}), 400
+        if max_concurrency is not None and (
+            isinstance(max_concurrency, bool)
+            or not isinstance(max_concurrency, int)
+            or max_concurrency < 1
+        ):
+            message = "'max_concurrency' must be a positive integer"
+            return jsonify({"error": message}), 400
+
+        if len(inputs) <= MAX_SYNC_BATCH_ITEMS:
+            return jsonify(run_batch(inputs, chain_name, max_concurrency))
+
+        try:
+            job_id = submit_batch_job(inputs, chain_name, max_concurrency)
+        except QueueFullError as e:
+            return jsonify({"error": str(e)}), 429, {"Retry-After": "30"}
+        status_url = url_for("text_bp.batch_job_status", job_id=job_id, _external=True)
+        return (
+            jsonify({"job_id": job_id, "status": "queued", "status_url": status_url}),
+            202,
+        )
+
+    except Exception as e:
+        print("\n❌ Error in batch_questions() route:")
+        print(f"Message: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Internal server error", "details": str(e)}), 500
+
+
+@text_bp.route("/batch/jobs/<job_id>", methods=["GET"])
+def batch_job_status(job_id):
+    """
+    Get a batch job. `?wait=<seconds>` long-polls until it finishes.
+    """
+    try:
+        wait = min(float(request.args.get("wait", 0)), MAX_JOB_WAIT_SECONDS)
+    except ValueError:
+        return jsonify({"error": "'wait' must be a number of seconds"}), 400
+
+    job = get_batch_job(job_id, wait=max(0.0, wait))
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    response = {"job_id": job["job_id"], "status": job["status"]}
+    if job["status"] == "done":
+        response.update(job["result"])
+    elif job["status"] == "failed":
+        response["error"] = job["error"]
+    return jsonify(response), 200
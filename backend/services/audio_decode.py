@@ -0,0 +1,157 @@
+"""
+Audio Decode Module
+Decodes uploaded audio bytes to 16 kHz mono float32 in memory, the input
+format Whisper expects, without writing the upload to disk.
+
+MP4/M4A uploads are recognized up front and decoded with PyAV (optional,
+``pip install av``); without it they go through a temporary file, since
+ffmpeg can't seek in a pipe.
+"""
+
+import io
+import subprocess
+import tempfile
+from math import gcd
+
+import numpy as np
+
+# Whisper's expected input sample rate
+WHISPER_SAMPLE_RATE = 16000
+
+__all__ = ["WHISPER_SAMPLE_RATE", "decode_audio", "resample"]
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Resample a mono signal with a polyphase filter
+
+    Args:
+        samples: Mono float samples
+        source_rate: Sample rate of ``samples``
+        target_rate: Desired sample rate
+
+    Returns:
+        float32 samples at ``target_rate``
+    """
+    if source_rate == target_rate:
+        return samples.astype(np.float32, copy=False)
+    from scipy.signal import resample_poly
+
+    divisor = gcd(source_rate, target_rate)
+    resampled = resample_poly(samples, target_rate // divisor, source_rate // divisor)
+    return resampled.astype(np.float32, copy=False)
+
+
+def _decode_with_soundfile(data: bytes, sample_rate: int) -> np.ndarray:
+    """In-process decode for WAV/FLAC/OGG via libsndfile"""
+    import soundfile as sf
+
+    samples, source_rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    return resample(samples.mean(axis=1), source_rate, sample_rate)
+
+
+def _ffmpeg_command(source: str, sample_rate: int) -> list:
+    return [
+        "ffmpeg",
+        "-loglevel",
+        "error",
+        "-threads",
+        "0",
+        "-i",
+        source,
+        "-f",
+        "s16le",
+        "-ac",
+        "1",
+        "-acodec",
+        "pcm_s16le",
+        "-ar",
+        str(sample_rate),
+        "pipe:1",
+    ]
+
+
+def _pcm16_to_float(pcm: bytes) -> np.ndarray:
+    return np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
+
+
+def _is_mp4(data: bytes) -> bool:
+    """MP4/M4A/3GP container: starts with an ``ftyp`` box"""
+    return len(data) >= 12 and data[4:8] == b"ftyp"
+
+
+def _decode_with_pyav(data: bytes, sample_rate: int) -> np.ndarray:
+    """Seekable in-memory decode (PyAV over BytesIO), for MP4/M4A"""
+    import av
+
+    resampler = av.AudioResampler(format="s16", layout="mono", rate=sample_rate)
+    pcm = []
+
+    def _collect(frames) -> None:
+        # PyAV >= 9 returns a list of frames, older versions one frame or None
+        for frame in frames if isinstance(frames, list) else [frames]:
+            if frame is not None:
+                pcm.append(frame.to_ndarray().tobytes())
+
+    with av.open(io.BytesIO(data)) as container:
+        for frame in container.decode(audio=0):
+            _collect(resampler.resample(frame))
+    _collect(resampler.resample(None))
+    return _pcm16_to_float(b"".join(pcm))
+
+
+def _decode_from_file(data: bytes, sample_rate: int) -> np.ndarray:
+    """ffmpeg on a private temporary file, for inputs that need seeking"""
+    with tempfile.NamedTemporaryFile(suffix=".audio") as tmp:
+        tmp.write(data)
+        tmp.flush()
+        result = subprocess.run(
+            _ffmpeg_command(tmp.name, sample_rate), capture_output=True, check=True
+        )
+    return _pcm16_to_float(result.stdout)
+
+
+def _decode_mp4(data: bytes, sample_rate: int) -> np.ndarray:
+    """
+    MP4/M4A (the default container of mobile recordings) often keeps its index
+    at the end, which a pipe can't seek to: decode from memory with PyAV when
+    it is installed, else go straight to the temporary file
+    """
+    try:
+        return _decode_with_pyav(data, sample_rate)
+    except ImportError:
+        pass
+    except Exception as e:
+        print(f"⚠️ In-memory MP4 decode failed ({e}); using ffmpeg")
+    return _decode_from_file(data, sample_rate)
+
+
+def _decode_with_ffmpeg(data: bytes, sample_rate: int) -> np.ndarray:
+    """Decode compressed formats (MP3, AAC, WebM...) through ffmpeg pipes"""
+    result = subprocess.run(
+        _ffmpeg_command("pipe:0", sample_rate), input=data, capture_output=True
+    )
+    if result.returncode == 0 and result.stdout:
+        return _pcm16_to_float(result.stdout)
+    # Unrecognized containers that still need seeking
+    return _decode_from_file(data, sample_rate)
+
+
+def decode_audio(data: bytes, sample_rate: int = WHISPER_SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode audio bytes to mono float32 in [-1, 1]
+
+    Args:
+        data: Raw bytes of an uploaded audio file
+        sample_rate: Output sample rate
+
+    Returns:
+        1-D float32 numpy array
+    """
+    if _is_mp4(data):
+        return _decode_mp4(data, sample_rate)
+    try:
+        return _decode_with_soundfile(data, sample_rate)
+    except Exception:
+        # libsndfile doesn't handle MP3/AAC containers on every platform
+        return _decode_with_ffmpeg(data, sample_rate)
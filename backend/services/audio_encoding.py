@@ -0,0 +1,208 @@
+"""
+Audio Encoding Module
+Encodes in-memory TTS samples straight to the delivery container (MP3, Opus,
+WAV) in one pass, so no intermediate WAV file is written and read back
+"""
+
+import io
+import subprocess
+import threading
+import wave
+from typing import Iterable, Iterator, List
+
+import numpy as np
+
+__all__ = [
+    "AudioFormat",
+    "AUDIO_FORMATS",
+    "get_audio_format",
+    "to_pcm16",
+    "encode_audio",
+    "encode_stream",
+]
+
+
+class AudioFormat:
+    """Output container/codec preset"""
+
+    def __init__(self, extension: str, mimetype: str, ffmpeg_args: List[str] = None):
+        """
+        Args:
+            extension: File extension without the dot
+            mimetype: Content type served to clients
+            ffmpeg_args: Output options for ffmpeg (None = WAV, written in-process)
+        """
+        self.extension = extension
+        self.mimetype = mimetype
+        self.ffmpeg_args = ffmpeg_args
+
+
+# Presets selectable with TTS_AUDIO_FORMAT (speech is mono, so mono output)
+AUDIO_FORMATS = {
+    "mp3": AudioFormat(
+        "mp3", "audio/mpeg", ["-f", "mp3", "-codec:a", "libmp3lame", "-b:a", "192k"]
+    ),
+    "mp3-low": AudioFormat(
+        "mp3", "audio/mpeg", ["-f", "mp3", "-codec:a", "libmp3lame", "-b:a", "64k"]
+    ),
+    # Low-bitrate Opus for mobile clients; libopus only takes 8/12/16/24/48 kHz
+    "opus": AudioFormat(
+        "ogg",
+        "audio/ogg",
+        [
+            "-f",
+            "ogg",
+            "-codec:a",
+            "libopus",
+            "-b:a",
+            "32k",
+            "-application",
+            "voip",
+            "-ar",
+            "24000",
+        ],
+    ),
+    "wav": AudioFormat("wav", "audio/wav"),
+}
+
+
+def get_audio_format(name: str) -> AudioFormat:
+    """Look up a preset by name, raising ValueError for unknown names"""
+    try:
+        return AUDIO_FORMATS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown audio format '{name}' (choose from {', '.join(AUDIO_FORMATS)})"
+        ) from None
+
+
+def to_pcm16(samples) -> bytes:
+    """Convert float samples in [-1, 1] to little-endian 16-bit PCM"""
+    array = np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0)
+    return (array * 32767).astype("<i2").tobytes()
+
+
+def _ffmpeg_command(sample_rate: int, audio_format: AudioFormat) -> list:
+    return [
+        "ffmpeg",
+        "-loglevel",
+        "error",
+        "-f",
+        "s16le",
+        "-ar",
+        str(sample_rate),
+        "-ac",
+        "1",
+        "-i",
+        "pipe:0",
+        *audio_format.ffmpeg_args,
+        "pipe:1",
+    ]
+
+
+def encode_audio(samples, sample_rate: int, fmt: str = "mp3") -> bytes:
+    """
+    Encode mono float samples to a complete audio file in memory
+
+    Args:
+        samples: Mono float samples in [-1, 1] (e.g. the output of TTS.tts)
+        sample_rate: Sample rate of ``samples``
+        fmt: Preset name from AUDIO_FORMATS
+
+    Returns:
+        Encoded file bytes
+    """
+    audio_format = get_audio_format(fmt)
+    pcm = to_pcm16(samples)
+
+    if audio_format.ffmpeg_args is None:
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            wav.writeframes(pcm)
+        return buffer.getvalue()
+
+    result = subprocess.run(
+        _ffmpeg_command(sample_rate, audio_format), input=pcm, capture_output=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"ffmpeg failed to encode {fmt}: {result.stderr.decode(errors='replace')}"
+        )
+    return result.stdout
+
+
+def encode_stream(
+    pcm_chunks: Iterable[bytes], sample_rate: int, fmt: str
+) -> Iterator[bytes]:
+    """
+    Encode a stream of 16-bit PCM chunks on the fly (not for WAV, whose
+    streaming header is written by services.tts_stream)
+
+    A writer thread feeds ffmpeg's stdin while encoded bytes are yielded as
+    soon as ffmpeg produces them. If ``pcm_chunks`` raises, the error is
+    re-raised here once ffmpeg's output has been drained.
+
+    Args:
+        pcm_chunks: Mono 16-bit PCM chunks
+        sample_rate: Sample rate of the PCM
+        fmt: Preset name from AUDIO_FORMATS
+
+    Yields:
+        Encoded bytes
+    """
+    audio_format = get_audio_format(fmt)
+    if audio_format.ffmpeg_args is None:
+        raise ValueError("WAV streams carry raw PCM; no encoder is needed")
+
+    process = subprocess.Popen(
+        _ffmpeg_command(sample_rate, audio_format),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+
+    source_errors = []
+
+    def _feed():
+        chunks = iter(pcm_chunks)
+        try:
+            for chunk in chunks:
+                try:
+                    process.stdin.write(chunk)
+                    process.stdin.flush()
+                except (BrokenPipeError, ValueError, OSError):
+                    return  # ffmpeg was stopped because the client went away
+        except Exception as e:
+            # The PCM source failed (e.g. TTS): end ffmpeg's input, report below
+            print(f"❌ Audio source failed while encoding: {e}")
+            source_errors.append(e)
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+    writer = threading.Thread(target=_feed, name="audio-encode", daemon=True)
+    writer.start()
+
+    try:
+        while True:
+            data = process.stdout.read1(16384)
+            if not data:
+                break
+            yield data
+        process.wait()
+        writer.join()
+        if source_errors:
+            raise source_errors[0]
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
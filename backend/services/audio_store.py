@@ -0,0 +1,287 @@
+"""
+Audio Store Module
+Content-addressed narration files with a disk quota and LRU eviction.
+
+Filenames are a hash of (text, voice, format), so identical narrations share
+one file. Each access refreshes the file's atime (mtime stays the creation
+time, so Last-Modified is stable), and the least recently used files are
+deleted once the folder grows past its quota.
+
+The store also keeps the texts of streamed narrations (``<hash>.txt``), so a
+stream URL can carry a short key instead of the whole story; they are evicted
+like the audio files.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Optional
+
+__all__ = ["AudioStore", "create_audio_store"]
+
+# Extensions the store manages (anything else in the folder is left alone)
+AUDIO_EXTENSIONS = (".mp3", ".ogg", ".wav", ".txt")
+
+# Keys of stored narration texts
+TEXT_KEY = re.compile(r"^[0-9a-f]{32}$")
+
+# Names produced by filename(): the content hash plus an extension
+CONTENT_ADDRESSED_NAME = re.compile(r"^([0-9a-f]{32})\.(mp3|ogg|wav)$")
+
+
+class AudioStore:
+    """Size-capped folder of narration files, evicted least recently used first"""
+
+    def __init__(
+        self, folder: str, max_bytes: int = 500 * 1024 * 1024, lock_stripes: int = 64
+    ):
+        """
+        Initialize the store
+
+        Args:
+            folder: Directory holding the audio files
+            max_bytes: Disk quota; older files are evicted beyond it
+            lock_stripes: Number of locks keys are hashed onto
+        """
+        self.folder = folder
+        self.max_bytes = max_bytes
+        os.makedirs(folder, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(lock_stripes)]
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "evicted_bytes": 0}
+        # Legacy filename -> ((size, mtime_ns), content hash)
+        self._legacy_etags = {}
+
+    @staticmethod
+    def make_key(text: str, voice: str, fmt: str) -> str:
+        """Content hash of everything that determines the narration"""
+        payload = "\x1f".join((voice, fmt, text))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+    def filename(self, key: str, extension: str) -> str:
+        return f"{key}.{extension}"
+
+    def path(self, filename: str) -> str:
+        return os.path.join(self.folder, os.path.basename(filename))
+
+    @staticmethod
+    def is_content_addressed(filename: str) -> bool:
+        """True when the name is a content hash (the file can never change)"""
+        return CONTENT_ADDRESSED_NAME.match(filename) is not None
+
+    def etag(self, filename: str) -> Optional[str]:
+        """
+        Strong validator for a stored file
+
+        Content-addressed files use their hash; legacy timestamped files are
+        hashed once from their content (re-hashed only if size or mtime change).
+        """
+        match = CONTENT_ADDRESSED_NAME.match(filename)
+        if match:
+            return match.group(1)
+        path = self.path(filename)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        version = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._legacy_etags.get(filename)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        digest = hashlib.sha256()
+        try:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+        except FileNotFoundError:
+            return None
+        etag = digest.hexdigest()[:32]
+        with self._lock:
+            self._legacy_etags[filename] = (version, etag)
+        return etag
+
+    def _mark_used(self, path: str) -> None:
+        # Set atime explicitly (kernel updates are unreliable on noatime/relatime
+        # mounts) and keep mtime, which clients see as Last-Modified
+        stat = os.stat(path)
+        os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))
+
+    def lock(self, key: str) -> threading.Lock:
+        """
+        Per-key lock so concurrent requests for the same narration encode
+        and write it once (callers that synthesize before they know the key
+        still synthesize it each time)
+        """
+        return self._key_locks[int(key[:8], 16) % len(self._key_locks)]
+
+    def lookup(self, filename: str) -> Optional[str]:
+        """
+        Return the path of a stored file and mark it as recently used
+
+        Args:
+            filename: Name returned by filename()
+
+        Returns:
+            Path of the file, or None if it isn't stored
+        """
+        path = self.path(filename)
+        try:
+            self._mark_used(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        with self._lock:
+            self._stats["hits"] += 1
+        return path
+
+    def touch(self, filename: str) -> None:
+        """Mark a file as recently used (called when it's served)"""
+        try:
+            self._mark_used(self.path(filename))
+        except FileNotFoundError:
+            pass
+
+    def put(self, filename: str, data: bytes) -> str:
+        """
+        Store a file atomically, then enforce the quota
+
+        Args:
+            filename: Name returned by filename()
+            data: Encoded audio
+
+        Returns:
+            Path of the stored file
+        """
+        path = self.path(filename)
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._evict(keep=path)
+        return path
+
+    def put_text(self, text: str) -> str:
+        """
+        Store a narration text for a later stream request
+
+        Args:
+            text: Text to narrate
+
+        Returns:
+            Key to pass to get_text()
+        """
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+        # Not counted in the hit/miss stats, which describe narration audio
+        try:
+            self._mark_used(self.path(f"{key}.txt"))
+        except FileNotFoundError:
+            self.put(f"{key}.txt", text.encode("utf-8"))
+        return key
+
+    def get_text(self, key: str) -> Optional[str]:
+        """
+        Get a text stored with put_text()
+
+        Returns:
+            The text, or None if the key is invalid or the text was evicted
+        """
+        if not TEXT_KEY.match(key):
+            return None
+        path = self.path(f"{key}.txt")
+        try:
+            self._mark_used(path)
+            with open(path, "rb") as f:
+                return f.read().decode("utf-8")
+        except FileNotFoundError:
+            return None
+
+    def _scan(self) -> list:
+        """(last access, size, path) of every managed file"""
+        files = []
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if not entry.name.endswith(AUDIO_EXTENSIONS):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # evicted by another worker
+                files.append((stat.st_atime, stat.st_size, entry.path))
+        return files
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Delete least recently used files until the folder fits the quota"""
+        files = self._scan()
+        total = sum(size for _, size, _ in files)
+        if total <= self.max_bytes:
+            return
+
+        evicted = evicted_bytes = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # another worker got there first
+            else:
+                evicted += 1
+                evicted_bytes += size
+                with self._lock:
+                    self._legacy_etags.pop(os.path.basename(path), None)
+            total -= size
+
+        if evicted:
+            print(f"🧹 Audio store evicted {evicted} files ({evicted_bytes} bytes)")
+            with self._lock:
+                self._stats["evictions"] += evicted
+                self._stats["evicted_bytes"] += evicted_bytes
+
+    def counters(self) -> dict:
+        """In-memory lookup counters and hit rate (no folder scan)"""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def stats(self) -> dict:
+        files = self._scan()
+        stats = self.counters()
+        stats["files"] = len(files)
+        stats["bytes_stored"] = sum(size for _, size, _ in files)
+        stats["max_bytes"] = self.max_bytes
+        stats["oldest_access_age_seconds"] = (
+            round(time.time() - min(atime for atime, _, _ in files), 1)
+            if files
+            else None
+        )
+        return stats
+
+
+def create_audio_store(folder: str) -> AudioStore:
+    """
+    Build the store configured by AUDIO_STORE_MAX_MB
+
+    Args:
+        folder: Directory holding the audio files
+
+    Returns:
+        AudioStore instance
+    """
+    max_mb = float(os.getenv("AUDIO_STORE_MAX_MB", "500"))
+    return AudioStore(folder, max_bytes=int(max_mb * 1024 * 1024))
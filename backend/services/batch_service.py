@@ -0,0 +1,233 @@
+"""
+Batch Service Module
+Runs a text chain over many inputs with LCEL ``batch``: bounded
+concurrency, order-preserving results and per-item errors.
+
+Small batches run inside the request; larger ones run as background jobs
+recorded in SQLite (like transcription jobs), so they don't depend on one
+HTTP request surviving for many minutes and any web worker can answer a poll.
+
+Batch work always goes through the gateway's "batch" pool, so a large job
+can't starve interactive chat traffic. With the default gateway settings that
+pool allows 4 calls in flight (LLM_BATCH_CONCURRENCY) and leaves 25% of the
+rate-limit burst to interactive traffic (LLM_BATCH_RESERVE), under a shared
+quota of 5 requests/s (LLM_REQUESTS_PER_SECOND). A larger max_concurrency is
+capped to the pool; results report the concurrency actually used.
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from langchain.prompts import ChatPromptTemplate
+from langchain.schema.output_parser import StrOutputParser
+from lib.router import KeywordRouter, Route
+from lib.tracing import tracer
+from models import batch_llm, llm_gateway
+from services.transcription_queue import JobStore, QueueFullError
+
+__all__ = [
+    "BATCH_CHAINS",
+    "MAX_BATCH_ITEMS",
+    "MAX_SYNC_BATCH_ITEMS",
+    "QueueFullError",
+    "run_batch",
+    "submit_batch_job",
+    "get_batch_job",
+]
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Largest number of inputs accepted in one request
+MAX_BATCH_ITEMS = int(os.getenv("TEXT_BATCH_MAX_ITEMS", "10000"))
+
+# Largest batch answered inline; anything bigger becomes a job. At the default
+# quota (5 requests/s) 100 items finish well within the worker timeout.
+MAX_SYNC_BATCH_ITEMS = int(os.getenv("TEXT_BATCH_MAX_SYNC_ITEMS", "100"))
+
+# Batch jobs running at once in this process, queued + running jobs allowed on
+# the host, and how long results are kept
+BATCH_JOB_WORKERS = int(os.getenv("TEXT_BATCH_JOB_WORKERS", "2"))
+BATCH_MAX_PENDING = int(os.getenv("TEXT_BATCH_MAX_PENDING", "16"))
+BATCH_JOB_TTL = float(os.getenv("TEXT_BATCH_JOB_TTL", "86400"))
+
+# Default parallel LLM calls per batch (capped by the gateway's batch pool)
+DEFAULT_BATCH_CONCURRENCY = int(os.getenv("TEXT_BATCH_CONCURRENCY", "4"))
+
+
+def _feedback_chain(label: str):
+    return (
+        ChatPromptTemplate.from_template(template=f"{label} feedback: {{input}}")
+        | batch_llm
+        | StrOutputParser()
+    )
+
+
+# --- Chains available to /ai/text/batch (input: {"input": text}) ---
+BATCH_CHAINS = {
+    # Stateless question answering (no session history)
+    "ask": tracer.traced(
+        ChatPromptTemplate.from_messages(
+            [("system", "You are a helpful assistant."), ("human", "{input}")]
+        )
+        | batch_llm
+        | StrOutputParser()
+    ),
+    # Feedback classification, same routes as chains/branching.py
+    "feedback": tracer.traced(
+        KeywordRouter(
+            [
+                Route("positive", _feedback_chain("Positive"), keywords=["good"]),
+                Route("negative", _feedback_chain("Negative"), keywords=["bad"]),
+            ],
+            default=_feedback_chain("Neutral"),
+        )
+    ),
+}
+
+
+def run_batch(
+    inputs: List[str], chain_name: str = "ask", max_concurrency: Optional[int] = None
+) -> dict:
+    """
+    Run a chain over many inputs
+
+    Args:
+        inputs: Input texts
+        chain_name: Key of BATCH_CHAINS
+        max_concurrency: Parallel LLM calls (defaults to TEXT_BATCH_CONCURRENCY,
+            never more than the gateway's batch pool allows)
+
+    Returns:
+        dict with one result per input, in input order ({"index", "output"} or
+        {"index", "error"}), success/failure counts, elapsed seconds, and the
+        requested and effective ("max_concurrency") concurrency
+    """
+    chain = BATCH_CHAINS[chain_name]
+    pool_limit = llm_gateway.pools["batch"].max_concurrency
+    requested = max_concurrency or DEFAULT_BATCH_CONCURRENCY
+    concurrency = max(1, min(requested, pool_limit))
+    if concurrency < requested:
+        print(
+            f"⚠️ max_concurrency {requested} capped to the batch pool's "
+            f"{pool_limit} (LLM_BATCH_CONCURRENCY)"
+        )
+
+    print(
+        f"📦 Running '{chain_name}' on {len(inputs)} inputs, {concurrency} at a time"
+    )
+    start = time.perf_counter()
+    outputs = chain.batch(
+        [{"input": text} for text in inputs],
+        config={"max_concurrency": concurrency},
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - start
+
+    results = []
+    failed = 0
+    for index, output in enumerate(outputs):
+        if isinstance(output, Exception):
+            failed += 1
+            error = f"{type(output).__name__}: {output}"
+            results.append({"index": index, "error": error})
+        else:
+            results.append({"index": index, "output": output})
+
+    print(f"✅ Batch done in {elapsed:.2f}s ({failed} failed)")
+    return {
+        "results": results,
+        "succeeded": len(inputs) - failed,
+        "failed": failed,
+        "requested_concurrency": requested,
+        "max_concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 3),
+    }
+
+
+# ---------------- Background jobs ----------------
+batch_jobs = JobStore(
+    Path(os.getenv("TEXT_BATCH_JOB_DB", str(BASE_DIR / "db" / "batch_jobs.sqlite3")))
+)
+_job_runner: Optional[ThreadPoolExecutor] = None
+_job_runner_lock = threading.Lock()
+
+
+def _runner() -> ThreadPoolExecutor:
+    global _job_runner
+    with _job_runner_lock:
+        if _job_runner is None:
+            _job_runner = ThreadPoolExecutor(
+                max_workers=BATCH_JOB_WORKERS, thread_name_prefix="text-batch"
+            )
+        return _job_runner
+
+
+def _run_job(
+    job_id: str, inputs: List[str], chain_name: str, max_concurrency: Optional[int]
+) -> None:
+    batch_jobs.update(job_id, "running")
+    try:
+        result = run_batch(inputs, chain_name, max_concurrency)
+    except Exception as e:
+        print(f"❌ Batch job {job_id} failed: {e}")
+        batch_jobs.update(job_id, "failed", error=str(e))
+        return
+    batch_jobs.update(job_id, "done", result=result)
+
+
+def submit_batch_job(
+    inputs: List[str], chain_name: str = "ask", max_concurrency: Optional[int] = None
+) -> str:
+    """
+    Run a batch in the background
+
+    Args:
+        inputs: Input texts
+        chain_name: Key of BATCH_CHAINS
+        max_concurrency: Parallel LLM calls, as for run_batch
+
+    Returns:
+        Job id; poll get_batch_job for the run_batch result
+
+    Raises:
+        QueueFullError: TEXT_BATCH_MAX_PENDING jobs are already pending
+    """
+    job_id = uuid.uuid4().hex
+    batch_jobs.create(job_id, max_pending=BATCH_MAX_PENDING)
+    batch_jobs.prune(time.time() - BATCH_JOB_TTL)
+    try:
+        _runner().submit(_run_job, job_id, inputs, chain_name, max_concurrency)
+    except Exception as e:
+        # Don't leave a row that stays "queued" until this process exits
+        batch_jobs.update(job_id, "failed", error=str(e))
+        raise
+    print(f"📦 Queued batch job {job_id} ({len(inputs)} inputs)")
+    return job_id
+
+
+def get_batch_job(job_id: str, wait: float = 0.0) -> Optional[dict]:
+    """
+    Get a batch job, long-polling up to `wait` seconds for it to finish
+
+    Args:
+        job_id: Job id returned by submit_batch_job
+        wait: Maximum seconds to wait
+
+    Returns:
+        Job record or None if unknown
+    """
+    deadline = time.monotonic() + wait
+    job = batch_jobs.get(job_id)
+    while (
+        job is not None
+        and job["status"] in ("queued", "running")
+        and time.monotonic() < deadline
+    ):
+        time.sleep(0.25)
+        job = batch_jobs.get(job_id)
+    return job
@@ -0,0 +1,250 @@
+"""
+Session Store Module
+Chat session histories shared by every worker process on a host
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+try:
+    import fcntl  # POSIX only; gunicorn is POSIX only as well
+except ImportError:  # pragma: no cover - Windows development machines
+    fcntl = None
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+class StoredChatMessageHistory(BaseChatMessageHistory):
+    """ChatMessageHistory view over one session in a session store"""
+
+    def __init__(self, store, session_id: str):
+        self.store = store
+        self.session_id = session_id
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        return self.store.load(self.session_id)
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        self.store.append(self.session_id, messages)
+
+    def clear(self) -> None:
+        self.store.clear(self.session_id)
+
+
+class MemorySessionStore:
+    """Process-local store, only correct with a single worker process"""
+
+    def __init__(self):
+        self._histories: Dict[str, List[BaseMessage]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def get_history(self, session_id: str) -> StoredChatMessageHistory:
+        return StoredChatMessageHistory(self, session_id)
+
+    def load(self, session_id: str) -> List[BaseMessage]:
+        with self._guard:
+            return list(self._histories.get(session_id, []))
+
+    def append(self, session_id: str, messages: Sequence[BaseMessage]) -> None:
+        with self._guard:
+            self._histories.setdefault(session_id, []).extend(messages)
+
+    def clear(self, session_id: str) -> None:
+        with self._guard:
+            self._histories.pop(session_id, None)
+
+    @contextmanager
+    def lock(self, session_id: str):
+        with self._guard:
+            session_lock = self._locks.setdefault(session_id, threading.Lock())
+        with session_lock:
+            yield
+
+    def session_count(self) -> int:
+        with self._guard:
+            return len(self._histories)
+
+
+class SQLiteSessionStore:
+    """SQLite (WAL) store with cross-process per-session locks and pruning"""
+
+    def __init__(
+        self,
+        db_path: Path,
+        lock_dir: Optional[Path] = None,
+        lock_stripes: int = 256,
+        ttl: float = 7 * 24 * 3600,
+        max_messages: int = 200,
+        prune_every: int = 100,
+    ):
+        """
+        Initialize SQLite session store
+
+        Args:
+            db_path: SQLite database file shared by all workers
+            lock_dir: Folder for per-session lock files (defaults next to db)
+            lock_stripes: Number of lock files sessions are hashed onto
+            ttl: Seconds of inactivity after which a session is deleted (0 = never)
+            max_messages: Most recent messages kept per session (0 = all)
+            prune_every: Delete expired sessions after this many writes
+        """
+        self.db_path = Path(db_path)
+        self.lock_dir = (
+            Path(lock_dir) if lock_dir else self.db_path.parent / "session_locks"
+        )
+        self.lock_stripes = lock_stripes
+        self.ttl = ttl
+        self.max_messages = max_messages
+        self.prune_every = prune_every
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        self._local = threading.local()
+        self._thread_locks = [threading.Lock() for _ in range(lock_stripes)]
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+            "message TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id, id)"
+        )
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        # One connection per thread, reopened after a fork
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get_history(self, session_id: str) -> StoredChatMessageHistory:
+        return StoredChatMessageHistory(self, session_id)
+
+    def load(self, session_id: str) -> List[BaseMessage]:
+        rows = self._connection().execute(
+            "SELECT message FROM messages WHERE session_id = ? ORDER BY id",
+            (session_id,),
+        ).fetchall()
+        return messages_from_dict([json.loads(row[0]) for row in rows])
+
+    def append(self, session_id: str, messages: Sequence[BaseMessage]) -> None:
+        """Append a turn's messages, trimming the session, in one transaction"""
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO messages (session_id, message, created) VALUES (?, ?, ?)",
+                [
+                    (session_id, json.dumps(message_to_dict(m)), now)
+                    for m in messages
+                ],
+            )
+            if self.max_messages:
+                conn.execute(
+                    "DELETE FROM messages WHERE session_id = ? AND id <= ("
+                    "SELECT id FROM messages WHERE session_id = ? "
+                    "ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (session_id, session_id, self.max_messages),
+                )
+
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes % self.prune_every == 0
+        if due:
+            self.prune()
+
+    def prune(self) -> None:
+        """Delete sessions idle for longer than the TTL"""
+        if not self.ttl:
+            return
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    "DELETE FROM messages WHERE session_id IN ("
+                    "SELECT session_id FROM messages GROUP BY session_id "
+                    "HAVING MAX(created) < ?)",
+                    (time.time() - self.ttl,),
+                )
+        except sqlite3.Error as e:
+            # Housekeeping only; the turn itself was saved
+            print(f"⚠️ Could not prune expired sessions: {e}")
+
+    def clear(self, session_id: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+
+    def _stripe(self, session_id: str) -> int:
+        digest = hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+        return int(digest[:8], 16) % self.lock_stripes
+
+    @contextmanager
+    def lock(self, session_id: str):
+        """
+        Serialize turns of one session across threads and processes
+
+        Args:
+            session_id: Session to lock
+        """
+        stripe = self._stripe(session_id)
+        if fcntl is None:
+            with self._thread_locks[stripe]:
+                yield
+            return
+
+        # flock locks belong to the open file, so each acquisition opens its
+        # own handle; this also serializes threads within one process
+        with open(self.lock_dir / f"{stripe}.lock", "a+") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def session_count(self) -> int:
+        row = self._connection().execute(
+            "SELECT COUNT(DISTINCT session_id) FROM messages"
+        ).fetchone()
+        return row[0]
+
+
+def create_session_store():
+    """
+    Build the session store selected by SESSION_STORE ("sqlite" or "memory")
+
+    Returns:
+        Session store instance
+    """
+    backend = os.getenv("SESSION_STORE", "sqlite").lower()
+    if backend == "memory":
+        return MemorySessionStore()
+    if backend == "sqlite":
+        db_path = os.getenv(
+            "SESSION_DB_PATH", str(BASE_DIR / "db" / "sessions.sqlite3")
+        )
+        return SQLiteSessionStore(
+            Path(db_path),
+            ttl=float(os.getenv("SESSION_TTL_SECONDS", str(7 * 24 * 3600))),
+            max_messages=int(os.getenv("SESSION_MAX_MESSAGES", "200")),
+        )
+    raise ValueError(f"Unknown SESSION_STORE '{backend}'")
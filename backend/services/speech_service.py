@@ -1,103 +1,295 @@
 import os
-from datetime import datetime
-from typing import Optional
+import time
+from typing import Iterator, List, Optional, Union
 from langchain.prompts import PromptTemplate
-from TTS.api import TTS
-from pydub import AudioSegment
-from models import gemini_llm
+from models import chat_llm, model_registry
 from lib.utils import pretty_print
-import whisper  # pip install openai-whisper
+from lib.tracing import tracer
+from lib.server_timing import server_timing
+from lib.metrics import metrics
+from services.transcription_queue import create_transcription_queue
+from services.audio_decode import decode_audio
+from services.tts_stream import SentencePipeline, iter_sentences, synthesize_stream
+from services.audio_encoding import encode_audio, get_audio_format
+from services.audio_store import AudioStore
+from services.tts_pool import TTSPool
 
-# === Initialize TTS model (Coqui TTS) ===
-tts = TTS(model_name="tts_models/en/ljspeech/tacotron2-DDC", progress_bar=False)
+TTS_MODEL_NAME = os.getenv("TTS_MODEL", "tts_models/en/ljspeech/tacotron2-DDC")
+WHISPER_MODEL_NAME = os.getenv("WHISPER_MODEL", "base")  # tiny, base, small, ...
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "8"))
+# Stored narration format: mp3 (192k), mp3-low, opus or wav
+TTS_AUDIO_FORMAT = os.getenv("TTS_AUDIO_FORMAT", "mp3")
 
-# === Initialize Whisper model for STT ===
-whisper_model = whisper.load_model("base")  # tiny, base, small, medium, large
+
+# Concurrent syntheses and torch intra-op threads per synthesis (0 = cores / size)
+TTS_POOL_SIZE = int(os.getenv("TTS_POOL_SIZE", "1"))
+TTS_TORCH_THREADS = int(os.getenv("TTS_TORCH_THREADS", "0"))
+
+
+# === TTS model pool (Coqui TTS), loaded on first use ===
+def _load_tts():
+    from TTS.api import TTS
+
+    return TTSPool(
+        lambda: TTS(model_name=TTS_MODEL_NAME, progress_bar=False),
+        size=TTS_POOL_SIZE,
+        threads_per_instance=TTS_TORCH_THREADS or None,
+    )
+
+
+# === Whisper model for STT, loaded on first use ===
+def _load_whisper():
+    import whisper  # pip install openai-whisper
+
+    return whisper.load_model(WHISPER_MODEL_NAME)
+
+
+model_registry.register("tts", _load_tts)
+model_registry.register("whisper", _load_whisper)
+
+# === Background transcription jobs (Whisper worker processes) ===
+transcription_queue = create_transcription_queue(WHISPER_MODEL_NAME)
+
+
+# === Metrics (TTS durations are recorded by the pool) ===
+WHISPER_LATENCY = metrics.histogram(
+    "whisper_transcription_duration_seconds",
+    "Duration of one in-process Whisper transcription",
+)
+
+
+def _tts_pool_stat(name: str):
+    """Scrape-time reader of one TTS pool counter (None until TTS is loaded)"""
+
+    def _read():
+        if not model_registry.is_loaded("tts"):
+            return None
+        return model_registry.get("tts").stats()[name]
+
+    return _read
+
+
+metrics.callback(
+    "tts_pool_checkouts_total",
+    "TTS instances checked out of the pool",
+    _tts_pool_stat("checkouts"),
+    kind="counter",
+)
+metrics.callback(
+    "tts_pool_checkout_waits_total",
+    "TTS checkouts that had to wait for a free instance",
+    _tts_pool_stat("waits"),
+    kind="counter",
+)
+metrics.callback(
+    "tts_pool_wait_seconds_total",
+    "Seconds spent waiting for a free TTS instance",
+    _tts_pool_stat("wait_seconds"),
+    kind="counter",
+)
+metrics.callback(
+    "tts_pool_available",
+    "Idle TTS instances",
+    lambda: (
+        model_registry.get("tts").stats()["available"]
+        if model_registry.is_loaded("tts")
+        else None
+    ),
+)
+metrics.callback(
+    "transcription_jobs_pending",
+    "Transcription jobs queued or running in the worker processes",
+    lambda: transcription_queue.stats()["pending"],
+)
 
 
 # === Generate story using LLM ===
+STORY_PROMPT = PromptTemplate(
+    input_variables=["topic"],
+    template=(
+        "You are a creative storyteller. Generate an engaging very short story (50-60 words) "
+        "based on the following topic.\n"
+        "Make the story captivating, well-structured with a beginning, middle, and end.\n"
+        "Use vivid descriptions suitable for audio narration.\n"
+        "Keep the language clear and easy to listen to.\n\n"
+        "Topic: {topic}\n\nStory:"
+    ),
+)
+
+
 def generate_story(topic: str) -> str:
     """
     Generate a short story for a given topic using Gemini LLM.
     """
     print(f"🎨 Generating story for topic: {topic}")
 
-    story_prompt = PromptTemplate(
-        input_variables=["topic"],
-        template=(
-            "You are a creative storyteller. Generate an engaging very short story (50-60 words) "
-            "based on the following topic.\n"
-            "Make the story captivating, well-structured with a beginning, middle, and end.\n"
-            "Use vivid descriptions suitable for audio narration.\n"
-            "Keep the language clear and easy to listen to.\n\n"
-            "Topic: {topic}\n\nStory:"
-        ),
-    )
-
-    prompt_text = story_prompt.format(topic=topic)
-    response = gemini_llm.invoke(prompt_text)
+    prompt_text = STORY_PROMPT.format(topic=topic)
+    response = chat_llm.invoke(prompt_text)
     story = response.content.strip()
     print(f"✅ Story generated ({len(story)} characters)")
     return story
 
 
-# === Convert text to audio (TTS) ===
-def convert_text_to_audio(text: str, topic: str, audio_folder: str) -> dict:
+# === Stream text as audio (TTS, sentence pipelined) ===
+def stream_text_to_audio(text: str, fmt: str = "wav") -> Iterator[bytes]:
     """
-    Convert story text to MP3 audio using Coqui TTS.
-    :param text: Story text
-    :param topic: Topic for filename
-    :param audio_folder: Folder to save MP3/WAV
-    :return: dict with audio filename and path
+    Stream narration of `text` sentence by sentence.
+    Sentences are synthesized one ahead of playback, so the first sentence
+    is audible long before the whole text is synthesized.
+    :param text: Text to narrate
+    :param fmt: "wav" or an encoded preset such as "opus"
+    :return: iterator of audio bytes
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_topic = "".join(c if c.isalnum() else "_" for c in topic[:30])
-    audio_filename = f"story_{safe_topic}_{timestamp}.mp3"
-    wav_path = os.path.join(audio_folder, audio_filename.replace(".mp3", ".wav"))
-    audio_path = os.path.join(audio_folder, audio_filename)
-
-    os.makedirs(audio_folder, exist_ok=True)
-
-    print("🎙️ Converting story to audio...")
-
-    # Generate WAV
-    tts.tts_to_file(text=text, file_path=wav_path)
-
-    # Convert WAV → MP3
-    audio = AudioSegment.from_wav(wav_path)
-    audio.export(audio_path, format="mp3", bitrate="192k")
-    os.remove(wav_path)
-
-    print(f"✅ Audio saved: {audio_path}")
-    return {"audio_file": audio_filename, "audio_path": audio_path}
+    get_audio_format(fmt)  # fail before the response starts
+    print(f"🎙️ Streaming {fmt} audio for {len(text)} characters...")
+    return synthesize_stream(model_registry.get("tts"), text, fmt)
 
 
 # === Main function called from Flask ===
 def generate_story_with_audio(
-    topic: str, session_id: Optional[str] = None, audio_folder: str = "static/audio"
+    topic: str, audio_store: AudioStore, session_id: Optional[str] = None
 ) -> dict:
     """
     Generate story text and convert it to audio.
+    The story is streamed from the LLM and every finished sentence is handed
+    to TTS immediately, so synthesis overlaps generation and total latency
+    approaches max(LLM, TTS) instead of their sum.
     Called from Flask route.
+    :return: dict with story, audio file/path and per-stage timings (seconds)
     """
-    story = generate_story(topic)
-    audio_info = convert_text_to_audio(story, topic, audio_folder)
+    print(f"🎨 Generating story with audio for topic: {topic}")
+    start = time.perf_counter()
+    pipeline = SentencePipeline(model_registry.get("tts"))
+    first_token = None
+    parts = []
+
+    def _fragments():
+        nonlocal first_token
+        for chunk in chat_llm.stream(STORY_PROMPT.format(topic=topic)):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            parts.append(chunk.content)
+            yield chunk.content
+
+    try:
+        for sentence in iter_sentences(_fragments()):
+            pipeline.feed(sentence)
+    except BaseException:
+        pipeline.cancel()
+        raise
+    llm_done = time.perf_counter() - start
+
+    samples = pipeline.finish()
+    tts_done = time.perf_counter() - start
+    story = "".join(parts).strip()
+    print(f"✅ Story generated ({len(story)} chars, {pipeline.sentences} sentences)")
+
+    # TTS ran on the pipeline's thread, overlapping the LLM stream
+    server_timing.record("tts", pipeline.tts_seconds)
+    server_timing.record("tts-tail", tts_done - llm_done)
+
+    fmt = TTS_AUDIO_FORMAT
+    key = audio_store.make_key(story, TTS_MODEL_NAME, fmt)
+    audio_filename = audio_store.filename(key, get_audio_format(fmt).extension)
+    # Content-addressed. The story is only known once it has been streamed and
+    # spoken, so a stored file saves just the encode and the write; the lock
+    # keeps a concurrent identical story from encoding and writing it twice
+    with audio_store.lock(key):
+        with server_timing.span("store"):
+            audio_path = audio_store.lookup(audio_filename)
+        if audio_path is not None:
+            print(f"♻️ Reusing stored audio: {audio_path}")
+        else:
+            with tracer.span("tts:encode"), server_timing.span("encode"):
+                data = encode_audio(samples, pipeline.sample_rate, fmt)
+            with server_timing.span("store"):
+                audio_path = audio_store.put(audio_filename, data)
+            print(f"✅ Audio saved: {audio_path}")
+    total = time.perf_counter() - start
+
     return {
         "story": story,
-        "audio_file": audio_info["audio_file"],
-        "audio_path": audio_info["audio_path"],
+        "audio_file": audio_filename,
+        "audio_path": audio_path,
+        "timings": {
+            "llm_first_token": round(first_token or llm_done, 3),
+            "llm": round(llm_done, 3),
+            "tts": round(pipeline.tts_seconds, 3),
+            "tts_after_llm": round(tts_done - llm_done, 3),
+            "encode": round(total - tts_done, 3),
+            "total": round(total, 3),
+        },
     }
 
 
 # === Transcribe audio (STT) ===
-def transcribe_audio(file_path: str) -> str:
+def transcribe_audio(audio: Union[str, bytes]) -> str:
     """
-    Transcribe an audio file to text using Whisper.
-    :param file_path: Path to uploaded audio file
+    Transcribe audio to text using Whisper.
+    :param audio: Raw bytes of an uploaded audio file (decoded in memory),
+        or a path to an audio file
     :return: transcript string
     """
-    print(f"🎤 Transcribing audio: {file_path}")
-    result = whisper_model.transcribe(file_path)
+    if isinstance(audio, bytes):
+        print(f"🎤 Transcribing audio upload ({len(audio)} bytes)")
+        with server_timing.span("decode"):
+            audio = decode_audio(audio)
+    else:
+        print(f"🎤 Transcribing audio: {audio}")
+    model = model_registry.get("whisper")
+    start = time.perf_counter()
+    with server_timing.span("stt"):
+        result = model.transcribe(audio)
+    WHISPER_LATENCY.observe(time.perf_counter() - start)
     transcript = result.get("text", "").strip()
     print(f"✅ Transcription complete: {len(transcript)} characters")
     return transcript
+
+
+# === Submit transcription job (STT, async) ===
+def submit_transcription(audio: bytes) -> str:
+    """
+    Queue an audio upload for transcription on the Whisper worker pool.
+    :param audio: Raw bytes of the uploaded audio file
+    :return: job id
+    """
+    job_id = transcription_queue.submit(audio)
+    print(f"🎤 Queued transcription job {job_id} ({len(audio)} bytes)")
+    return job_id
+
+
+# === Long recording transcription (STT, VAD + parallel segments) ===
+def submit_long_transcription(audio: bytes) -> str:
+    """
+    Queue a long recording. It is split on silence and the speech segments
+    are transcribed in parallel; the result carries segment timestamps.
+    :param audio: Raw bytes of the uploaded audio file
+    :return: job id
+    """
+    job_id = transcription_queue.submit_long(audio)
+    print(f"🎤 Queued long transcription job {job_id} ({len(audio)} bytes)")
+    return job_id
+
+
+# === Batched transcription of several uploads (STT) ===
+def submit_batch_transcription(files: List[bytes]) -> str:
+    """
+    Queue several audio uploads as one batched transcription job.
+    Their 30-second windows share Whisper forward passes.
+    :param files: Raw bytes of each uploaded audio file
+    :return: job id
+    """
+    job_id = transcription_queue.submit_batch(files, batch_size=WHISPER_BATCH_SIZE)
+    print(f"🎤 Queued batch transcription job {job_id} ({len(files)} files)")
+    return job_id
+
+
+# === Poll transcription job ===
+def get_transcription_job(job_id: str, wait: float = 0.0) -> Optional[dict]:
+    """
+    Get a transcription job, long-polling up to `wait` seconds.
+    :param job_id: Job id returned by submit_transcription
+    :param wait: Seconds to wait for the job to finish
+    :return: job dict or None if unknown
+    """
+    return transcription_queue.get(job_id, wait=wait)
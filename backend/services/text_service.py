@@ -1,16 +1,21 @@
-from langchain_community.chat_message_histories import ChatMessageHistory
+import time
 from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from models import gemini_llm
-
-# --- Session store ---
-session_histories = {}
+from models import chat_llm
+from lib.tracing import tracer
+from lib.server_timing import server_timing
+from lib.metrics import metrics
+from services.session_store import create_session_store
+
+# --- Session store (shared by all worker processes, see SESSION_STORE) ---
+session_store = create_session_store()
+metrics.callback(
+    "chat_sessions", "Chat sessions in the session store", session_store.session_count
+)
 
 
 def get_session_history(session_id: str):
-    if session_id not in session_histories:
-        session_histories[session_id] = ChatMessageHistory()
-    return session_histories[session_id]
+    return session_store.get_history(session_id)
 
 
 # --- Chain setup ---
@@ -21,20 +26,29 @@ prompt_template = ChatPromptTemplate.from_messages(
         ("human", "{input}"),
     ]
 )
-base_chain = prompt_template | gemini_llm
-
-chain = RunnableWithMessageHistory(
-    base_chain,
-    get_session_history=get_session_history,
-    input_messages_key="input",
-    history_messages_key="chat_history",
+base_chain = prompt_template | chat_llm
+
+# Per-stage timings are recorded when TRACE_CHAINS=1 (no-op otherwise)
+chain = tracer.traced(
+    RunnableWithMessageHistory(
+        base_chain,
+        get_session_history=get_session_history,
+        input_messages_key="input",
+        history_messages_key="chat_history",
+    )
 )
 
 
 # --- Usage ---
 def ask_text_model(user_input: str, session_id: str = "default"):
-    response = chain.invoke(
-        {"input": user_input},
-        config={"configurable": {"session_id": session_id}},
-    )
+    # Hold the session lock for the whole turn so concurrent requests for the
+    # same session see each other's history instead of interleaving
+    waiting = time.perf_counter()
+    with session_store.lock(session_id):
+        server_timing.record("session-lock", time.perf_counter() - waiting)
+        with server_timing.span("chain"):
+            response = chain.invoke(
+                {"input": user_input},
+                config={"configurable": {"session_id": session_id}},
+            )
     return response.content
@@ -0,0 +1,594 @@
+"""
+Transcription Queue Module
+Job-based transcription on one pool of Whisper worker processes per host.
+
+Jobs and their uploads are recorded in SQLite, so any web worker can accept a
+job or answer a poll. Only one web worker at a time owns the Whisper pool: it
+holds an exclusive lock on a file next to the database and claims queued
+jobs from the table as its workers free up. The other web workers compete
+for the lock in the background, so if the owner exits another one takes
+over. TRANSCRIBE_WORKERS and TRANSCRIBE_MAX_PENDING therefore bound the
+whole host, however many web workers there are. A job left running by an
+owner that exited is reported as failed.
+"""
+
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: the single-process dev server owns the pool
+    fcntl = None
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+__all__ = [
+    "QueueFullError",
+    "JobStore",
+    "TranscriptionQueue",
+    "create_transcription_queue",
+]
+
+# Seconds between attempts to take over the pool, and between queue polls
+LEASE_RETRY_SECONDS = 5.0
+CLAIM_POLL_SECONDS = 0.25
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the bounded transcription queue has no free slot"""
+
+
+# ---------------- Worker process side ----------------
+_worker_model = None
+
+
+def _init_worker(model_name: str, torch_threads: int) -> None:
+    """Load Whisper once per worker process"""
+    global _worker_model
+    import torch
+    import whisper
+
+    torch.set_num_threads(torch_threads)
+    _worker_model = whisper.load_model(model_name)
+
+
+def _transcribe_bytes(data: bytes) -> dict:
+    """Decode an upload in memory and transcribe it"""
+    from services.audio_decode import decode_audio
+
+    result = _worker_model.transcribe(decode_audio(data))
+    return {"transcript": result.get("text", "").strip()}
+
+
+def _transcribe_batch_bytes(files: List[bytes], batch_size: int) -> dict:
+    """Decode several uploads and transcribe them in batched forward passes"""
+    from services.audio_decode import decode_audio
+    from services.whisper_batch import transcribe_batch
+
+    audios = [decode_audio(data) for data in files]
+    return {"transcripts": transcribe_batch(_worker_model, audios, batch_size)}
+
+
+def _transcribe_segment(samples, offset: float) -> dict:
+    """Transcribe one speech segment of a long recording"""
+    result = _worker_model.transcribe(samples, condition_on_previous_text=False)
+    return {
+        "text": result.get("text", "").strip(),
+        "segments": [
+            {
+                "start": round(offset + seg["start"], 2),
+                "end": round(offset + seg["end"], 2),
+                "text": seg["text"].strip(),
+            }
+            for seg in result.get("segments", [])
+        ],
+    }
+
+
+# ---------------- Job records ----------------
+def _pid_alive(pid: Optional[int]) -> bool:
+    """Whether a process with this pid still exists on this host"""
+    if not pid or os.name == "nt":
+        return True  # unknown owner, or no signal-0 probe on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """SQLite table of job states (and queued payloads) shared by all web workers"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, result TEXT, error TEXT, "
+            "created REAL NOT NULL, updated REAL NOT NULL, owner INTEGER, "
+            "payload BLOB)"
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+        # Tables created before jobs recorded their owner / queued payload
+        for column, kind in (("owner", "INTEGER"), ("payload", "BLOB")):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def create(
+        self,
+        job_id: str,
+        payload: Optional[bytes] = None,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        """
+        Record a queued job
+
+        Args:
+            job_id: New job id
+            payload: Work description for another process to claim(); without
+                one the job runs in the calling process, which becomes its owner
+            max_pending: Reject with QueueFullError once this many jobs are
+                queued or running (checked atomically across processes)
+        """
+        now = time.time()
+        owner = None if payload is not None else os.getpid()
+        conn = self._connection()
+        with conn:
+            if max_pending is not None:
+                conn.execute("BEGIN IMMEDIATE")
+                (pending,) = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+                ).fetchone()
+                if pending >= max_pending:
+                    raise QueueFullError(
+                        f"Job queue is full ({max_pending} jobs pending)"
+                    )
+            conn.execute(
+                "INSERT INTO jobs (id, status, created, updated, owner, payload) "
+                "VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, now, now, owner, payload),
+            )
+
+    def claim(self) -> Optional[tuple]:
+        """
+        Take the oldest queued job with a payload for the calling process
+
+        Returns:
+            (job_id, payload), or None when nothing is queued
+        """
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, payload FROM jobs WHERE status = 'queued' "
+                "AND payload IS NOT NULL ORDER BY created LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, updated = ? "
+                "WHERE id = ?",
+                (os.getpid(), time.time(), row[0]),
+            )
+        return row[0], row[1]
+
+    def count_pending(self) -> int:
+        (pending,) = (
+            self._connection()
+            .execute("SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')")
+            .fetchone()
+        )
+        return pending
+
+    def update(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[dict] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        # A finished job no longer needs its upload
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated = ?, "
+                "payload = CASE WHEN ? IN ('done', 'failed') THEN NULL "
+                "ELSE payload END WHERE id = ?",
+                (
+                    status,
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    time.time(),
+                    status,
+                    job_id,
+                ),
+            )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT id, status, result, error, created, updated, owner "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        if row[1] in ("queued", "running") and not _pid_alive(row[6]):
+            # The process running the job exited (restart, crash)
+            self.update(job_id, "failed", error="Job lost: its worker process exited")
+            return self.get(job_id)
+        return {
+            "job_id": row[0],
+            "status": row[1],
+            "result": json.loads(row[2]) if row[2] else None,
+            "error": row[3],
+            "created": row[4],
+            "updated": row[5],
+        }
+
+    def prune(self, older_than: float) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE updated < ? AND status IN ('done', 'failed')",
+                (older_than,),
+            )
+
+
+# ---------------- Queue ----------------
+class TranscriptionQueue:
+    """Host-wide bounded queue in front of one pool of Whisper worker processes"""
+
+    def __init__(
+        self,
+        job_store: JobStore,
+        model_name: str = "base",
+        workers: int = 2,
+        max_pending: int = 32,
+        torch_threads: Optional[int] = None,
+        job_ttl: float = 3600.0,
+    ):
+        """
+        Initialize transcription queue (nothing starts until the first job)
+
+        Args:
+            job_store: Shared job records
+            model_name: Whisper model size
+            workers: Number of Whisper worker processes on the host
+            max_pending: Maximum queued + running jobs on the host
+            torch_threads: Intra-op threads per worker (defaults to cores/workers)
+            job_ttl: Seconds finished jobs are kept for polling
+        """
+        self.job_store = job_store
+        self.model_name = model_name
+        self.workers = workers
+        self.max_pending = max_pending
+        self.torch_threads = torch_threads or max(
+            1, (os.cpu_count() or 1) // workers
+        )
+        self.job_ttl = job_ttl
+        self.lock_path = job_store.db_path.with_suffix(".owner.lock")
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._coordinator: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(workers)
+        self._owner_pid: Optional[int] = None
+        self._lease_pid: Optional[int] = None
+        self._lease_file = None
+
+    # ---------------- Pool ownership ----------------
+    def _ensure_lease_thread(self) -> None:
+        """Start competing for the pool in this process (once per process)"""
+        with self._lock:
+            if self._lease_pid == os.getpid():
+                return
+            # Started after fork: a lock or thread of the parent is not ours
+            self._lease_pid = os.getpid()
+            self._owner_pid = None
+        threading.Thread(
+            target=self._serve, name="transcription-owner", daemon=True
+        ).start()
+
+    def _acquire_lease(self) -> bool:
+        if fcntl is None:
+            return True
+        lease = open(self.lock_path, "a+")
+        try:
+            fcntl.flock(lease, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lease.close()
+            return False
+        self._lease_file = lease  # held until this process exits
+        return True
+
+    def _serve(self) -> None:
+        """Wait for the pool lease, then claim and run queued jobs forever"""
+        while not self._acquire_lease():
+            time.sleep(LEASE_RETRY_SECONDS)
+        with self._lock:
+            self._owner_pid = os.getpid()
+        print(
+            f"🎤 Process {os.getpid()} owns the Whisper pool "
+            f"({self.workers} workers)"
+        )
+
+        while True:
+            self._slots.acquire()
+            try:
+                claimed = self.job_store.claim()
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not claim a transcription job: {e}")
+                claimed = None
+            if claimed is None:
+                self._slots.release()
+                time.sleep(CLAIM_POLL_SECONDS)
+                continue
+            self._start(*claimed)
+
+    def _start(self, job_id: str, payload: bytes) -> None:
+        try:
+            kind, args = pickle.loads(payload)
+            if kind == "long":
+                future = self._get_coordinator().submit(self._transcribe_long, *args)
+            elif kind == "batch":
+                future = self._dispatch(_transcribe_batch_bytes, *args)
+            else:
+                future = self._dispatch(_transcribe_bytes, *args)
+        except Exception as e:
+            self._slots.release()
+            print(f"❌ Transcription job {job_id} could not start: {e}")
+            self.job_store.update(job_id, "failed", error=str(e))
+            return
+        future.add_done_callback(lambda f: self._on_done(job_id, f))
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: never fork a process that may hold torch/grpc threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_name, self.torch_threads),
+                )
+            return self._executor
+
+    def _get_coordinator(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._coordinator is None:
+                self._coordinator = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="long-transcription"
+                )
+            return self._coordinator
+
+    def _dispatch(self, fn, *args) -> Future:
+        try:
+            return self._get_executor().submit(fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); start a fresh pool and retry once
+            with self._lock:
+                self._executor = None
+            return self._get_executor().submit(fn, *args)
+
+    # ---------------- Submitting ----------------
+    def submit(self, audio: bytes) -> str:
+        """
+        Queue an uploaded file for transcription
+
+        Args:
+            audio: Raw bytes of the uploaded audio file
+
+        Returns:
+            Job id
+        """
+        return self._submit("short", (audio,))
+
+    def submit_batch(self, files: List[bytes], batch_size: int = 8) -> str:
+        """
+        Queue several uploads as one batched transcription job
+
+        Args:
+            files: Raw bytes of each uploaded audio file
+            batch_size: 30-second windows per Whisper forward pass
+
+        Returns:
+            Job id
+        """
+        return self._submit("batch", (files, batch_size))
+
+    def submit_long(self, audio: bytes) -> str:
+        """
+        Queue a long recording: speech segments are found with VAD, silence is
+        skipped and the segments are transcribed in parallel on the pool
+
+        Args:
+            audio: Raw bytes of the uploaded audio file
+
+        Returns:
+            Job id
+        """
+        return self._submit("long", (audio,))
+
+    def _submit(self, kind: str, args: tuple) -> str:
+        """
+        Record a job for the pool owner to claim
+
+        Raises:
+            QueueFullError: TRANSCRIBE_MAX_PENDING jobs are already pending
+        """
+        self._ensure_lease_thread()
+        job_id = uuid.uuid4().hex
+        self.job_store.create(
+            job_id, payload=pickle.dumps((kind, args)), max_pending=self.max_pending
+        )
+        self.job_store.prune(time.time() - self.job_ttl)
+        return job_id
+
+    # ---------------- Running ----------------
+    def _transcribe_long(self, data: bytes) -> dict:
+        """Split on silence, fan segments out to the workers, stitch results"""
+        from services.audio_decode import WHISPER_SAMPLE_RATE, decode_audio
+        from services.vad import split_on_silence
+
+        audio = decode_audio(data)
+        bounds = split_on_silence(audio, WHISPER_SAMPLE_RATE)
+        pieces = self._map_segments(audio, bounds, WHISPER_SAMPLE_RATE)
+
+        return {
+            "transcript": " ".join(p["text"] for p in pieces if p["text"]),
+            "segments": [seg for piece in pieces for seg in piece["segments"]],
+            "duration_seconds": round(len(audio) / WHISPER_SAMPLE_RATE, 2),
+            "speech_seconds": round(
+                sum(end - start for start, end in bounds) / WHISPER_SAMPLE_RATE, 2
+            ),
+        }
+
+    def _map_segments(self, audio, bounds: List[tuple], sample_rate: int) -> list:
+        """
+        Transcribe speech segments, at most one per worker in flight
+
+        The executor is FIFO, so dispatching every segment at once would put a
+        long recording ahead of all short jobs claimed after it; with a
+        window, those queue behind a few segments only.
+        """
+        pieces: list = [None] * len(bounds)
+        remaining = iter(enumerate(bounds))
+        in_flight = {}
+
+        def _launch_next() -> None:
+            for index, (start, end) in remaining:
+                future = self._dispatch(
+                    _transcribe_segment, audio[start:end], start / sample_rate
+                )
+                in_flight[future] = index
+                return
+
+        try:
+            for _ in range(self.workers):
+                _launch_next()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = in_flight.pop(future)
+                    pieces[index] = future.result()
+                    _launch_next()
+        finally:
+            # A segment failed: drop what hasn't started
+            for future in in_flight:
+                future.cancel()
+        return pieces
+
+    def _on_done(self, job_id: str, future: Future) -> None:
+        try:
+            self.job_store.update(job_id, "done", result=future.result())
+        except Exception as e:
+            print(f"❌ Transcription job {job_id} failed: {e}")
+            self.job_store.update(job_id, "failed", error=str(e))
+        finally:
+            self._slots.release()
+
+    # ---------------- Polling ----------------
+    def get(self, job_id: str, wait: float = 0.0) -> Optional[dict]:
+        """
+        Get a job, optionally long-polling until it finishes
+
+        Args:
+            job_id: Job id returned by submit
+            wait: Maximum seconds to wait for completion
+
+        Returns:
+            Job record or None if unknown
+        """
+        # Pollers compete for the pool too, so queued jobs outlive their owner
+        self._ensure_lease_thread()
+        deadline = time.monotonic() + wait
+        job = self.job_store.get(job_id)
+        while (
+            job is not None
+            and job["status"] in ("queued", "running")
+            and time.monotonic() < deadline
+        ):
+            time.sleep(CLAIM_POLL_SECONDS)
+            job = self.job_store.get(job_id)
+        return job
+
+    def stats(self) -> dict:
+        with self._lock:
+            owner = self._owner_pid == os.getpid()
+            started = self._executor is not None
+        return {
+            "workers": self.workers,
+            "pending": self.job_store.count_pending(),
+            "max_pending": self.max_pending,
+            "owns_pool": owner,
+            "started": started,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            coordinator, self._coordinator = self._coordinator, None
+        if coordinator is not None:
+            coordinator.shutdown(wait=False, cancel_futures=True)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_transcription_queue(model_name: str) -> TranscriptionQueue:
+    """
+    Build the queue configured by TRANSCRIBE_* environment variables
+
+    TRANSCRIBE_WORKERS (Whisper processes) and TRANSCRIBE_MAX_PENDING (queued
+    + running jobs) apply to the whole host: one web worker owns the pool.
+
+    Args:
+        model_name: Whisper model size
+
+    Returns:
+        TranscriptionQueue instance
+    """
+    db_path = os.getenv(
+        "TRANSCRIBE_JOB_DB", str(BASE_DIR / "db" / "transcription_jobs.sqlite3")
+    )
+    return TranscriptionQueue(
+        JobStore(Path(db_path)),
+        model_name=model_name,
+        workers=int(os.getenv("TRANSCRIBE_WORKERS", "2")),
+        max_pending=int(os.getenv("TRANSCRIBE_MAX_PENDING", "32")),
+        torch_threads=int(os.getenv("TRANSCRIBE_TORCH_THREADS", "0")) or None,
+    )
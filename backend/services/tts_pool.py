@@ -0,0 +1,130 @@
+"""
+TTS Pool Module
+Fixed pool of Coqui TTS instances, each synthesizing with an explicit number
+of torch intra-op threads, so concurrent requests neither share one
+non-thread-safe model nor oversubscribe the cores
+"""
+
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from lib.metrics import metrics
+
+__all__ = ["TTSPool", "default_tts_threads"]
+
+TTS_LATENCY = metrics.histogram(
+    "tts_synthesis_duration_seconds", "Duration of one TTS synthesis call"
+)
+TTS_CHARACTERS = metrics.counter(
+    "tts_characters_total", "Characters of text synthesized by TTS"
+)
+
+
+def default_tts_threads(size: int) -> int:
+    """Split the machine's cores evenly between the pool's instances"""
+    return max(1, (os.cpu_count() or 1) // max(1, size))
+
+
+class TTSPool:
+    """
+    Checkout/return pool of TTS instances
+
+    The pool also behaves like a single TTS object (``tts()`` and
+    ``synthesizer``), checking an instance out for each call, so code written
+    against one instance works unchanged.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], object],
+        size: int = 1,
+        threads_per_instance: Optional[int] = None,
+    ):
+        """
+        Build the pool (every instance is loaded up front)
+
+        Args:
+            factory: Zero-argument callable returning a loaded TTS instance
+            size: Number of instances (concurrent syntheses)
+            threads_per_instance: torch intra-op threads used by each synthesis
+                (defaults to cores / size)
+        """
+        self.size = max(1, size)
+        self.threads_per_instance = threads_per_instance or default_tts_threads(
+            self.size
+        )
+        self.instances = [factory() for _ in range(self.size)]
+
+        self._available: "queue.Queue" = queue.Queue()
+        for instance in self.instances:
+            self._available.put(instance)
+
+        self._lock = threading.Lock()
+        self._stats = {"checkouts": 0, "waits": 0, "wait_seconds": 0.0}
+
+    @property
+    def synthesizer(self):
+        """Synthesizer of the first instance (sample rate, config)"""
+        return self.instances[0].synthesizer
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None) -> Iterator[object]:
+        """
+        Borrow an instance for exclusive use
+
+        torch.set_num_threads is applied in the calling thread just before
+        the instance is handed out: with the OpenMP backend the setting
+        belongs to the thread that runs the parallel regions.
+
+        Args:
+            timeout: Seconds to wait for a free instance (None = forever)
+
+        Yields:
+            A TTS instance, returned to the pool on exit
+        """
+        try:
+            instance = self._available.get_nowait()
+            waited = 0.0
+        except queue.Empty:
+            start = time.perf_counter()
+            try:
+                instance = self._available.get(timeout=timeout)
+            except queue.Empty:
+                raise TimeoutError("No free TTS instance") from None
+            waited = time.perf_counter() - start
+
+        with self._lock:
+            self._stats["checkouts"] += 1
+            if waited:
+                self._stats["waits"] += 1
+                self._stats["wait_seconds"] += waited
+
+        try:
+            import torch
+
+            torch.set_num_threads(self.threads_per_instance)
+            yield instance
+        finally:
+            self._available.put(instance)
+
+    def tts(self, text: str, **kwargs):
+        """Synthesize on a pooled instance (same signature as TTS.tts)"""
+        with self.checkout() as instance:
+            start = time.perf_counter()
+            samples = instance.tts(text=text, **kwargs)
+        TTS_LATENCY.observe(time.perf_counter() - start)
+        TTS_CHARACTERS.inc(len(text))
+        return samples
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["size"] = self.size
+        stats["threads_per_instance"] = self.threads_per_instance
+        stats["available"] = self._available.qsize()
+        stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+        return stats
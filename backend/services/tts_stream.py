@@ -0,0 +1,265 @@
+"""
+TTS Stream Module
+Sentence-pipelined speech synthesis: while sentence N is being sent to the
+client, sentence N+1 is already being synthesized
+"""
+
+import queue
+import re
+import struct
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from lib.tracing import tracer
+from services.audio_encoding import encode_stream, to_pcm16
+
+__all__ = [
+    "split_sentences",
+    "iter_sentences",
+    "SentencePipeline",
+    "wav_stream_header",
+    "synthesize_pcm",
+    "synthesize_stream",
+]
+
+# Sentence boundary: end punctuation (optionally closing a quote) + whitespace
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+|(?<=[.!?…][\"')\]])\s+")
+
+# Pause inserted between streamed sentences
+SENTENCE_PAUSE_SECONDS = 0.2
+
+
+def split_sentences(text: str, max_chars: int = 300) -> List[str]:
+    """
+    Split text into sentences, breaking overly long ones at commas/spaces
+
+    Args:
+        text: Text to split
+        max_chars: Longest chunk handed to the TTS model at once
+
+    Returns:
+        List of non-empty sentences
+    """
+    sentences = []
+    for sentence in SENTENCE_BOUNDARY.split(text.strip()):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(", ", 0, max_chars)
+            if cut <= 0:
+                cut = sentence.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            sentences.append(sentence[: cut + 1].strip())
+            sentence = sentence[cut + 1 :].strip()
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def iter_sentences(text_chunks: Iterable[str], max_chars: int = 300) -> Iterator[str]:
+    """
+    Yield complete sentences from a stream of text fragments (e.g. LLM tokens)
+    as soon as each one is terminated
+
+    Args:
+        text_chunks: Text fragments in order
+        max_chars: Longest chunk handed to the TTS model at once
+
+    Yields:
+        Sentences, the unterminated remainder last
+    """
+    buffer = ""
+    for fragment in text_chunks:
+        buffer += fragment
+        parts = SENTENCE_BOUNDARY.split(buffer)
+        # The last part may still be growing; everything before it is final
+        for sentence in parts[:-1]:
+            yield from split_sentences(sentence, max_chars)
+        buffer = parts[-1]
+    yield from split_sentences(buffer, max_chars)
+
+
+class SentencePipeline:
+    """
+    Synthesizes sentences on a background thread as they are fed in, so TTS
+    runs while the rest of the text is still being generated
+    """
+
+    def __init__(self, tts):
+        """
+        Args:
+            tts: Loaded Coqui TTS instance
+        """
+        self.tts = tts
+        self.sample_rate = tts.synthesizer.output_sample_rate
+        self.tts_seconds = 0.0
+        self.sentences = 0
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._samples = []
+        self._error: Optional[BaseException] = None
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="tts-pipeline", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            sentence = self._queue.get()
+            if sentence is None or self._cancelled.is_set():
+                return
+            try:
+                start = time.perf_counter()
+                with tracer.span("tts:synthesize"):
+                    samples = self.tts.tts(text=sentence, split_sentences=False)
+                self.tts_seconds += time.perf_counter() - start
+                self._samples.append(np.asarray(samples, dtype=np.float32))
+                self.sentences += 1
+            except BaseException as e:
+                self._error = e
+                return
+
+    def feed(self, sentence: str) -> None:
+        """Queue a sentence for synthesis (returns immediately)"""
+        self._queue.put(sentence)
+
+    def finish(self) -> np.ndarray:
+        """
+        Wait for all fed sentences and return the narration
+
+        Returns:
+            Mono float32 samples, sentences separated by a short pause
+        """
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        pause = np.zeros(int(self.sample_rate * SENTENCE_PAUSE_SECONDS), np.float32)
+        pieces = []
+        for samples in self._samples:
+            if pieces:
+                pieces.append(pause)
+            pieces.append(samples)
+        return np.concatenate(pieces) if pieces else np.zeros(0, np.float32)
+
+    def cancel(self) -> None:
+        """Stop synthesizing (e.g. when text generation failed)"""
+        self._cancelled.set()
+        self._queue.put(None)
+
+
+def wav_stream_header(sample_rate: int, channels: int = 1, bits: int = 16) -> bytes:
+    """
+    WAV header for a stream of unknown length (sizes set to the maximum, which
+    players treat as "read until the connection closes")
+    """
+    byte_rate = sample_rate * channels * bits // 8
+    block_align = channels * bits // 8
+    unknown = 0xFFFFFFFF
+    return (
+        b"RIFF"
+        + struct.pack("<I", unknown)
+        + b"WAVEfmt "
+        + struct.pack(
+            "<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, block_align, bits
+        )
+        + b"data"
+        + struct.pack("<I", unknown)
+    )
+
+
+def synthesize_pcm(tts, text: str, lookahead: int = 2) -> Iterator[bytes]:
+    """
+    Synthesize text sentence by sentence as 16-bit PCM
+
+    A producer thread synthesizes sentences ahead of the consumer, bounded by
+    ``lookahead`` so an abandoned stream stops wasting CPU.
+
+    Args:
+        tts: Loaded Coqui TTS instance
+        text: Text to narrate
+        lookahead: Sentences synthesized ahead of what has been sent
+
+    Yields:
+        PCM chunks (one per sentence, separated by a short pause)
+    """
+    sentences = split_sentences(text)
+    sample_rate = tts.synthesizer.output_sample_rate
+    pause = b"\x00\x00" * int(sample_rate * SENTENCE_PAUSE_SECONDS)
+
+    chunks: "queue.Queue" = queue.Queue(maxsize=lookahead)
+    stop = threading.Event()
+    done = object()
+
+    def _put(item) -> bool:
+        # Never block forever on a full queue once the consumer has gone
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce():
+        try:
+            for sentence in sentences:
+                if stop.is_set():
+                    return
+                with tracer.span("tts:synthesize"):
+                    samples = tts.tts(text=sentence, split_sentences=False)
+                if not _put(to_pcm16(samples)):
+                    return
+            _put(done)
+        except Exception as e:
+            _put(e)
+
+    producer = threading.Thread(target=_produce, name="tts-stream", daemon=True)
+    producer.start()
+
+    try:
+        first = True
+        while True:
+            chunk = chunks.get()
+            if chunk is done:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk if first else pause + chunk
+            first = False
+    finally:
+        # Finished or the client went away: tell the producer to stop
+        stop.set()
+
+
+def synthesize_stream(
+    tts, text: str, fmt: str = "wav", lookahead: int = 2
+) -> Iterator[bytes]:
+    """
+    Stream narration sentence by sentence in the requested format
+
+    Args:
+        tts: Loaded Coqui TTS instance
+        text: Text to narrate
+        fmt: "wav" (raw PCM behind a streaming header) or an encoded preset
+            from services.audio_encoding.AUDIO_FORMATS
+        lookahead: Sentences synthesized ahead of what has been sent
+
+    Yields:
+        Audio bytes, playable as soon as the first sentence arrives
+    """
+    sample_rate = tts.synthesizer.output_sample_rate
+    pcm = synthesize_pcm(tts, text, lookahead)
+    if fmt != "wav":
+        yield from encode_stream(pcm, sample_rate, fmt)
+        return
+
+    try:
+        yield wav_stream_header(sample_rate)
+        yield from pcm
+    finally:
+        pcm.close()
@@ -0,0 +1,108 @@
+"""
+Voice Activity Detection Module
+Energy-based splitting of long recordings into speech segments so silence
+is skipped and segments can be transcribed in parallel
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+__all__ = ["split_on_silence"]
+
+
+def _frame_db(audio: np.ndarray, frame: int) -> np.ndarray:
+    """RMS level of consecutive frames in dBFS"""
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[: n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def split_on_silence(
+    audio: np.ndarray,
+    sample_rate: int = 16000,
+    frame_ms: int = 30,
+    min_silence_ms: int = 500,
+    pad_ms: int = 200,
+    max_segment_s: float = 30.0,
+    margin_db: float = 12.0,
+    floor_db: float = -50.0,
+) -> List[Tuple[int, int]]:
+    """
+    Find speech segments in a mono recording
+
+    A frame counts as speech when it is ``margin_db`` above the recording's
+    noise floor (10th percentile frame level, capped ``margin_db`` below the
+    95th percentile) and above ``floor_db``. Speech
+    runs separated by less than ``min_silence_ms`` are merged, padded, and
+    split at the quietest frame when longer than ``max_segment_s``.
+
+    Args:
+        audio: Mono float samples
+        sample_rate: Sample rate of ``audio``
+        frame_ms: Analysis frame length
+        min_silence_ms: Shortest pause that separates two segments
+        pad_ms: Context kept before and after each segment
+        max_segment_s: Longest segment (Whisper's window is 30 s)
+        margin_db: Speech threshold above the noise floor
+        floor_db: Absolute minimum speech level
+
+    Returns:
+        List of (start_sample, end_sample) pairs in order
+    """
+    frame = max(1, sample_rate * frame_ms // 1000)
+    levels = _frame_db(audio, frame)
+    if len(levels) == 0:
+        return []
+
+    # Mostly-speech recordings have no real noise floor at the 10th
+    # percentile, so never put the threshold within margin_db of loud speech
+    noise_floor, loud = np.percentile(levels, [10, 95])
+    threshold = max(min(noise_floor + margin_db, loud - margin_db), floor_db)
+    voiced = levels > threshold
+
+    # ---------------- Speech runs, merging short pauses ----------------
+    min_gap = max(1, min_silence_ms // frame_ms)
+    runs = []
+    start = None
+    last_voiced = None
+    for i, is_voiced in enumerate(voiced):
+        if not is_voiced:
+            continue
+        if start is None:
+            start = i
+        elif i - last_voiced > min_gap:
+            runs.append((start, last_voiced + 1))
+            start = i
+        last_voiced = i
+    if start is not None:
+        runs.append((start, last_voiced + 1))
+
+    # ---------------- Pad and cap segment length ----------------
+    pad = pad_ms // frame_ms
+    max_frames = max(1, int(max_segment_s * 1000 // frame_ms) - 2 * pad)
+    segments = []  # (start frame, end frame, cut at start, cut at end)
+    for run_start, run_end in runs:
+        cut_before = False
+        while run_end - run_start > max_frames:
+            # Cut at the quietest frame in the second half of the window
+            window = levels[run_start + max_frames // 2 : run_start + max_frames]
+            cut = run_start + max_frames // 2 + int(np.argmin(window))
+            segments.append((run_start, cut, cut_before, True))
+            run_start = cut
+            cut_before = True
+        segments.append((run_start, run_end, cut_before, False))
+
+    # Pad only at real pauses so forced cuts don't overlap their neighbours
+    n_frames = len(levels)
+    bounds = []
+    for start, end, cut_start, cut_end in segments:
+        if not cut_start:
+            start = max(0, start - pad)
+        if not cut_end:
+            end = min(n_frames, end + pad)
+        bounds.append((start * frame, len(audio) if end >= n_frames else end * frame))
+    return bounds
@@ -0,0 +1,74 @@
+"""
+Whisper Batch Module
+Transcribes many clips with batched encoder/decoder passes instead of one
+sequential transcribe() call per clip
+"""
+
+from typing import List, Optional
+
+import numpy as np
+
+__all__ = ["transcribe_batch"]
+
+# Whisper treats a window as silence above this no-speech probability when the
+# decoder is also unsure (same thresholds as whisper.transcribe)
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+
+
+def transcribe_batch(
+    model,
+    audios: List[np.ndarray],
+    batch_size: int = 8,
+    language: Optional[str] = None,
+) -> List[str]:
+    """
+    Transcribe several 16 kHz mono clips with batched forward passes
+
+    Every clip is cut into 30-second windows, all windows are padded to the
+    same mel shape and decoded in groups of ``batch_size``, then the window
+    texts are joined back per clip in order.
+
+    Args:
+        model: Loaded Whisper model
+        audios: Decoded clips (see services.audio_decode.decode_audio)
+        batch_size: Windows per forward pass
+        language: Language code, or None to detect per window
+
+    Returns:
+        One transcript per input clip, in input order
+    """
+    import torch
+    import whisper
+    from whisper.audio import N_SAMPLES
+
+    # ---------------- Split clips into 30 s mel windows ----------------
+    windows = []  # (clip index, mel spectrogram)
+    for index, audio in enumerate(audios):
+        for start in range(0, max(len(audio), 1), N_SAMPLES):
+            chunk = whisper.pad_or_trim(audio[start : start + N_SAMPLES])
+            mel = whisper.log_mel_spectrogram(chunk, n_mels=model.dims.n_mels)
+            windows.append((index, mel))
+
+    options = whisper.DecodingOptions(
+        language=language,
+        without_timestamps=True,
+        fp16=model.device.type == "cuda",
+    )
+
+    # ---------------- Batched decoding ----------------
+    texts: List[List[str]] = [[] for _ in audios]
+    with torch.inference_mode():
+        for offset in range(0, len(windows), batch_size):
+            group = windows[offset : offset + batch_size]
+            mel = torch.stack([m for _, m in group]).to(model.device)
+            results = whisper.decode(model, mel, options)
+            for (index, _), result in zip(group, results):
+                silent = (
+                    result.no_speech_prob > NO_SPEECH_THRESHOLD
+                    and result.avg_logprob < LOGPROB_THRESHOLD
+                )
+                if not silent and result.text.strip():
+                    texts[index].append(result.text.strip())
+
+    return [" ".join(parts) for parts in texts]